@@ -1,8 +1,33 @@
+import sys
+import time
+
+_started = time.perf_counter()
+
+if __name__ == "__main__" and "--profile-startup" in sys.argv:
+    # Профилирование выполняется в дочернем процессе, поэтому здесь wx не импортируется
+    from main.startup import profile_startup
+    sys.exit(profile_startup(__file__, [arg for arg in sys.argv[1:] if arg != "--profile-startup"]))
+
 import wx
 
+from main.startup import StartupTimer
 from main.UI import AudioPlayerFrame
+from main.workers import StallMonitor
 
 if __name__ == "__main__":
+    startup_timer = StartupTimer(_started)
+    startup_timer.mark("импорт модулей")
+    stall_monitor = None
+    if "--stall-report" in sys.argv:
+        stall_monitor = StallMonitor(
+            on_stall=lambda stall: print(f"Цикл событий задержан на {stall:.0f} мс", file=sys.stderr))
     app = wx.App(False)
-    frame = AudioPlayerFrame()
-    app.MainLoop()
\ No newline at end of file
+    frame = AudioPlayerFrame(startup_timer=startup_timer, stall_monitor=stall_monitor)
+    if "--startup-report" in sys.argv:
+        # Вызов выполнится в первой итерации цикла событий, когда окно уже показано
+        wx.CallAfter(lambda: (startup_timer.mark("первое окно на экране"), startup_timer.report()))
+    if "--quit-after-startup" in sys.argv:
+        wx.CallAfter(frame.Close)
+    app.MainLoop()
+    if stall_monitor:
+        stall_monitor.report()
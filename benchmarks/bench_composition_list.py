@@ -0,0 +1,85 @@
+"""
+Время обновления списка композиций после перемещения трека в зависимости от размера плейлиста.
+
+Сравниваются прежний подход (wx.ListBox: Clear и Append всех названий) и
+виртуальный CompositionListCtrl (перерисовка двух изменившихся строк).
+Требует wxPython и графическую среду (на Linux подойдет xvfb-run).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_composition_list
+"""
+import time
+
+import wx
+
+from main.composition import Composition
+from main.composition_list import CompositionListCtrl
+from main.Playlist import PlayList
+
+SIZES = (1_000, 10_000, 50_000)
+REPEATS = 5
+
+
+def make_playlist(count: int) -> PlayList:
+    """Создает плейлист из count синтетических композиций."""
+    playlist = PlayList()
+    playlist.add_songs(Composition(f"Track {i}", 180.0 + i % 60, f"/music/{i}.mp3") for i in range(count))
+    return playlist
+
+
+def flush():
+    """Обрабатывает накопившиеся события отрисовки."""
+    wx.GetApp().Yield(onlyIfNeeded=True)
+
+
+def time_listbox(frame: wx.Frame, playlist: PlayList) -> float:
+    """Обновление wx.ListBox целиком, как в прежнем refresh_composition_list (мс)."""
+    listbox = wx.ListBox(frame)
+    listbox.SetSize(frame.GetClientSize())
+    best = float("inf")
+    for _ in range(REPEATS):
+        playlist.move_up(playlist.node_at(len(playlist) // 2))
+        start = time.perf_counter()
+        listbox.Clear()
+        for comp in playlist.get_all_songs():
+            listbox.Append(comp.get_title())
+        flush()
+        best = min(best, time.perf_counter() - start)
+    listbox.Destroy()
+    return best * 1000
+
+
+def time_virtual(frame: wx.Frame, playlist: PlayList) -> float:
+    """Обновление виртуального списка после перемещения трека (мс)."""
+    ctrl = CompositionListCtrl(frame)
+    ctrl.SetSize(frame.GetClientSize())
+    ctrl.set_playlist(playlist)
+    flush()
+    best = float("inf")
+    for _ in range(REPEATS):
+        row = len(playlist) // 2
+        ctrl.EnsureVisible(row)
+        flush()
+        playlist.move_up(playlist.node_at(row))
+        start = time.perf_counter()
+        ctrl.refresh_rows(row, row - 1)
+        flush()
+        best = min(best, time.perf_counter() - start)
+    ctrl.Destroy()
+    return best * 1000
+
+
+def main():
+    app = wx.App(False)
+    frame = wx.Frame(None, size=wx.Size(600, 500))
+    frame.Show()
+    print(f"{'tracks':>8} | {'ListBox, мс':>12} | {'виртуальный, мс':>16}")
+    for size in SIZES:
+        playlist = make_playlist(size)
+        print(f"{size:>8} | {time_listbox(frame, playlist):>12.1f} | {time_virtual(frame, playlist):>16.2f}")
+    frame.Destroy()
+    app.Destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Плавный переход между треками: точность, процессорное время и память в зависимости от длины трека.
+
+Каждый замер выполняется в отдельном процессе: CrossfadeOutput запускает
+трек за LEAD_SECONDS до его конца, ставит в очередь следующий такой же и
+ждет сигнала начала перехода, затем доигрывает переход. Замеряются:
+
+* задержка начала перехода относительно расчетного момента;
+* время queue() — той части постановки в очередь, которая в плеере идет
+  под блокировкой контроллера (открытие трека выполняет prepare() заранее);
+* процессорное время процесса от запуска до конца перехода, включая
+  подготовку следующего трека (огибающая накладывается только на порции,
+  попадающие в переход);
+* прирост пиковой резидентной памяти.
+
+WAV в формате микшера подается из отображения в память без преобразования,
+а WAV 22,05 кГц моно — из отображения с преобразованием каждой порции в
+формат микшера; в обоих случаях память не зависит от длины трека. Столбец
+«принят» показывает, принимает ли вывод трек (в плеере непринятый трек
+воспроизводится без перехода). Отдельно замеряется скорость наложения
+огибающей.
+Звук выводится через фиктивный драйвер SDL.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_crossfade
+"""
+import multiprocessing
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from benchmarks.bench_wav_playback import peak_rss_mb, write_long_wav
+
+FADE_SECONDS = 4.0
+# запас до начала перехода: следующий трек успевает подготовиться
+LEAD_SECONDS = FADE_SECONDS + 3.0
+
+
+def write_low_wav(path: str, seconds: float):
+    """Записывает WAV 22,05 кГц / 16 бит / моно: его pygame декодирует с передискретизацией."""
+    data_size = int(22050 * seconds) * 2
+    with open(path, "wb") as f:
+        f.write(b"RIFF" + struct.pack("<I", 36 + data_size) + b"WAVE")
+        f.write(b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, 22050, 22050 * 2, 2, 16))
+        f.write(b"data" + struct.pack("<I", data_size))
+        block = b"\x01\x10\xff\xef" * 2 ** 18
+        for offset in range(0, data_size, len(block)):
+            f.write(block[:data_size - offset])
+
+
+def measure(label: str, path: str, seconds: float, results):
+    """Выполняет переход между двумя копиями трека и кладет замеры в results."""
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    from pygame import mixer
+    from main.composition import Composition
+    from main.crossfade import CrossfadeOutput
+    mixer.init()
+    ended = threading.Event()
+    output = CrossfadeOutput(ended.set, FADE_SECONDS)
+    composition = Composition(label, seconds, path)
+    baseline = peak_rss_mb()
+    cpu = time.process_time()
+    output.play(composition, seconds - LEAD_SECONDS)
+    # отсчет от запуска: декодирование текущего трека в задержку перехода не входит
+    begin = time.perf_counter()
+    # в плеере prepare() выполняется в очереди задач, без блокировки контроллера
+    output.prepare(composition)
+    locked = time.perf_counter()
+    output.queue(composition)
+    locked = (time.perf_counter() - locked) * 1000
+    ended.wait()
+    late = (time.perf_counter() - begin - (LEAD_SECONDS - FADE_SECONDS)) * 1000
+    time.sleep(FADE_SECONDS)
+    cpu = time.process_time() - cpu
+    results.put((label, output.accepts(composition), late, locked, cpu * 1000, peak_rss_mb() - baseline))
+    output.close()
+
+
+def shape_throughput() -> float:
+    """Скорость наложения огибающей: секунд звука 44,1 кГц стерео за секунду."""
+    import numpy as np
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    from pygame import mixer
+    from main.crossfade import CrossfadeOutput, _Deck
+    mixer.init(44100, -16, 2)
+    output = CrossfadeOutput(lambda: None, FADE_SECONDS)
+
+    class Track:
+        length = int(44100 * FADE_SECONDS) * 4
+
+    deck = _Deck(None)
+    deck.track = Track()
+    deck.fade_out = 0
+    piece = memoryview(np.ones(Track.length // 2, dtype=np.int16).tobytes())
+    rounds = 20
+    begin = time.perf_counter()
+    for _ in range(rounds):
+        output._shape(deck, piece, 0)
+    elapsed = time.perf_counter() - begin
+    mixer.quit()
+    return rounds * FADE_SECONDS / elapsed
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        cases = []
+        for minutes in (1, 30):
+            path = os.path.join(folder, f"mixer_{minutes}.wav")
+            write_long_wav(path, minutes * 60)
+            cases.append((f"WAV {minutes} мин, mmap", path, minutes * 60.0))
+        for minutes in (1, 30):
+            path = os.path.join(folder, f"low_{minutes}.wav")
+            write_low_wav(path, minutes * 60)
+            cases.append((f"WAV {minutes} мин, преобр.", path, minutes * 60.0))
+        print(f"Переход {FADE_SECONDS:.0f} с")
+        print(f"{'трек':>20} | {'принят':>6} | {'задержка, мс':>12} | {'queue(), мс':>11} | "
+              f"{'CPU за переход, мс':>18} | {'прирост памяти, МБ':>18}")
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        for label, path, seconds in cases:
+            process = context.Process(target=measure, args=(label, path, seconds, results))
+            process.start()
+            label, accepted, late, locked, cpu, rss = results.get()
+            process.join()
+            print(f"{label:>20} | {'да' if accepted else 'нет':>6} | {late:>12.1f} | {locked:>11.1f} | "
+                  f"{cpu:>18.1f} | {rss:>18.1f}")
+    print(f"Огибающая: {shape_throughput():.0f} с звука в секунду")
+
+
+if __name__ == "__main__":
+    main()
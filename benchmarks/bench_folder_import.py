@@ -0,0 +1,65 @@
+"""
+Массовый импорт папки: 10 000 небольших WAV-файлов во вложенных каталогах.
+
+Замеряется холодный импорт (пробы в пуле процессов) и повторный импорт
+с прогретым кэшем метаданных.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_folder_import
+"""
+import os
+import struct
+import tempfile
+import time
+
+from main.importer import FolderImporter
+from main.metadata import MetadataCache
+from main.Playlist import PlayList
+
+FILES = 10_000
+FILES_PER_ALBUM = 12
+
+
+def write_wav(path: str, seconds: float):
+    """Записывает WAV-заголовок 44,1 кГц / 16 бит / стерео и немного данных."""
+    byte_rate = 44100 * 4
+    data_size = int(byte_rate * seconds) // 4 * 4
+    with open(path, "wb") as f:
+        f.write(b"RIFF" + struct.pack("<I", 36 + data_size) + b"WAVE")
+        f.write(b"fmt " + struct.pack("<IHHIIHH", 16, 1, 2, 44100, byte_rate, 4, 16))
+        f.write(b"data" + struct.pack("<I", data_size))
+        # данные не нужны пробе по заголовку, поэтому файл делаем разреженным
+        f.truncate(44 + data_size)
+
+
+def make_fixture(root: str):
+    """Создает дерево исполнитель/альбом/трек из FILES файлов."""
+    for i in range(FILES):
+        album = os.path.join(root, f"artist_{i // 120:03d}", f"album_{i // FILES_PER_ALBUM:04d}")
+        os.makedirs(album, exist_ok=True)
+        write_wav(os.path.join(album, f"{i:05d}.wav"), 1 + i % 5)
+
+
+def timed_import(importer: FolderImporter, root: str) -> tuple[float, int]:
+    """Возвращает время импорта в секундах и число композиций в плейлисте."""
+    playlist = PlayList()
+    start = time.perf_counter()
+    importer.run(root, playlist.add_songs)
+    return time.perf_counter() - start, len(playlist)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        root = os.path.join(folder, "music")
+        make_fixture(root)
+        cache = MetadataCache(os.path.join(folder, "metadata.sqlite"))
+        importer = FolderImporter(cache)
+        cold, count = timed_import(importer, root)
+        print(f"холодный импорт: {count} файлов за {cold:.2f} с ({count / cold:.0f} файлов/с)")
+        warm, count = timed_import(importer, root)
+        print(f"повторный импорт с кэшем: {count} файлов за {warm:.2f} с ({count / warm:.0f} файлов/с)")
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Пауза между треками при воспроизведении плейлиста.
+
+Плейлист из нескольких коротких WAV проигрывается через фиктивный звуковой
+драйвер SDL (SDL_AUDIODRIVER=dummy), поэтому звуковая карта не нужна.
+Сравниваются два режима PlayerController:
+
+* перезагрузка — следующий трек загружается после окончания текущего;
+* gapless — следующий трек заранее стоит в очереди микшера.
+
+Момент начала трека определяется как время обнаружения перехода минус
+mixer.music.get_pos() (сколько нового трека микшер уже успел выдать), поэтому
+задержка обработки окончания не попадает в результат gapless, а в режиме
+перезагрузки попадает — как и в реальном плеере. Паузой считается разница
+между интервалом от начала трека до начала следующего и длительностью трека.
+Замеряется потоковый вывод mixer.music, поэтому воспроизведение WAV из
+отображения в память отключено (см. bench_wav_playback).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_gapless
+"""
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from benchmarks.bench_folder_import import write_wav
+from main.composition import Composition
+from main.Playlist import PlayList
+from main.PlayerController import PlayerController
+
+TRACKS = 6
+SECONDS = 1.0
+
+
+def make_playlist(folder: str) -> PlayList:
+    """Создает плейлист из TRACKS тихих WAV-файлов длительностью SECONDS."""
+    playlist = PlayList()
+    for i in range(TRACKS):
+        path = os.path.join(folder, f"{i}.wav")
+        write_wav(path, SECONDS)
+        playlist.add_song(Composition(f"{i}.wav", SECONDS, path))
+    return playlist
+
+
+def track_start() -> float:
+    """Время начала текущего трека по часам perf_counter."""
+    return time.perf_counter() - max(pygame.mixer.music.get_pos(), 0) / 1000
+
+
+def run(playlist: PlayList, gapless: bool) -> list[float]:
+    """Воспроизводит плейлист и возвращает моменты начала треков."""
+    controller = PlayerController(gapless=gapless, mapped_wav=False)
+    starts = []
+    finished = threading.Event()
+
+    def on_started(track):
+        starts.append(track_start())
+        if len(starts) == TRACKS:
+            finished.set()
+
+    controller.subscribe("track_started", on_started)
+    controller.attach(playlist)
+    playlist.current_node = playlist.first_item
+    controller.play(playlist.first_item.data)
+    starts.append(track_start())
+    finished.wait(TRACKS * SECONDS * 3)
+    controller.stop()
+    controller.close()
+    return starts
+
+
+def report(label: str, starts: list[float]):
+    """Печатает среднюю и максимальную паузу между треками."""
+    gaps = [(b - a - SECONDS) * 1000 for a, b in zip(starts, starts[1:])]
+    if not gaps:
+        print(f"{label}: переходов не зафиксировано")
+        return
+    print(f"{label}: переходов {len(gaps)}, пауза в среднем {statistics.mean(gaps):.1f} мс, "
+          f"максимум {max(gaps):.1f} мс")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        playlist = make_playlist(folder)
+        report("перезагрузка", run(playlist, gapless=False))
+        report("gapless", run(playlist, gapless=True))
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Плейлисты с общими треками: отдельные копии в каждом плейлисте против общей библиотеки.
+
+PLAYLISTS плейлистов по TRACKS_PER_PLAYLIST треков выбираются из DISTINCT
+файлов, так что каждый файл входит в несколько плейлистов. Сравниваются размер
+файлов на диске, время загрузки всех плейлистов и память (tracemalloc) после
+загрузки. Время загрузки с библиотекой включает чтение library.jsonl.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_library
+"""
+import gc
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from main.composition import Composition
+from main.Playlist import PlayList
+from main.PlaylistJSONController import PlaylistJSONController
+
+PLAYLISTS = 30
+TRACKS_PER_PLAYLIST = 10_000
+DISTINCT = 20_000
+
+
+def make_tracks() -> list[tuple[str, float, str]]:
+    """Поля DISTINCT синтетических треков."""
+    return [(f"Track {i:06d}", 180.0 + i % 60, f"/home/user/Music/Artist {i // 120}/Album {i // 12}/{i:06d}.mp3")
+            for i in range(DISTINCT)]
+
+
+def write_playlists(folder: str, file_format: str, library: bool, tracks, rng: random.Random):
+    """Сохраняет PLAYLISTS плейлистов, каждый — случайная выборка треков."""
+    controller = PlaylistJSONController(folder, file_format=file_format, library=library)
+    for number in range(PLAYLISTS):
+        playlist = PlayList()
+        playlist.add_songs(controller.intern(Composition(*fields))
+                           for fields in rng.sample(tracks, TRACKS_PER_PLAYLIST))
+        controller.save_playlist(f"list {number}", playlist)
+
+
+def folder_size(folder: str) -> float:
+    """Суммарный размер файлов папки (МБ)."""
+    return sum(entry.stat().st_size for entry in os.scandir(folder)) / 2 ** 20
+
+
+def load_all(folder: str, file_format: str, library: bool) -> dict[str, PlayList]:
+    """Загружает все плейлисты новым контроллером."""
+    controller = PlaylistJSONController(folder, file_format=file_format, library=library)
+    playlists = controller.load_playlists()
+    assert len(playlists) == PLAYLISTS
+    return playlists
+
+
+def measure(folder: str, file_format: str, library: bool) -> tuple[float, float]:
+    """Время загрузки (с) и память загруженных плейлистов (МБ); замеры раздельные, tracemalloc замедляет загрузку."""
+    gc.collect()
+    start = time.perf_counter()
+    load_all(folder, file_format, library)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    playlists = load_all(folder, file_format, library)
+    memory = tracemalloc.get_traced_memory()[0] / 2 ** 20
+    tracemalloc.stop()
+    del playlists
+    return elapsed, memory
+
+
+def main():
+    tracks = make_tracks()
+    print(f"{PLAYLISTS} плейлистов по {TRACKS_PER_PLAYLIST} треков из {DISTINCT} файлов")
+    print(f"{'формат':>7} | {'хранение':>10} | {'диск, МБ':>8} | {'загрузка, с':>11} | {'память, МБ':>10}")
+    for file_format in ("binary", "json"):
+        for library in (False, True):
+            with tempfile.TemporaryDirectory() as folder:
+                write_playlists(folder, file_format, library, tracks, random.Random(1))
+                elapsed, memory = measure(folder, file_format, library)
+                label = "библиотека" if library else "копии"
+                print(f"{file_format:>7} | {label:>10} | {folder_size(folder):>8.1f} | {elapsed:>11.2f} | {memory:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
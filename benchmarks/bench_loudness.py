@@ -0,0 +1,54 @@
+"""
+Пакетный анализ громкости: один процесс против пула процессов и повторный анализ из кэша.
+
+FILES WAV-файлов по SECONDS секунд (44,1 кГц / 16 бит / стерео, шум)
+анализируются LoudnessAnalyzer с одним и со всеми процессами.
+Повторный запуск берет результаты из кэша метаданных.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_loudness
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_waveform import RATE, write_noise_wav
+from main.composition import Composition
+from main.loudness import LoudnessAnalyzer
+from main.metadata import MetadataCache
+
+FILES = 32
+SECONDS = 60
+
+
+def timed(analyzer: LoudnessAnalyzer, compositions: list[Composition]) -> float:
+    """Время анализа в секундах."""
+    begin = time.perf_counter()
+    analyzer.run(compositions)
+    return time.perf_counter() - begin
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        compositions = []
+        for i in range(FILES):
+            path = os.path.join(folder, f"{i}.wav")
+            write_noise_wav(path, SECONDS)
+            compositions.append(Composition(f"{i}.wav", SECONDS, path))
+        samples = FILES * SECONDS * RATE * 2
+        print(f"{FILES} файлов по {SECONDS} с, {samples / 1e6:.0f} млн отсчетов, ядер: {os.cpu_count()}")
+        for label, workers in (("1 процесс", 1), ("пул процессов", None)):
+            metadata = MetadataCache(os.path.join(folder, f"metadata-{workers}.sqlite"))
+            elapsed = timed(LoudnessAnalyzer(metadata, workers=workers), compositions)
+            print(f"{label:>14}: {elapsed:6.2f} с, {samples / elapsed / 1e6:7.1f} млн отсчетов/с")
+            cached = timed(LoudnessAnalyzer(metadata, workers=workers), compositions)
+            print(f"{'из кэша':>14}: {cached * 1000:6.1f} мс")
+            metadata.close()
+        gains = [composition.gain for composition in compositions]
+        print(f"поправки: от {np.min(gains):+.1f} до {np.max(gains):+.1f} дБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Память на один трек (tracemalloc) для разных представлений плейлиста.
+
+«До» моделируется подклассами без __slots__, у которых снова появляется __dict__,
+как у исходных Composition и LinkedListItem.
+
+Структура массивов (параллельные массивы полей и целочисленные связи
+next/prev) замеряется только как нижняя граница: плейлист такого вида в
+проект не входит, потому что не сохраняет идентичность узлов и композиций,
+на которую опираются PlayOrder, PlayerController и интерфейс.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_memory
+"""
+import gc
+import tracemalloc
+from array import array
+
+from main.composition import Composition
+from main.linked_list import LinkedList, LinkedListItem
+from main.Playlist import PlayList
+
+TRACKS = 100_000
+
+
+class DictComposition(Composition):
+    """Composition с __dict__, как до введения __slots__."""
+
+
+class DictItem(LinkedListItem):
+    """LinkedListItem с __dict__, как до введения __slots__."""
+
+
+def track_fields(i: int) -> tuple[str, float, str]:
+    """Возвращает поля i-го синтетического трека."""
+    return f"Track {i:06d}", 180.0 + i % 60, f"/music/artist_{i // 120}/album_{i // 12}/track_{i:06d}.mp3"
+
+
+def build_dict_ring(fields):
+    """Кольцо из объектов с __dict__ без индексов — исходное представление."""
+    ring = LinkedList()
+    for title, duration, path in fields:
+        ring._link_after(ring.last, DictItem(DictComposition(title, duration, path)))
+    return ring
+
+
+def build_slotted_ring(fields):
+    """Кольцо из объектов с __slots__ без индексов."""
+    ring = LinkedList()
+    for title, duration, path in fields:
+        ring.append(Composition(title, duration, path))
+    return ring
+
+
+def build_playlist(fields):
+    """PlayList с __slots__ и хеш-индексами."""
+    playlist = PlayList()
+    for title, duration, path in fields:
+        playlist.add_song(Composition(title, duration, path))
+    return playlist
+
+
+def build_arrays(fields):
+    """Структура массивов: поля по слотам, таблица путей и кольцевые связи номерами слотов."""
+    titles, durations, path_ids = [], array("d"), array("l")
+    following, preceding = array("l"), array("l")
+    paths, path_table = [], {}
+    for slot, (title, duration, path) in enumerate(fields):
+        path_id = path_table.setdefault(path, len(paths))
+        if path_id == len(paths):
+            paths.append(path)
+        titles.append(title)
+        durations.append(duration)
+        path_ids.append(path_id)
+        following.append(slot + 1)
+        preceding.append(slot - 1)
+    if fields:
+        following[-1], preceding[0] = 0, len(fields) - 1
+    return titles, durations, path_ids, following, preceding, paths, path_table
+
+
+def measure(builder) -> float:
+    """Возвращает прирост памяти на один трек в байтах."""
+    fields = [track_fields(i) for i in range(TRACKS)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = builder(fields)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return (after - before) / TRACKS
+
+
+def main():
+    print(f"{TRACKS} треков; строки названий и путей общие для всех вариантов")
+    for name, builder in (("__dict__ (до)", build_dict_ring),
+                          ("__slots__", build_slotted_ring),
+                          ("PlayList + индексы", build_playlist),
+                          ("структура массивов", build_arrays)):
+        print(f"{name:>20}: {measure(builder):8.1f} байт/трек")
+
+
+if __name__ == "__main__":
+    main()
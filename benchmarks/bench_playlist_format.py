@@ -0,0 +1,67 @@
+"""
+Скорость разбора снимков плейлиста: JSON с отступами против бинарного формата.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_playlist_format
+"""
+import json
+import os
+import tempfile
+import time
+
+from main.composition import Composition
+from main.playlist_format import BinaryPlaylistReader
+from main.Playlist import PlayList
+from main.PlaylistJSONController import PlaylistJSONController
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def make_playlist(count: int) -> PlayList:
+    """Создает плейлист из count синтетических композиций."""
+    playlist = PlayList()
+    for i in range(count):
+        playlist.add_song(Composition(f"Track {i}", 180.0 + i % 60,
+                                      f"/home/user/Music/Artist {i // 120}/Album {i // 12}/{i:06d}.mp3"))
+    return playlist
+
+
+def best_of_three(action) -> float:
+    """Возвращает лучшее из трех время выполнения action в миллисекундах."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        action()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def parse_json(path: str) -> list[Composition]:
+    """Разбирает JSON-снимок в список композиций."""
+    with open(path, "rb") as f:
+        return [Composition(t["title"], t["duration"], t["path"]) for t in json.loads(f.read())]
+
+
+def main():
+    print("разбор — только чтение композиций, загрузка — с построением PlayList")
+    print(f"{'tracks':>8} | {'JSON, КБ':>9} | {'APL, КБ':>8} | {'разбор JSON, мс':>15} | {'разбор APL, мс':>14} | "
+          f"{'загрузка JSON, мс':>17} | {'загрузка APL, мс':>16}")
+    with tempfile.TemporaryDirectory() as folder:
+        json_controller = PlaylistJSONController(folder, library=False)
+        binary_controller = PlaylistJSONController(folder, file_format="binary", library=False)
+        for size in SIZES:
+            playlist = make_playlist(size)
+            json_controller.save_playlist("json", playlist)
+            binary_controller.save_playlist("binary", playlist)
+            json_path = json_controller.snapshot_file("json")
+            binary_path = binary_controller.snapshot_file("binary")
+            json_parse = best_of_three(lambda: parse_json(json_path))
+            binary_parse = best_of_three(lambda: list(BinaryPlaylistReader(binary_path)))
+            json_load = best_of_three(lambda: json_controller.load_playlist("json"))
+            binary_load = best_of_three(lambda: binary_controller.load_playlist("binary"))
+            print(f"{size:>8} | {os.path.getsize(json_path) / 1024:>9.0f} | {os.path.getsize(binary_path) / 1024:>8.0f} | "
+                  f"{json_parse:>15.1f} | {binary_parse:>14.1f} | {json_load:>17.1f} | {binary_load:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
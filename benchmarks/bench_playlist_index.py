@@ -0,0 +1,56 @@
+"""
+Сравнение линейного поиска LinkedList с индексированным PlayList.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_playlist_index
+"""
+import random
+import time
+
+from main.composition import Composition
+from main.linked_list import LinkedList
+from main.Playlist import PlayList
+
+SIZES = (1_000, 10_000, 100_000)
+OPERATIONS = 200
+
+
+def make_tracks(count: int) -> list[Composition]:
+    """Создает count синтетических композиций."""
+    return [Composition(f"Track {i}", 180.0 + i % 60, f"/music/album_{i // 12}/track_{i}.mp3")
+            for i in range(count)]
+
+
+def bench(container: LinkedList, targets: list[Composition]) -> float:
+    """
+    Измеряет время цикла «поиск → удаление → повторное добавление».
+
+    Returns:
+        float: Среднее время одной операции в микросекундах.
+    """
+    start = time.perf_counter()
+    for comp in targets:
+        assert comp in container
+        container.remove(comp)
+        container.append(comp)
+    return (time.perf_counter() - start) / len(targets) * 1e6
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'tracks':>8} | {'LinkedList, мкс/оп':>20} | {'PlayList, мкс/оп':>18} | {'ускорение':>9}")
+    for size in SIZES:
+        tracks = make_tracks(size)
+        targets = rng.sample(tracks, OPERATIONS)
+        old = LinkedList()
+        new = PlayList()
+        for comp in tracks:
+            old.append(comp)
+            new.add_song(comp)
+        old_time = bench(old, targets)
+        new_time = bench(new, targets)
+        print(f"{size:>8} | {old_time:>20.1f} | {new_time:>18.2f} | {old_time / new_time:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
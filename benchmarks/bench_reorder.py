@@ -0,0 +1,84 @@
+"""
+Перетаскивание композиции на DISTANCE позиций: пошаговые move_up против одного move_to.
+
+Пошаговый вариант повторяет прежнее поведение интерфейса: на каждом шаге
+композиция ищется по данным, переставляется и изменение фиксируется в журнале.
+Для move_to и move_many фиксируется одна запись. Сравниваются файловое
+хранилище с журналом и SQLite.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_reorder
+"""
+import random
+import tempfile
+import time
+
+from main.composition import Composition
+from main.Playlist import PlayList
+from main.storage import open_storage
+
+SIZE = 50_000
+DISTANCE = 5_000
+SELECTION = 100
+
+
+def make_playlist(storage) -> PlayList:
+    """Плейлист из SIZE композиций, сохраненный в хранилище."""
+    playlist = PlayList()
+    playlist.add_songs(storage.intern(Composition(f"Track {i}", 180.0, f"/music/album_{i // 12}/track_{i}.mp3"))
+                       for i in range(SIZE))
+    storage.save_playlist("big", playlist)
+    return playlist
+
+
+def step_by_step(storage, playlist: PlayList, start: int) -> float:
+    """DISTANCE вызовов move_up с записью каждого шага (мс)."""
+    composition = playlist.node_at(start).data
+    begin = time.perf_counter()
+    for index in range(start, start - DISTANCE, -1):
+        playlist.move_up(composition)
+        storage.record_move_up("big", playlist, index)
+    storage.close()
+    return (time.perf_counter() - begin) * 1000
+
+
+def single_move(storage, playlist: PlayList, start: int) -> float:
+    """Один move_to с одной записью (мс)."""
+    begin = time.perf_counter()
+    playlist.move_to(playlist.node_at(start), start - DISTANCE)
+    storage.record_move("big", playlist, [start], start - DISTANCE)
+    storage.close()
+    return (time.perf_counter() - begin) * 1000
+
+
+def many_move(storage, playlist: PlayList, rng: random.Random) -> float:
+    """move_many для SELECTION случайных композиций с одной записью (мс)."""
+    rows = sorted(rng.sample(range(SIZE), SELECTION))
+    begin = time.perf_counter()
+    playlist.move_many([playlist.node_at(row) for row in rows], 0)
+    storage.record_move("big", playlist, rows, 0)
+    storage.close()
+    return (time.perf_counter() - begin) * 1000
+
+
+def main():
+    print(f"Плейлист из {SIZE} композиций, перемещение на {DISTANCE} позиций")
+    print(f"{'хранилище':>9} | {'move_up x DISTANCE, мс':>22} | {'move_to, мс':>11} | "
+          f"{f'move_many({SELECTION}), мс':>18}")
+    start = SIZE // 2
+    for backend in ("files", "sqlite"):
+        results = []
+        for run in (lambda s, p: step_by_step(s, p, start), lambda s, p: single_move(s, p, start),
+                    lambda s, p: many_move(s, p, random.Random(1))):
+            with tempfile.TemporaryDirectory() as folder:
+                storage = open_storage(folder, backend, journal=True, compact_every=10 ** 9, file_format="binary")
+                playlist = make_playlist(storage)
+                storage.close()
+                storage = open_storage(folder, backend, journal=True, compact_every=10 ** 9, file_format="binary")
+                playlist = storage.load_playlist("big")
+                results.append(run(storage, playlist))
+        print(f"{backend:>9} | {results[0]:>22.0f} | {results[1]:>11.2f} | {results[2]:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Поиск композиций по названию и пути во всех плейлистах.
+
+Сравниваются линейный просмотр (поиск подстрок в названии и пути каждой
+композиции) и SearchIndex: время построения индекса, задержка запросов разных
+видов (префикс, несколько слов, опечатка) и стоимость инкрементального
+обновления при добавлении и удалении треков.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_search
+"""
+import random
+import statistics
+import time
+from itertools import accumulate
+
+from main.composition import Composition
+from main.Playlist import PlayList
+from main.search import SearchIndex, tokenize
+
+TRACKS = 200_000
+PLAYLISTS = 20
+WORDS = 30_000
+ARTISTS = 2_000
+REPEATS = 200
+SYLLABLES = tuple(consonant + vowel for consonant in "bdfgklmnprstvz" for vowel in "aeiou")
+
+
+def make_word(rng: random.Random) -> str:
+    """Синтетическое слово из 2-4 слогов."""
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def make_playlists(rng: random.Random, words: list[str]) -> dict[str, PlayList]:
+    """
+    Создает PLAYLISTS плейлистов с TRACKS композициями в сумме.
+
+    Слова названий выбираются из словаря с частотами по закону Ципфа, как в настоящих названиях.
+    """
+    weights = list(accumulate(1 / rank for rank in range(1, len(words) + 1)))
+    artists = [make_word(rng).capitalize() for _ in range(ARTISTS)]
+    playlists = {}
+    per_playlist = TRACKS // PLAYLISTS
+    for number in range(PLAYLISTS):
+        playlist = PlayList()
+        songs = []
+        for i in range(per_playlist):
+            artist = rng.choice(artists)
+            title = " ".join(rng.choices(words, cum_weights=weights, k=rng.randint(1, 4)))
+            path = f"/music/{artist}/album_{i % 12}/{i:03d} {title}.mp3"
+            songs.append(Composition(f"{artist} - {title}", 200.0, path))
+        playlist.add_songs(songs)
+        playlists[f"playlist {number}"] = playlist
+    return playlists
+
+
+def make_queries(words: list[str]) -> dict[str, str]:
+    """Запросы разных видов по словам словаря."""
+    frequent, rare = words[10], words[5_000]
+    typo = rare[:2] + rare[3] + rare[2] + rare[4:]  # перестановка двух букв
+    return {
+        "частый префикс": frequent[:2],
+        "префикс": rare[:4],
+        "два слова": f"album_3 {frequent[:3]}",
+        "полное слово": rare,
+        "опечатка": typo,
+        "нет совпадений": "qqqq",
+    }
+
+
+def linear_search(playlists: dict[str, PlayList], query: str, limit: int) -> list:
+    """Поиск без индекса: каждое слово запроса — подстрока названия или пути."""
+    terms = tokenize(query)
+    results = []
+    for name, playlist in playlists.items():
+        for composition in playlist.get_all_songs():
+            text = f"{composition.title} {composition.path}".lower()
+            if all(term in text for term in terms):
+                results.append((name, composition))
+                if len(results) >= limit:
+                    return results
+    return results
+
+
+def timings_us(search, query: str, repeats: int) -> tuple[float, float]:
+    """Медиана и 99-й перцентиль времени запроса (мкс)."""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        search(query)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    rng = random.Random(1)
+    words = list(dict.fromkeys(make_word(rng) for _ in range(WORDS)))
+    playlists = make_playlists(rng, words)
+    index = SearchIndex()
+    start = time.perf_counter()
+    for name, playlist in playlists.items():
+        index.add_playlist(name, playlist)
+    print(f"Треков: {len(index)}, построение индекса: {time.perf_counter() - start:.2f} с")
+    # первый запрос сортирует словарь
+    start = time.perf_counter()
+    index.search("warmup")
+    print(f"Сортировка словаря при первом запросе: {(time.perf_counter() - start) * 1000:.1f} мс\n")
+
+    print(f"{'запрос':>16} | {'найдено':>7} | {'индекс, мкс':>22} | {'линейно, мкс':>12}")
+    print(f"{'':>16} | {'':>7} | {'медиана':>10} {'p99':>11} | {'медиана':>12}")
+    for label, query in make_queries(words).items():
+        found = len(index.search(query, limit=100))
+        median, p99 = timings_us(lambda q: index.search(q, limit=100), query, REPEATS)
+        linear, _ = timings_us(lambda q: linear_search(playlists, q, 100), query, 3)
+        print(f"{label:>16} | {found:>7} | {median:>10.1f} {p99:>11.1f} | {linear:>12.0f}")
+
+    # инкрементальное обновление: индекс подписан на изменения плейлиста
+    playlist = playlists["playlist 0"]
+    added = [Composition(f"Новый трек {i}", 200.0, f"/new/{i}.mp3") for i in range(1_000)]
+    start = time.perf_counter()
+    playlist.add_songs(added)
+    add_us = (time.perf_counter() - start) / len(added) * 1e6
+    start = time.perf_counter()
+    for composition in added:
+        playlist.remove_song(composition)
+    remove_us = (time.perf_counter() - start) / len(added) * 1e6
+    print(f"\nДобавление трека в плейлист с индексом: {add_us:.1f} мкс, удаление: {remove_us:.1f} мкс")
+
+
+if __name__ == "__main__":
+    main()
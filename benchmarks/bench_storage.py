@@ -0,0 +1,87 @@
+"""
+Хранилища плейлистов: файл на плейлист (PlaylistJSONController) против базы SQLite.
+
+PLAYLISTS плейлистов по TRACKS_PER_PLAYLIST треков. Сравниваются время
+сохранения всех плейлистов, получения списка, загрузки всех плейлистов и
+MOVES перемещений композиции в большом плейлисте (у файлового хранилища —
+с журналом изменений).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_storage
+"""
+import os
+import random
+import tempfile
+import time
+
+from main.composition import Composition
+from main.Playlist import PlayList
+from main.storage import open_storage
+
+PLAYLISTS = 2_000
+TRACKS_PER_PLAYLIST = 50
+DISTINCT = 20_000
+BIG_PLAYLIST = 20_000
+MOVES = 1_000
+
+
+def timed(fn) -> tuple[float, object]:
+    """Время выполнения fn (с) и ее результат."""
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def save_all(storage, tracks, rng: random.Random):
+    """Сохраняет PLAYLISTS плейлистов (в SQLite — одной транзакцией)."""
+    def save():
+        for number in range(PLAYLISTS):
+            playlist = PlayList()
+            playlist.add_songs(storage.intern(Composition(*fields))
+                               for fields in rng.sample(tracks, TRACKS_PER_PLAYLIST))
+            storage.save_playlist(f"list {number}", playlist)
+
+    if hasattr(storage, "batch"):
+        with storage.batch():
+            save()
+    else:
+        save()
+
+
+def move_many(storage, tracks):
+    """Создает большой плейлист и фиксирует MOVES перемещений вверх."""
+    playlist = PlayList()
+    playlist.add_songs(storage.intern(Composition(*fields)) for fields in tracks[:BIG_PLAYLIST])
+    storage.save_playlist("big", playlist)
+    rng = random.Random(2)
+    start = time.perf_counter()
+    for _ in range(MOVES):
+        index = rng.randrange(1, BIG_PLAYLIST)
+        node = playlist.node_at(index)
+        playlist.move_up(node.data)
+        storage.record_move_up("big", playlist, index)
+    return (time.perf_counter() - start) / MOVES * 1e6
+
+
+def main():
+    tracks = [(f"Track {i:06d}", 180.0 + i % 60, f"/home/user/Music/Artist {i // 120}/{i:06d}.mp3")
+              for i in range(DISTINCT)]
+    print(f"{PLAYLISTS} плейлистов по {TRACKS_PER_PLAYLIST} треков; перемещения в плейлисте из {BIG_PLAYLIST}")
+    print(f"{'хранилище':>9} | {'сохранение, с':>13} | {'список, мс':>10} | {'загрузка, с':>11} | {'перемещение, мкс':>16}")
+    for backend in ("files", "sqlite"):
+        with tempfile.TemporaryDirectory() as folder:
+            storage = open_storage(folder, backend, journal=True, file_format="binary")
+            save_elapsed, _ = timed(lambda: save_all(storage, tracks, random.Random(1)))
+            move_us = move_many(storage, tracks)
+            storage.close()
+            storage = open_storage(folder, backend, journal=True, file_format="binary")
+            list_elapsed, names = timed(storage.list_playlists)
+            load_elapsed, _ = timed(storage.load_playlists)
+            assert len(names) == PLAYLISTS + 1
+            storage.close()
+            print(f"{backend:>9} | {save_elapsed:>13.2f} | {list_elapsed * 1000:>10.1f} | {load_elapsed:>11.2f} | "
+                  f"{move_us:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Запуск длинной WAV-записи: потоковое чтение, полная загрузка и отображение в память.
+
+Каждый способ проверяется в отдельном процессе, чтобы пиковая резидентная
+память (ru_maxrss) относилась только к нему:
+
+* mixer.music — потоковое чтение SDL;
+* mixer.Sound — файл целиком копируется в память;
+* mmap — MappedWavOutput: порции подаются из отображения.
+
+Замеряются время запуска, время перемотки в середину записи и пиковая
+память после PLAY_SECONDS секунд воспроизведения. Звук выводится через
+фиктивный драйвер SDL.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_wav_playback
+"""
+import multiprocessing
+import os
+import resource
+import struct
+import sys
+import tempfile
+import time
+
+MINUTES = 30
+PLAY_SECONDS = 2.0
+
+
+def write_long_wav(path: str, seconds: float):
+    """Записывает WAV 44,1 кГц / 16 бит / стерео с ненулевыми (не разреженными) данными."""
+    data_size = int(44100 * seconds) * 4
+    with open(path, "wb") as f:
+        f.write(b"RIFF" + struct.pack("<I", 36 + data_size) + b"WAVE")
+        f.write(b"fmt " + struct.pack("<IHHIIHH", 16, 1, 2, 44100, 44100 * 4, 4, 16))
+        f.write(b"data" + struct.pack("<I", data_size))
+        block = b"\x01\x00\xff\xff" * 2 ** 18
+        for offset in range(0, data_size, len(block)):
+            f.write(block[:data_size - offset])
+
+
+def peak_rss_mb() -> float:
+    """Пиковая резидентная память процесса в МБ."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux сообщает килобайты, macOS — байты
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+
+def measure(method: str, path: str, results):
+    """Запускает запись выбранным способом и кладет замеры в results."""
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    from pygame import mixer
+    from main.audio_output import MappedWavOutput
+    from main.composition import Composition
+    mixer.init()
+    output = MappedWavOutput(lambda: None) if method == "mmap" else None
+    baseline = peak_rss_mb()
+    begin = time.perf_counter()
+    if method == "mixer.music":
+        mixer.music.load(path)
+        mixer.music.play()
+    elif method == "mixer.Sound":
+        sound = mixer.Sound(path)
+        sound.play()
+    else:
+        output.play(Composition("long", MINUTES * 60.0, path))
+    started = (time.perf_counter() - begin) * 1000
+    time.sleep(PLAY_SECONDS)
+    begin = time.perf_counter()
+    if method == "mixer.music":
+        mixer.music.set_pos(MINUTES * 30.0)
+    elif method == "mixer.Sound":
+        # у Sound перемотки нет; запись уже в памяти целиком
+        pass
+    else:
+        output.set_pos(MINUTES * 30.0)
+    seek = (time.perf_counter() - begin) * 1000
+    time.sleep(PLAY_SECONDS)
+    results.put((method, started, seek, peak_rss_mb() - baseline))
+    if output is not None:
+        output.close()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "long.wav")
+        write_long_wav(path, MINUTES * 60)
+        print(f"WAV {MINUTES} мин, {os.path.getsize(path) / 2 ** 20:.0f} МБ")
+        print(f"{'способ':>11} | {'запуск, мс':>10} | {'перемотка, мс':>13} | {'прирост памяти, МБ':>18}")
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        for method in ("mixer.music", "mixer.Sound", "mmap"):
+            process = context.Process(target=measure, args=(method, path, results))
+            process.start()
+            method, started, seek, rss = results.get()
+            process.join()
+            print(f"{method:>11} | {started:>10.1f} | {seek:>13.2f} | {rss:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Построение обзора формы волны: пропускная способность в отсчетах в секунду.
+
+WAV на MINUTES минут (44,1 кГц / 16 бит / стерео, шум) обрабатывается
+compute_peaks — блоками из отображения файла в память с векторными
+min/max NumPy. Для сравнения те же пики считаются циклом Python по первым
+BASELINE_SECONDS секундам. Отдельно замеряется чтение готового обзора из
+кэша на диске.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_waveform
+"""
+import array
+import os
+import struct
+import tempfile
+import time
+
+import numpy as np
+
+from main.waveform import DEFAULT_BUCKETS, WaveformCache, compute_peaks
+
+MINUTES = 10
+BASELINE_SECONDS = 5
+RATE = 44100
+CHANNELS = 2
+
+
+def write_noise_wav(path: str, seconds: float):
+    """Записывает WAV 44,1 кГц / 16 бит / стерео со случайным шумом."""
+    samples = int(RATE * seconds) * CHANNELS
+    rng = np.random.default_rng(1)
+    with open(path, "wb") as f:
+        f.write(b"RIFF" + struct.pack("<I", 36 + samples * 2) + b"WAVE")
+        f.write(b"fmt " + struct.pack("<IHHIIHH", 16, 1, CHANNELS, RATE, RATE * CHANNELS * 2, CHANNELS * 2, 16))
+        f.write(b"data" + struct.pack("<I", samples * 2))
+        step = RATE * CHANNELS * 10
+        for start in range(0, samples, step):
+            f.write(rng.integers(-20000, 20000, min(step, samples - start), dtype=np.int16).tobytes())
+
+
+def python_peaks(path: str, seconds: float, buckets: int) -> tuple[list[int], list[int]]:
+    """Пики первых seconds секунд циклом Python (без NumPy)."""
+    samples = array.array("h")
+    with open(path, "rb") as f:
+        f.seek(44)
+        samples.frombytes(f.read(int(RATE * seconds) * CHANNELS * 2))
+    per_bucket = -(-len(samples) // buckets)
+    minima, maxima = [], []
+    for start in range(0, len(samples), per_bucket):
+        low = high = samples[start]
+        for value in samples[start:start + per_bucket]:
+            if value < low:
+                low = value
+            elif value > high:
+                high = value
+        minima.append(low)
+        maxima.append(high)
+    return minima, maxima
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "noise.wav")
+        write_noise_wav(path, MINUTES * 60)
+        total = RATE * MINUTES * 60 * CHANNELS
+        print(f"WAV {MINUTES} мин, {os.path.getsize(path) / 2 ** 20:.0f} МБ, {total / 1e6:.1f} млн отсчетов")
+
+        begin = time.perf_counter()
+        python_peaks(path, BASELINE_SECONDS, DEFAULT_BUCKETS * BASELINE_SECONDS // (MINUTES * 60) or 1)
+        elapsed = time.perf_counter() - begin
+        print(f"{'цикл Python':>22}: {RATE * BASELINE_SECONDS * CHANNELS / elapsed / 1e6:8.1f} млн отсчетов/с")
+
+        begin = time.perf_counter()
+        compute_peaks(path)
+        elapsed = time.perf_counter() - begin
+        print(f"{'NumPy, блоками из mmap':>22}: {total / elapsed / 1e6:8.1f} млн отсчетов/с ({elapsed * 1000:.0f} мс)")
+
+        cache = WaveformCache(os.path.join(folder, "waveforms"))
+        cache.get(path)
+        begin = time.perf_counter()
+        cache.get(path)
+        print(f"{'из кэша на диске':>22}: {(time.perf_counter() - begin) * 1000:8.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
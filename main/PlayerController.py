@@ -1,60 +1,710 @@
-from pygame import mixer
+import sys
+import threading
+import time
+from collections.abc import Callable
+
 from .composition import Composition
+from .position_clock import PositionClock
 
 # Класс управления плеером через pygame
 
+# pygame загружается при первом воспроизведении (см. _load_pygame):
+# импорт модуля и инициализация микшера заметно замедляют запуск
+mixer = None
+
+# События контроллера, на которые можно подписаться через subscribe()
+EVENTS = ("track_started", "track_ended", "position", "error")
+
+# За сколько секунд до ожидаемого конца трека начинать частые проверки:
+# длительность из заголовка файла может быть оценочной
+_END_LEAD = 1.0
+# Как часто проверять окончание, когда трек вот-вот закончится (с)
+_END_POLL = 0.01
+# Как часто проверять, если трек идет дольше заявленной длительности (с)
+_OVERRUN_POLL = 0.25
+
+
+def _load_pygame():
+    """Импортирует pygame при первом обращении."""
+    global mixer
+    if mixer is None:
+        from pygame import mixer as mixer_module
+        mixer = mixer_module
+
+
 class PlayerController:
-    """Обертка над pygame для управления музыкой"""
-    def __init__(self):
-        mixer.init()
+    """
+    Обертка над pygame для управления музыкой.
+
+    Окончание трека выводы сообщают потокобезопасным сигналом (см.
+    AudioOutput.on_end), а очередь событий pygame не используется: она
+    требует инициализированного видео и главного потока. Фоновый поток спит
+    до ближайшего интересного момента — следующего тика позиции или
+    ожидаемого конца трека, — а без воспроизведения не просыпается вовсе.
+    Подписчики получают события через subscribe():
+
+    * track_started(composition) — автоматически начался следующий трек;
+    * track_ended(composition) — трек доиграл до конца;
+    * position(position_ms) — позиция воспроизведения, не чаще position_interval;
+    * error(exception) — ошибка воспроизведения.
+
+    Плейлист и порядок воспроизведения принадлежат потоку, который их
+    изменяет (потоку интерфейса). Фоновый поток их не трогает: переход к
+    следующему треку (выбор узла и отметка текущего) передается владельцу
+    через dispatch, и track_ended вызывается там же. play, requeue, seek и
+    set_crossfade тоже вызываются владельцем: они определяют узлы в его
+    потоке, а загрузку и декодирование звука передают в tasks (без него
+    звук загружается сразу в вызывающем потоке). Поэтому track_started
+    приходит из потока владельца, если трек начался из очереди, или из
+    tasks, если трек пришлось загружать; остальные обработчики вызываются
+    из фонового потока.
+
+    В режиме gapless следующий трек плейлиста заранее ставится в очередь
+    микшера (mixer.music.queue) и начинается без паузы; без него следующий
+    трек загружается после окончания текущего.
+
+    Позиция ведется часами PositionClock с учетом перемотки и пауз.
+
+    Звук выводится одной из стратегий AudioOutput: по умолчанию потоково
+    через mixer.music; WAV в формате микшера подаются порциями из отображения
+    файла в память (MappedWavOutput), а с кэшем декодированного звука короткие
+    и уже декодированные треки воспроизводятся из памяти на отдельном канале.
+    Следующий трек ставится в очередь, только если он выводится тем же
+    способом, иначе он запускается после окончания текущего.
+
+    При crossfade > 0 треки воспроизводятся с плавным переходом
+    (CrossfadeOutput): следующий трек начинается за crossfade секунд до
+    конца текущего на второй деке, и сигнал окончания приходит в начале
+    перехода. Переход требует очереди, поэтому следующий трек готовится
+    заранее и без gapless.
+
+    Громкость вывода — громкость плеера, умноженная (при normalize) на
+    поправку трека из анализа громкости: Composition.gain или, если ее нет,
+    результат из кэша метаданных. Громкость задается при запуске трека и при
+    переходе к треку из очереди.
+
+    pygame и микшер инициализируются при первом вызове play(), поэтому
+    создание контроллера не замедляет запуск приложения.
+
+    Attributes:
+        gapless (bool): Воспроизводить плейлист без пауз между треками.
+        playlist (PlayList | None): Плейлист, из которого берется следующий трек.
+        order (PlayOrder | None): Порядок воспроизведения (перемешивание, повтор, очередь);
+            без него треки идут по кольцу плейлиста.
+        position_interval (float): Период событий position в секундах.
+        audio_cache (DecodedAudioCache | None): Кэш декодированного звука; None — только потоковый вывод.
+        cache_max_seconds (float): Треки не длиннее стольких секунд воспроизводятся из кэша.
+        mapped_wav (bool): Воспроизводить WAV из отображения файла в память.
+        volume (float): Громкость плеера от 0 до 1.
+        normalize (bool): Применять поправки громкости треков.
+        metadata (MetadataCache | None): Кэш метаданных с результатами анализа громкости.
+        crossfade (float): Длительность перехода между треками в секундах; 0 — без перехода.
+        fade_curve (str): Кривая перехода (см. crossfade.FADE_CURVES).
+        _dispatch (Callable): Выполняет функцию в потоке владельца плейлиста.
+        _tasks (BackgroundTasks | None): Очередь загрузки звука; задачи выполняются строго по порядку.
+        _play_epoch (int): Номер последнего запуска или остановки; устаревшие задачи загрузки пропускаются.
+        _queue_epoch (int): Номер последнего выбора следующего трека.
+        _loading (bool): Запуск трека передан в tasks и еще не выполнен.
+        _track_end (threading.Event): Вывод сообщил об окончании трека.
+        _pending (object | None): Метка перехода, переданного владельцу и еще не выполненного.
+        _outputs (list[AudioOutput]): Способы вывода в порядке предпочтения; последний — потоковый.
+        _output (AudioOutput | None): Вывод текущего трека.
+    """
+    def __init__(self, gapless: bool = False, position_interval: float = 0.25, audio_cache=None,
+                 cache_max_seconds: float = 60.0, mapped_wav: bool = True, metadata=None, normalize: bool = True,
+                 crossfade: float = 0.0, fade_curve: str = "equal_power",
+                 dispatch: Callable[..., None] | None = None, tasks=None):
         self.is_playing = False
         self.is_paused = False
         self.current_track = None
+        self.gapless = gapless
+        self.playlist = None
+        self.order = None
+        self.position_interval = position_interval
+        self.audio_cache = audio_cache
+        self.cache_max_seconds = cache_max_seconds
+        self.mapped_wav = mapped_wav
+        self.volume = 1.0
+        self.normalize = normalize
+        self.metadata = metadata
+        self.crossfade = crossfade
+        self.fade_curve = fade_curve
+        # без dispatch переход выполняется прямо в фоновом потоке
+        self._dispatch = dispatch or (lambda fn, *args: fn(*args))
+        self._tasks = tasks
+        self._play_epoch = 0
+        self._queue_epoch = 0
+        self._loading = False
+        self._track_end = threading.Event()
+        self._pending = None
+        self._outputs = []
+        self._output = None
+        self.clock = PositionClock()
+        self._last_position = 0.0
+        self._current_node = None
+        self._queued_node = None
+        self._queued_track = None
+        self._subscribers = {event: [] for event in EVENTS}
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._watcher = None
+
+    def _ensure_mixer(self):
+        """Загружает pygame, инициализирует микшер и запускает поток событий (один раз)."""
+        if self._watcher is not None:
+            return
+        _load_pygame()
+        mixer.init()
+        from .audio_output import CachedSoundOutput, MappedWavOutput, StreamOutput
+        from .crossfade import CrossfadeOutput
+        if self.audio_cache is not None:
+            self._outputs.append(CachedSoundOutput(self._signal_end, self.audio_cache, self.cache_max_seconds))
+        if self.mapped_wav:
+            self._outputs.append(MappedWavOutput(self._signal_end))
+        self._outputs.append(StreamOutput(self._signal_end))
+        # вывод с переходом создается последним (резервирует каналы 2 и 3), но
+        # выбирается первым; при crossfade = 0 он не принимает треков
+        self._outputs.insert(0, CrossfadeOutput(self._signal_end, self.crossfade, self.fade_curve, self.audio_cache))
+        self._output = self._outputs[-1]
+        self._watcher = threading.Thread(target=self._watch, name="player-events", daemon=True)
+        self._watcher.start()
+
+    def _signal_end(self):
+        """Сигнал окончания трека для выводов; вызывается из любого потока."""
+        self._track_end.set()
+        self._wake.set()
+
+    def subscribe(self, event: str, callback: Callable) -> Callable[[], None]:
+        """
+        Подписывает обработчик на событие контроллера.
+
+        Args:
+            event (str): Одно из EVENTS.
+            callback (Callable): Обработчик; вызывается из фонового потока.
+
+        Returns:
+            Callable[[], None]: Функция отмены подписки.
+
+        Raises:
+            ValueError: Если событие неизвестно.
+        """
+        if event not in self._subscribers:
+            raise ValueError(f"unknown event: {event}")
+        with self._lock:
+            self._subscribers[event].append(callback)
+        self._wake.set()
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers[event]:
+                    self._subscribers[event].remove(callback)
+
+        return unsubscribe
+
+    def _emit(self, event: str, *args):
+        """Вызывает обработчики события."""
+        for callback in list(self._subscribers[event]):
+            callback(*args)
+
+    def _fail(self, message: str, error: Exception):
+        """Сообщает об ошибке подписчикам, а без них печатает ее."""
+        if self._subscribers["error"]:
+            self._emit("error", error)
+        else:
+            print(f"{message}: {error}", file=sys.stderr)
+
+    def attach(self, playlist, order=None):
+        """
+        Задает плейлист, по которому определяется следующий трек.
+
+        Args:
+            playlist (PlayList | None): Плейлист или None.
+            order (PlayOrder | None): Порядок воспроизведения этого плейлиста.
+        """
+        with self._lock:
+            self.playlist = playlist
+            self.order = order
 
     def play(self, composition: Composition, target=0):
-        """Запуск новой композиции."""
+        """
+        Запуск новой композиции.
+
+        Вызывается владельцем плейлиста: узел композиции и следующий трек
+        определяются здесь, а загрузка и запуск выполняются в tasks.
+        """
         if not composition:
             return
 
+        with self._lock:
+            self._play_epoch += 1
+            self._queue_epoch += 1
+            self._loading = True
+            node = self._current_node = self._node_of(composition)
+            upcoming = self._upcoming() if self._prepares_next() else None
+            epochs = (self._play_epoch, self._queue_epoch)
+        self._submit(self._load, epochs, composition, node, upcoming, target)
+
+    def _submit(self, fn: Callable, *args):
+        """Передает загрузку звука в tasks или, без него, выполняет ее сразу."""
+        if self._tasks is None:
+            fn(*args)
+        else:
+            self._tasks.submit(fn, *args)
+
+    @staticmethod
+    def _prepare(output, composition: Composition):
+        """Загружает композицию в вывод заранее, без блокировки контроллера."""
         try:
-            mixer.music.load(composition.get_path())
-            mixer.music.play(start=target)
-            self.current_track = composition
-            self.is_playing = True
-            self.is_paused = False
+            output.prepare(composition)
+        except Exception:
+            pass  # об ошибке сообщат play или queue
+
+    def _load(self, epochs: tuple[int, int], composition: Composition, node, upcoming, target=0,
+              announce: bool = False):
+        """
+        Загружает и запускает композицию, затем готовит следующую; выполняется в tasks.
+
+        Args:
+            epochs (tuple[int, int]): Номера запуска и выбора следующего трека на момент вызова.
+            composition (Composition): Композиция.
+            node (Node | None): Узел композиции в плейлисте.
+            upcoming (Node | None): Узел, который ставится в очередь после нее.
+            target (float): Позиция начала в секундах.
+            announce (bool): Сообщить подписчикам track_started.
+        """
+        with self._lock:
+            if epochs[0] != self._play_epoch:
+                return
+            self._ensure_mixer()
+        self._prepare(self._output_for(composition), composition)
+        with self._lock:
+            if epochs[0] != self._play_epoch:
+                return
+            self._loading = False
+            if not self._start(composition, target):
+                return
+            self._current_node = node
+        self._wake.set()
+        if announce:
+            self._emit("track_started", composition)
+        self._load_next(epochs, upcoming)
+
+    def _prepares_next(self) -> bool:
+        """Проверяет, нужно ли заранее ставить в очередь следующий трек."""
+        return self.gapless or self.crossfade > 0
+
+    def _output_for(self, composition: Composition):
+        """Выбирает способ вывода композиции."""
+        for output in self._outputs:
+            if output.accepts(composition):
+                return output
+        return self._outputs[-1]
+
+    def _start(self, composition: Composition, target=0) -> bool:
+        """Загружает и запускает композицию; вызывается под блокировкой."""
+        output = self._output_for(composition)
+        try:
+            if output is not self._output:
+                self._output.stop()
+            self._output = output
+            output.play(composition, target)
+            output.set_volume(self._track_volume(composition))
         except Exception as e:
-            print(f"Ошибка при воспроизведении: {e}")
+            self.is_playing = False
+            self._fail("Ошибка при воспроизведении", e)
+            return False
+        # запуск останавливает прежний трек, и вывод успевает сообщить об
+        # окончании; это не окончание нового трека. Переход, еще не
+        # выполненный владельцем, тоже устарел, а очередь вывода сброшена
+        self._track_end.clear()
+        self._pending = None
+        self._queued_node = self._queued_track = None
+        self.current_track = composition
+        self.clock.stop()
+        self.clock.start(target * 1000.0)
+        self.is_playing = True
+        self.is_paused = False
+        return True
+
+    def _track_volume(self, composition: Composition) -> float:
+        """Вычисляет громкость вывода для композиции с учетом ее поправки."""
+        if not self.normalize:
+            return self.volume
+        gain = composition.gain
+        if gain is None and self.metadata is not None:
+            try:
+                info = self.metadata.lookup_loudness(composition.get_path())
+            except OSError:
+                info = None
+            if info is not None:
+                from .loudness import replay_gain
+                gain = composition.gain = replay_gain(info)
+        if gain is None:
+            return self.volume
+        from .loudness import gain_to_volume
+        return self.volume * gain_to_volume(gain)
+
+    def set_volume(self, volume: float):
+        """
+        Задает громкость плеера.
+
+        Args:
+            volume (float): Громкость от 0 до 1.
+        """
+        with self._lock:
+            self.volume = min(max(volume, 0.0), 1.0)
+            self.refresh_volume()
+
+    def set_normalize(self, enabled: bool):
+        """
+        Включает или выключает выравнивание громкости треков.
+
+        Args:
+            enabled (bool): Применять поправки громкости.
+        """
+        with self._lock:
+            self.normalize = enabled
+            self.refresh_volume()
+
+    def refresh_volume(self):
+        """Заново применяет громкость к текущему треку (например, после анализа громкости)."""
+        with self._lock:
+            if self.is_playing and self._output is not None:
+                self._output.set_volume(self._track_volume(self.current_track))
+
+    def set_crossfade(self, seconds: float, curve: str | None = None):
+        """
+        Задает длительность и кривую перехода между треками.
+
+        Текущий трек доигрывает прежним способом вывода; переход к следующему
+        пересчитывается, если он еще не начался.
+
+        Args:
+            seconds (float): Длительность перехода; 0 — без перехода.
+            curve (str | None): Кривая перехода; None — прежняя.
+
+        Raises:
+            ValueError: Если кривая неизвестна.
+        """
+        with self._lock:
+            if self._watcher is not None:
+                self._outputs[0].set_fade(seconds, curve)
+            else:
+                from .crossfade import FADE_CURVES
+                if curve is not None and curve not in FADE_CURVES:
+                    raise ValueError(f"unknown fade curve: {curve}")
+            self.crossfade = max(seconds, 0.0)
+            if curve is not None:
+                self.fade_curve = curve
+        self.requeue()
+
+    def seek(self, position_ms: float):
+        """
+        Перематывает текущий трек.
+
+        Вызывается владельцем плейлиста; перемотка выполняется в tasks.
+
+        Args:
+            position_ms (float): Новая позиция в миллисекундах.
+        """
+        with self._lock:
+            if not self.is_playing:
+                return
+            position_ms = max(0.0, min(position_ms, self.current_track.get_duration() * 1000.0))
+            # следующий трек нужен, если вывод не умеет перематывать и трек придется перезапустить
+            upcoming = self._upcoming() if self._prepares_next() else None
+            epochs = (self._play_epoch, self._queue_epoch)
+        self._submit(self._seek, epochs, position_ms, upcoming)
+
+    def _seek(self, epochs: tuple[int, int], position_ms: float, upcoming):
+        """Перематывает текущий трек или перезапускает его с нужного места; выполняется в tasks."""
+        from .audio_output import SeekUnsupported
+        with self._lock:
+            if epochs[0] != self._play_epoch or not self.is_playing:
+                return
+            try:
+                self._output.set_pos(position_ms / 1000.0)
+            except SeekUnsupported:
+                composition = self.current_track
+            else:
+                # set_pos не сбрасывает показание get_pos, поэтому запоминаем его
+                self.clock.start(position_ms, self._output.get_pos() or 0)
+                composition = None
+        if composition is not None:
+            # вывод не умеет перематывать этот трек: перезапускаем его с нужного места
+            self._prepare(self._output_for(composition), composition)
+            with self._lock:
+                if epochs[0] != self._play_epoch or self.current_track is not composition:
+                    return
+                paused = self.is_paused
+                if not self._start(composition, position_ms / 1000.0):
+                    return
+                if paused:
+                    self._output.pause()
+                    self.is_paused = True
+                    self.clock.pause()
+            self._load_next(epochs, upcoming)
+        self._wake.set()
+
+    def requeue(self):
+        """
+        Заново ставит в очередь следующий трек.
+
+        Вызывается владельцем плейлиста после его изменения (добавления,
+        удаления, перемещения), чтобы после текущего трека заиграл актуальный
+        следующий. Следующий узел выбирается здесь, а готовится в tasks.
+        """
+        with self._lock:
+            if not self._prepares_next() or not (self.is_playing or self._loading):
+                return
+            self._queue_epoch += 1
+            upcoming = self._upcoming()
+            epochs = (self._play_epoch, self._queue_epoch)
+        self._submit(self._load_next, epochs, upcoming)
+
+    def _node_of(self, composition: Composition):
+        """Находит узел композиции в подключенном плейлисте (сначала проверяет current_node)."""
+        if self.playlist is None:
+            return None
+        node = self.playlist.current_node
+        if node is not None and node.data is composition:
+            return node
+        return self.playlist.find_node(composition)
+
+    def _upcoming(self):
+        """Возвращает узел, который должен играть после текущего; вызывается владельцем плейлиста."""
+        if self.order is not None:
+            return self.order.peek(auto=True)
+        node = self._current_node
+        if node is not None and node.next_item is not None:
+            return node.next_item
+        # Текущий узел удален из плейлиста: remove_song уже сдвинул current_node вперед
+        return self.playlist.current_node if self.playlist is not None else None
+
+    def _load_next(self, epochs: tuple[int, int], node):
+        """
+        Готовит узел и ставит его в очередь текущего вывода; выполняется в tasks.
+
+        Декодирование идет без блокировки контроллера; если за это время
+        трек сменился или следующий выбран заново, результат отбрасывается.
+
+        Args:
+            epochs (tuple[int, int]): Номера запуска и выбора следующего трека на момент выбора узла.
+            node (Node | None): Следующий узел; None — очередь очищается.
+        """
+        def current() -> bool:
+            return epochs == (self._play_epoch, self._queue_epoch) and self.is_playing and self._pending is None
+
+        with self._lock:
+            if not current():
+                return
+            output = self._output
+            if node is None or self._output_for(node.data) is not output:
+                self._queued_node = self._queued_track = None
+                output.clear_queue()
+                return
+        self._prepare(output, node.data)
+        with self._lock:
+            if not current() or self._output is not output:
+                return
+            self._queued_node = self._queued_track = None
+            try:
+                output.queue(node.data)
+            except Exception as e:
+                self._fail("Ошибка при подготовке следующего трека", e)
+                return
+            self._queued_node = node
+            self._queued_track = node.data
+
+    def _make_current(self, node):
+        """Отмечает начавшийся узел текущим в порядке воспроизведения или плейлисте."""
+        if self.order is not None:
+            self.order.select(node)
+        elif self.playlist is not None and node.next_item is not None:
+            self.playlist.current_node = node
+
+    def poll(self) -> bool:
+        """
+        Проверяет, закончился ли трек, и передает переход владельцу плейлиста.
+
+        Если микшер уже переключился на трек из очереди, громкость и часы
+        обновляются сразу; плейлист, порядок воспроизведения и следующая
+        очередь меняются в _advance через dispatch. Пока переход не выполнен,
+        новые окончания не обрабатываются.
+
+        Returns:
+            bool: True, если окончание трека обработано.
+        """
+        with self._lock:
+            if not self.is_playing or self._pending is not None or self._loading:
+                return False
+            self._output.check_end()
+            if not self._track_end.is_set():
+                return False
+            self._track_end.clear()
+            finished = self.current_track
+            node, track = self._queued_node, self._queued_track
+            self._queued_node = self._queued_track = None
+            if track is not None:
+                # микшер уже переключился на трек из очереди
+                self.current_track = track
+                self._output.set_volume(self._track_volume(track))
+                self.clock.start(0.0)
+                self._current_node = node
+            token = self._pending = object()
+        self._dispatch(self._advance, token, finished, node)
+        return True
+
+    def _advance(self, token: object, finished: Composition, node):
+        """
+        Выполняет переход к следующему треку в потоке владельца плейлиста.
+
+        Здесь только выбираются узлы: трек из очереди уже играет, а трек,
+        которого в очереди не было, и следующий за ним загружаются в tasks.
+
+        Args:
+            token (object): Метка перехода из poll(); устаревший переход пропускается.
+            finished (Composition): Доигравший трек.
+            node (Node | None): Начавшийся узел из очереди или None, если следующий трек нужно запустить.
+        """
+        with self._lock:
+            if self._pending is not token:
+                # воспроизведение перезапущено или остановлено раньше
+                return
+            self._pending = None
+            queued = node is not None
+            if not queued:
+                node = self._upcoming() if self.playlist is not None else None
+            if node is None:
+                self.is_playing = False
+                self.is_paused = False
+                self.clock.stop()
+            else:
+                self._make_current(node)
+                self._current_node = node
+                if not queued:
+                    self._play_epoch += 1
+                    self._loading = True
+                self._queue_epoch += 1
+                upcoming = self._upcoming() if self._prepares_next() else None
+                epochs = (self._play_epoch, self._queue_epoch)
+        self._wake.set()
+        self._emit("track_ended", finished)
+        if node is None:
+            return
+        if queued:
+            self._emit("track_started", self.current_track)
+            self._submit(self._load_next, epochs, upcoming)
+        else:
+            self._submit(self._load, epochs, node.data, node, upcoming, 0, True)
+
+    def _next_wakeup(self) -> float | None:
+        """
+        Вычисляет, через сколько секунд потоку событий нужно проснуться.
+
+        Returns:
+            float | None: Время ожидания или None, если ждать нечего.
+        """
+        if not self.is_playing or self.is_paused:
+            return None
+        remaining = self.current_track.get_duration() - self.get_position_ms() / 1000.0
+        # с переходом следующий трек начинается раньше конца текущего
+        remaining -= self._output.overlap(self.current_track)
+        if remaining > _END_LEAD:
+            timeout = remaining - _END_LEAD
+        elif remaining > -_END_LEAD:
+            timeout = _END_POLL
+        else:
+            # трек идет заметно дольше заявленной длительности
+            timeout = _OVERRUN_POLL
+        if self._subscribers["position"]:
+            timeout = min(timeout, max(self._last_position + self.position_interval - time.monotonic(), 0))
+        return timeout
+
+    def _watch(self):
+        """Цикл фонового потока: ждет ближайшего события и обрабатывает его."""
+        while True:
+            with self._lock:
+                timeout = self._next_wakeup()
+            self._wake.wait(timeout)
+            self._wake.clear()
+            if self._closed:
+                return
+            self.poll()
+            now = time.monotonic()
+            if self.is_playing and not self.is_paused and self._subscribers["position"] \
+                    and now - self._last_position >= self.position_interval * 0.9:
+                self._last_position = now
+                self._emit("position", self.get_position_ms())
+
+    def get_position_ms(self) -> float:
+        """
+        Возвращает позицию воспроизведения текущего трека.
+
+        Позиция интерполируется по монотонному времени между обновлениями
+        микшера, поэтому ее можно запрашивать с частотой отрисовки.
+
+        Returns:
+            float: Позиция в миллисекундах (0, если ничего не играет).
+        """
+        if not self.is_playing:
+            return 0.0
+        mixer_ms = self._output.get_pos()
+        if mixer_ms is not None:
+            self.clock.sync(mixer_ms)
+        return min(self.clock.position_ms(), self.current_track.get_duration() * 1000.0)
 
     def get_pos(self) -> int:
-        """Получение длинны композиции"""
+        """Получение позиции композиции в процентах"""
         if not self.is_playing:
             return 0
         length = self.current_track.get_duration()
-        pos = mixer.music.get_pos() / 1000.0
-        percent = min(int(pos / length * 100), 100)
-        return percent
+        if not length:
+            return 0
+        return min(int(self.get_position_ms() / 10 / length), 100)
 
     def stop(self):
         """Остановка проигрывания"""
-        mixer.music.stop()
-        self.is_playing = False
-        self.is_paused = False
-        self.current_track = None
+        with self._lock:
+            if self._watcher is not None:
+                self._output.stop()
+            self._play_epoch += 1
+            self._loading = False
+            self._track_end.clear()
+            self._pending = None
+            self.is_playing = False
+            self.is_paused = False
+            self.current_track = None
+            self.clock.stop()
+            self._current_node = self._queued_node = self._queued_track = None
+        self._wake.set()
 
     def pause(self):
         """Пауза и возобновление."""
         if not self.is_playing:
             return  # Нечего ставить на паузу
 
-        if not self.is_paused:
-            mixer.music.pause()
-            self.is_paused = True
-            return
-        if self.is_paused:
-            mixer.music.unpause()
-            self.is_paused = False
-            return
+        with self._lock:
+            if not self.is_paused:
+                self._output.pause()
+                self.is_paused = True
+                self.clock.pause()
+            else:
+                self._output.unpause()
+                self.is_paused = False
+                self.clock.resume()
+        self._wake.set()
+
+    def close(self):
+        """Останавливает фоновый поток событий и освобождает способы вывода."""
+        self._closed = True
+        self._wake.set()
+        if self._watcher is not None:
+            self._watcher.join()
+        for output in self._outputs:
+            output.close()
 
     @staticmethod
     def is_busy() -> bool:
-        return mixer.music.get_busy()
\ No newline at end of file
+        return mixer is not None and bool(mixer.get_init()) and mixer.music.get_busy()
@@ -7,9 +7,17 @@ class PlayList(LinkedList):
     Плейлист — кольцевой двусвязный список музыкальных композиций.
 
     Наследует LinkedList и добавляет логику управления текущей композицией.
+    Поддерживает хеш-индексы узлов по пути, названию и идентичности узла,
+    поэтому поиск и удаление композиций выполняются за O(1).
 
     Attributes:
         current_node (LinkedListItem | None): Узел текущей композиции.
+        _nodes (set[LinkedListItem]): Множество узлов плейлиста.
+        _by_path (dict[str, dict[LinkedListItem, None]]): Узлы, сгруппированные по пути к файлу;
+            узел в группе — ключ, поэтому удаление из группы выполняется за O(1).
+        _by_title (dict[str, dict[LinkedListItem, None]]): Узлы, сгруппированные по названию.
+        _observers (list): Наблюдатели с методами on_node_added(node), on_node_removed(node)
+            и on_node_moved(node).
     """
     def __init__(self):
         """
@@ -17,6 +25,83 @@ class PlayList(LinkedList):
         """
         super().__init__(None)
         self.current_node = None
+        self._nodes = set()
+        self._by_path = {}
+        self._by_title = {}
+        self._observers = []
+
+    def add_observer(self, observer):
+        """
+        Подписывает наблюдателя на добавление, удаление и перемещение узлов.
+
+        Args:
+            observer: Объект с методами on_node_added(node), on_node_removed(node) и on_node_moved(node).
+        """
+        self._observers.append(observer)
+
+    def remove_observer(self, observer):
+        """
+        Отписывает наблюдателя.
+
+        Args:
+            observer: Ранее подписанный наблюдатель.
+        """
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def _index_node(self, node: LinkedListItem):
+        """Добавляет узел в индексы по пути и названию."""
+        data = node.data
+        if isinstance(data, Composition):
+            self._by_path.setdefault(data.path, {})[node] = None
+            self._by_title.setdefault(data.title, {})[node] = None
+
+    def _unindex_node(self, node: LinkedListItem):
+        """Удаляет узел из индексов по пути и названию."""
+        data = node.data
+        if not isinstance(data, Composition):
+            return
+        for index, key in ((self._by_path, data.path), (self._by_title, data.title)):
+            bucket = index.get(key)
+            if bucket is None:
+                continue
+            bucket.pop(node, None)
+            if not bucket:
+                del index[key]
+
+    def _link_after(self, previous: LinkedListItem | None, node: LinkedListItem, head: bool = False):
+        """Встраивает узел в кольцо и регистрирует его в индексах."""
+        super()._link_after(previous, node, head)
+        self._nodes.add(node)
+        self._index_node(node)
+        for observer in self._observers:
+            observer.on_node_added(node)
+
+    def _unlink(self, node: LinkedListItem):
+        """Исключает узел из кольца и из индексов."""
+        self._unindex_node(node)
+        self._nodes.discard(node)
+        super()._unlink(node)
+        for observer in self._observers:
+            observer.on_node_removed(node)
+
+    def _find(self, data) -> LinkedListItem | None:
+        """
+        Ищет узел через индексы.
+
+        Узел ищется по идентичности, Composition — по пути с проверкой равенства,
+        строка — по названию или пути. Для прочих данных (например, длительности)
+        выполняется линейный поиск базового класса.
+        """
+        if isinstance(data, LinkedListItem):
+            return data if data in self._nodes else None
+        if isinstance(data, Composition):
+            return self._first_in_order([node for node in self._by_path.get(data.path, ()) if node.data == data])
+        if isinstance(data, str):
+            # совпадения по названию и по пути сравниваются по позиции в плейлисте
+            matches = (self.find_by_title(data), self.find_by_path(data))
+            return self._first_in_order([node for node in matches if node is not None])
+        return super()._find(data)
 
     def add_song(self, composition: LinkedListItem):
         """
@@ -31,6 +116,16 @@ class PlayList(LinkedList):
         if self.current_node is None:
             self.current_node = self.first_item
 
+    def add_songs(self, compositions):
+        """
+        Добавляет пакет композиций в конец плейлиста.
+
+        Args:
+            compositions (Iterable[Composition]): Композиции для добавления.
+        """
+        for composition in compositions:
+            self.add_song(composition)
+
     def remove_song(self, composition: LinkedListItem | Composition):
         """
         Удаляет композицию из плейлиста.
@@ -55,8 +150,7 @@ class PlayList(LinkedList):
             else:
                 self.current_node = None
 
-        # Вызов твоей функции remove, которая обновляет связи и _head
-        self.remove(composition)
+        self._unlink(node_to_remove)
 
     def next_song(self):
         """
@@ -93,60 +187,164 @@ class PlayList(LinkedList):
             return self.current_node.data
         return None
 
+    def _move_after(self, node: LinkedListItem, previous: LinkedListItem, head: bool = False):
+        """Переносит узел и уведомляет наблюдателей; индексы по пути и названию не меняются."""
+        super()._move_after(node, previous, head)
+        for observer in self._observers:
+            observer.on_node_moved(node)
+
     def move_up(self, composition: Composition):
         """
         Перемещает композицию на одну позицию вверх в плейлисте.
 
-        Обменивает данные узлов, не изменяя ссылки.
+        Узел переставляется в кольце, поэтому текущая композиция и ссылки на
+        узлы (очередь воспроизведения, выделение) следуют за треком. Первая
+        композиция меняется местами с последней.
 
         Args:
             composition (Composition): Объект композиции для перемещения.
         """
         node = self.find_node(composition)
-        if node and node.previous_item:
-            prev_node = node.previous_item
-            # меняем местами данные
-            node.data, prev_node.data = prev_node.data, node.data
-            if self.current_node == node:
-                self.current_node = node
+        if node is None or self._size < 2:
+            return
+        if node is self._head:
+            self._swap_ends()
+            return
+        previous = node.previous_item
+        self._move_after(node, previous.previous_item, head=previous is self._head)
 
     def move_down(self, composition: Composition):
         """
         Перемещает композицию на одну позицию вниз в плейлисте.
 
-        Обменивает данные узлов, не изменяя ссылки.
+        Последняя композиция меняется местами с первой.
 
         Args:
             composition (Composition): Объект композиции для перемещения.
         """
         node = self.find_node(composition)
-        if node and node.next_item:
-            next_node = node.next_item
-            # меняем местами данные
-            node.data, next_node.data = next_node.data, node.data
-            if self.current_node == node:
-                self.current_node = node
+        if node is None or self._size < 2:
+            return
+        if node is self.last:
+            self._swap_ends()
+            return
+        self._move_after(node, node.next_item)
+
+    def _swap_ends(self):
+        """Меняет местами первую и последнюю композиции."""
+        first, last = self._head, self.last
+        self._move_after(first, last)
+        self._move_after(last, first, head=True)
+
+    def move_to(self, composition: LinkedListItem | Composition, index: int):
+        """
+        Перемещает композицию так, чтобы она оказалась на позиции index.
+
+        Узел переставляется в кольце за O(1); позиции определяются по
+        позиционному индексу за O(log n).
+
+        Args:
+            composition (LinkedListItem | Composition): Узел или композиция.
+            index (int): Новая позиция (может быть отрицательной).
+
+        Raises:
+            ValueError: Если композиции нет в плейлисте.
+            IndexError: Если позиция вне диапазона.
+        """
+        self.move_many([composition], index)
+
+    def move_many(self, compositions, index: int):
+        """
+        Перемещает несколько композиций подряд, начиная с позиции index.
+
+        Композиции сохраняют взаимный порядок, в котором они стояли в
+        плейлисте (а не порядок аргумента), поэтому перетаскивание
+        выделенного диапазона не меняет его.
+
+        Args:
+            compositions (Iterable[LinkedListItem | Composition]): Узлы или композиции.
+            index (int): Позиция первой перемещенной композиции после перемещения.
+
+        Raises:
+            ValueError: Если какой-либо композиции нет в плейлисте.
+            IndexError: Если позиция вне диапазона.
+        """
+        nodes = []
+        for composition in compositions:
+            node = self.find_node(composition)
+            if node is None:
+                raise ValueError("composition not found")
+            nodes.append(node)
+        nodes = list({id(node): node for node in nodes}.values())
+        size, count = self._size, len(nodes)
+        if index < 0:
+            index += size - count + 1
+        if index < 0 or index > size - count:
+            raise IndexError("index out of range")
+        if count == 0 or count == size:
+            return
+        indexed = sorted((self.index_of(node), node) for node in nodes)
+        # узел, который после перемещения окажется перед первым перемещенным:
+        # ищем rank-й из оставшихся узлов, пропуская перемещаемые
+        rank = index - 1 if index > 0 else size - count - 1
+        position = rank
+        for moved, _ in indexed:
+            if moved <= position:
+                position += 1
+        if all(moved == index + offset for offset, (moved, _) in enumerate(indexed)):
+            return  # композиции уже стоят на месте
+        previous = self.node_at(position)
+        for number, (_, node) in enumerate(indexed):
+            self._move_after(node, previous, head=index == 0 and number == 0)
+            previous = node
 
     def find_node(self, data: Composition) -> LinkedListItem | None:
         """
-        Ищет узел по данным.
+        Ищет узел по данным за O(1) с помощью индексов.
 
         Args:
-            data (Composition): Данные для поиска.
+            data (Composition | LinkedListItem | str): Композиция, узел, название или путь.
 
         Returns:
             LinkedListItem | None: Узел с соответствующими данными или None, если не найден.
         """
-        current = self.first_item
-        if not current:
+        return self._find(data)
+
+    def _first_in_order(self, nodes) -> LinkedListItem | None:
+        """
+        Возвращает узел, который стоит в плейлисте раньше остальных.
+
+        Позиции дубликатов берутся из позиционного индекса за O(log n) на узел.
+        """
+        if not nodes:
             return None
-        while True:
-            if current.data == data:
-                return current
-            current = current.next_item
-            if current == self.first_item:
-                break
-        return None
+        if len(nodes) == 1:
+            return next(iter(nodes))
+        return min(nodes, key=self.index_of)
+
+    def find_by_path(self, path: str) -> LinkedListItem | None:
+        """
+        Ищет узел по пути к аудиофайлу.
+
+        Args:
+            path (str): Путь к файлу.
+
+        Returns:
+            LinkedListItem | None: Первый в порядке плейлиста узел с таким путем или None.
+        """
+        return self._first_in_order(self._by_path.get(path))
+
+    def find_by_title(self, title: str) -> LinkedListItem | None:
+        """
+        Ищет узел по названию композиции.
+
+        Args:
+            title (str): Название трека.
+
+        Returns:
+            LinkedListItem | None: Первый в порядке плейлиста узел с таким названием или None.
+        """
+        return self._first_in_order(self._by_title.get(title))
 
     def get_all_songs(self) -> list[Composition]:
         """
@@ -1,26 +1,88 @@
 import json
 import os
+import zlib
+from .library import TrackLibrary
+from .playlist_format import BinaryPlaylistReader, encode_playlist, encode_references
 from .Playlist import PlayList
 from .composition import Composition
+from .storage import PlaylistStorage
 
-class PlaylistJSONController:
+class PlaylistJSONController(PlaylistStorage):
     """
     Контроллер для сохранения и загрузки плейлистов в отдельные JSON-файлы.
 
+    В режиме журнала каждое изменение плейлиста дописывается одной строкой
+    в файл playlist_<имя>.journal рядом со снимком, а полный снимок
+    перезаписывается только при периодическом уплотнении журнала.
+
+    Снимок может храниться в JSON (.json) или в компактном бинарном формате (.apl).
+    Файл в другом формате при загрузке прозрачно переводится в выбранный.
+
+    С общей библиотекой треков (library.jsonl в папке плейлистов) снимки и журнал
+    хранят только номера треков библиотеки, а одинаковые файлы разных плейлистов
+    загружаются в один объект Composition. Снимки, где треки записаны целиком,
+    читаются как прежде и при загрузке переводятся на ссылки.
+
+    Если задан writer, запись файлов выполняется им (например, в фоновом потоке),
+    а плейлист читается только в вызывающем потоке, поэтому его можно
+    продолжать изменять, не дожидаясь окончания записи.
+
+    В режиме read_only папка только читается: она не создается, поврежденные
+    журналы и библиотека не обрезаются и не удаляются, а плейлисты в старом
+    формате не пересохраняются. Попытка записи вызывает PermissionError.
+
     Attributes:
         folder (str): Папка для хранения JSON-файлов плейлистов.
+        file_format (str): Формат снимков: "json" или "binary".
+        library (TrackLibrary | None): Общая библиотека треков; None — треки хранятся в каждом плейлисте.
+        journal (bool): Включен ли режим журнала изменений.
+        compact_every (int): Число записей журнала, после которого выполняется уплотнение.
+        _journal_sizes (dict[str, int]): Текущее число записей в журнале каждого плейлиста.
+        writer (BackgroundTasks | None): Исполнитель операций записи; None — запись сразу.
+        _snapshot_crc (dict[str, int]): Контрольная сумма текущего снимка каждого плейлиста.
+        read_only (bool): Папка только читается.
     """
-    def __init__(self, folder="playlists"):
+    FORMATS = {"json": ".json", "binary": ".apl"}
+
+    def __init__(self, folder="playlists", journal=False, compact_every=500, file_format="json", writer=None,
+                 library=True, read_only=False):
         """
         Инициализация контроллера.
 
-        Создает папку для хранения файлов плейлистов, если она не существует.
+        Создает папку для хранения файлов плейлистов, если она не существует
+        (кроме режима read_only).
 
         Args:
            folder (str): Папка для хранения JSON-файлов плейлистов. По умолчанию "playlists".
+           journal (bool): Включить журнал изменений вместо полной перезаписи. По умолчанию False.
+           compact_every (int): Размер журнала, после которого он уплотняется в снимок.
+           file_format (str): Формат снимков: "json" или "binary". По умолчанию "json".
+           writer (BackgroundTasks | None): Исполнитель операций записи с методом submit(fn, *args).
+           library (bool): Хранить треки в общей библиотеке, а в плейлистах — ссылки на них.
+           read_only (bool): Только читать папку, ничего в ней не изменяя.
+
+        Raises:
+            ValueError: Если формат неизвестен.
         """
+        if file_format not in self.FORMATS:
+            raise ValueError(f"unknown playlist format: {file_format}")
         self.folder = folder
-        self.ensure_dir()
+        self.file_format = file_format
+        self.journal = journal
+        self.compact_every = compact_every
+        self.writer = writer
+        self._journal_sizes = {}
+        self._snapshot_crc = {}
+        self.read_only = read_only
+        if not read_only:
+            self.ensure_dir()
+        self.library = TrackLibrary(os.path.join(folder, "library.jsonl"), read_only) if library else None
+
+    def _write(self, fn, *args):
+        """Выполняет операцию записи; в режиме read_only запись запрещена."""
+        if self.read_only:
+            raise PermissionError(f"playlist folder is opened read-only: {self.folder}")
+        super()._write(fn, *args)
 
     def ensure_dir(self):
         """
@@ -42,50 +104,368 @@ class PlaylistJSONController:
         safe_name = name.replace(" ", "_")
         return os.path.join(self.folder, f"playlist_{safe_name}.json")
 
+    def snapshot_file(self, name: str, file_format: str | None = None):
+        """
+        Генерирует путь к файлу снимка плейлиста в указанном формате.
+
+        Args:
+            name (str): Имя плейлиста.
+            file_format (str | None): Формат снимка; по умолчанию — формат контроллера.
+
+        Returns:
+            str: Полный путь к файлу снимка.
+        """
+        extension = self.FORMATS[file_format or self.file_format]
+        return self.playlist_file(name)[:-len(".json")] + extension
+
+    def journal_file(self, name: str):
+        """
+        Генерирует путь к файлу журнала изменений плейлиста.
+
+        Args:
+            name (str): Имя плейлиста.
+
+        Returns:
+            str: Полный путь к файлу журнала.
+        """
+        return self.playlist_file(name)[:-len(".json")] + ".journal"
+
+    def _track_record(self, composition: Composition) -> dict:
+        """Преобразует композицию в словарь для сериализации: ссылку на библиотеку или полную запись."""
+        if self.library is None:
+            return self._full_record(composition)
+        return {"id": self.library.track_id(composition)}
+
+    def _composition_from_record(self, record: dict) -> Composition:
+        """
+        Создает композицию из сериализованного словаря.
+
+        Raises:
+            ValueError: Если запись ссылается на библиотеку, а она отключена.
+        """
+        if "id" in record:
+            if self.library is None:
+                raise ValueError("playlist references the track library")
+            return self.library.get(record["id"])
+        if self.library is not None:
+            return self.library.add(record["title"], record["duration"], record["path"])
+        return Composition(record["title"], record["duration"], record["path"])
+
+    def _encode(self, playlist: PlayList) -> bytes:
+        """Сериализует плейлист в формат контроллера."""
+        if self.file_format == "binary":
+            if self.library is not None:
+                return encode_references(self.library.track_id(node.data) for node in playlist)
+            return encode_playlist(node.data for node in playlist)
+        data = [self._track_record(c) for c in playlist.get_all_songs()]
+        return json.dumps(data, indent=4, ensure_ascii=False).encode("utf-8")
+
+    def _save_library(self):
+        """Дописывает новые треки библиотеки раньше записей, которые на них ссылаются."""
+        if self.library is not None:
+            text = self.library.take_unsaved()
+            if text:
+                self._write(self.library.append_records, text)
+
     def save_playlist(self, name: str, playlist: PlayList):
         """
-        Сохраняет плейлист в отдельный JSON-файл.
+        Сохраняет плейлист в отдельный файл.
+
+        Запись атомарна: снимок пишется во временный файл и подменяет старый
+        через os.replace, после чего журнал изменений удаляется.
 
         Args:
             name (str): Имя плейлиста.
             playlist (PlayList): Объект плейлиста для сохранения.
         """
-        data = [{"title": c.title, "duration": c.duration, "path": c.path} for c in playlist.get_all_songs()]
-        with open(self.playlist_file(name), "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        payload = self._encode(playlist)
+        self._snapshot_crc[name] = zlib.crc32(payload)
+        self._journal_sizes[name] = 0
+        self._save_library()
+        self._write(self._write_snapshot, name, payload)
+
+    def _write_snapshot(self, name: str, payload: bytes):
+        """Атомарно записывает снимок и удаляет устаревший журнал."""
+        path = self.snapshot_file(name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        # Если сбой произойдет до удаления журнала, он будет отброшен при загрузке по контрольной сумме
+        journal_path = self.journal_file(name)
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
+
+    def _write_journal(self, name: str, text: str, new: bool):
+        """
+        Дописывает строки в журнал (new — начать журнал заново) и сбрасывает их на диск.
+
+        Журнал пишется в двоичном режиме: строки всегда заканчиваются одним
+        байтом b"\n" (в текстовом режиме Windows записала бы "\r\n"), и
+        _replay_journal считает длину корректной части по байтам файла.
+        """
+        with open(self.journal_file(name), "wb" if new else "ab") as f:
+            f.write(text.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _append_journal(self, name: str, playlist: PlayList, entry: dict):
+        """
+        Дописывает операцию в журнал плейлиста и уплотняет его при переполнении.
+
+        Первая строка журнала содержит контрольную сумму снимка, к которому
+        относятся операции.
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист после применения операции.
+            entry (dict): Описание операции.
+        """
+        if not self.journal:
+            self.save_playlist(name, playlist)
+            return
+        if name not in self._snapshot_crc:
+            self._snapshot_crc[name] = self._read_snapshot_crc(name)
+        lines = []
+        new = not self._journal_sizes.get(name)
+        if new:
+            lines.append(json.dumps({"op": "base", "crc": self._snapshot_crc[name]}))
+        lines.append(json.dumps(entry, ensure_ascii=False))
+        self._save_library()
+        self._write(self._write_journal, name, "\n".join(lines) + "\n", new)
+        self._journal_sizes[name] = self._journal_sizes.get(name, 0) + 1
+        if self._journal_sizes[name] >= self.compact_every:
+            self.save_playlist(name, playlist)
+
+    def _read_snapshot_crc(self, name: str) -> int | None:
+        """Считает контрольную сумму снимка плейлиста на диске."""
+        path = self.snapshot_file(name)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return zlib.crc32(f.read())
+
+    def record_add(self, name: str, playlist: PlayList, composition: Composition):
+        """
+        Фиксирует добавление композиции в конец плейлиста.
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист после добавления.
+            composition (Composition): Добавленная композиция.
+        """
+        self._append_journal(name, playlist, {"op": "add", **self._track_record(composition)})
+
+    def record_add_many(self, name: str, playlist: PlayList, compositions: list[Composition]):
+        """
+        Фиксирует добавление пакета композиций в конец плейлиста одной записью журнала.
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист после добавления.
+            compositions (list[Composition]): Добавленные композиции.
+        """
+        self._append_journal(name, playlist, {"op": "add_many",
+                                              "tracks": [self._track_record(c) for c in compositions]})
+
+    def record_remove(self, name: str, playlist: PlayList, index: int):
+        """
+        Фиксирует удаление композиции.
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист после удаления.
+            index (int): Позиция удаленной композиции.
+        """
+        self._append_journal(name, playlist, {"op": "remove", "index": index})
+
+    def record_move_up(self, name: str, playlist: PlayList, index: int):
+        """
+        Фиксирует перемещение композиции вверх (PlayList.move_up).
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист после перемещения.
+            index (int): Позиция композиции до перемещения.
+        """
+        self._append_journal(name, playlist, {"op": "move_up", "index": index})
+
+    def record_move_down(self, name: str, playlist: PlayList, index: int):
+        """
+        Фиксирует перемещение композиции вниз (PlayList.move_down).
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист после перемещения.
+            index (int): Позиция композиции до перемещения.
+        """
+        self._append_journal(name, playlist, {"op": "move_down", "index": index})
+
+    def record_move(self, name: str, playlist: PlayList, indices: list[int], index: int):
+        """
+        Фиксирует перемещение композиций одной записью журнала.
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист после перемещения.
+            indices (list[int]): Позиции перемещенных композиций до перемещения.
+            index (int): Позиция первой перемещенной композиции после перемещения.
+        """
+        self._append_journal(name, playlist, {"op": "move", "from": sorted(indices), "to": index})
+
+    def _apply_entry(self, playlist: PlayList, entry: dict):
+        """Применяет одну операцию журнала к плейлисту."""
+        op = entry["op"]
+        if op == "add":
+            playlist.add_song(self._composition_from_record(entry))
+        elif op == "add_many":
+            playlist.add_songs(self._composition_from_record(t) for t in entry["tracks"])
+        elif op == "remove":
+            playlist.remove_song(playlist.node_at(entry["index"]))
+        elif op == "move_up":
+            playlist.move_up(playlist.node_at(entry["index"]))
+        elif op == "move_down":
+            playlist.move_down(playlist.node_at(entry["index"]))
+        elif op == "move":
+            playlist.move_many([playlist.node_at(i) for i in entry["from"]], entry["to"])
+        else:
+            raise ValueError(f"unknown journal operation: {op}")
+
+    def _replay_journal(self, name: str, playlist: PlayList, snapshot_crc: int | None):
+        """
+        Применяет к загруженному снимку операции из журнала.
+
+        Журнал, относящийся к другому снимку (сбой между уплотнением и удалением
+        журнала), игнорируется и удаляется. Недописанная последняя строка
+        отбрасывается и отрезается от файла. В режиме read_only файл журнала
+        не изменяется.
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист, загруженный из снимка.
+            snapshot_crc (int | None): Контрольная сумма снимка.
+        """
+        self._snapshot_crc[name] = snapshot_crc
+        self._journal_sizes[name] = 0
+        path = self.journal_file(name)
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            payload = f.read()
+        # длина корректной части считается по байтам файла, а не по декодированным
+        # строкам: журнал, записанный с "\r\n", не обрезается (json.loads пропускает "\r")
+        lines = payload.split(b"\n")
+        # последний элемент — пустая строка после "\n" либо недописанная запись
+        entries = []
+        valid_size = 0
+        for line in lines[:-1]:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                break
+            valid_size += len(line) + 1
+        if valid_size != len(payload) and not self.read_only:
+            # отрезаем недописанный хвост, чтобы следующие записи начинались с новой строки
+            os.truncate(path, valid_size)
+        if not entries or entries[0].get("op") != "base" or entries[0].get("crc") != snapshot_crc:
+            if not self.read_only:
+                os.remove(path)
+            return
+        for entry in entries[1:]:
+            self._apply_entry(playlist, entry)
+        self._journal_sizes[name] = len(entries) - 1
 
     def delete_playlist_file(self, name: str):
         """
-        Удаляет JSON-файл плейлиста, если он существует.
+        Удаляет файлы снимка плейлиста (в любом формате) и его журнал, если они существуют.
 
         Args:
             name (str): Имя плейлиста для удаления.
         """
-        path = self.playlist_file(name)
-        if os.path.exists(path):
-            os.remove(path)
+        self._journal_sizes.pop(name, None)
+        self._snapshot_crc.pop(name, None)
+        self._write(self._delete_files, name)
+
+    def _delete_files(self, name: str):
+        """Удаляет файлы снимков и журнала плейлиста."""
+        snapshots = [self.snapshot_file(name, file_format) for file_format in self.FORMATS]
+        for path in (*snapshots, self.journal_file(name)):
+            if os.path.exists(path):
+                os.remove(path)
 
-    def load_playlists(self) -> dict[str, PlayList]:
+    def list_playlists(self) -> dict[str, str]:
         """
-        Загружает все плейлисты из папки.
+        Читает только список файлов плейлистов, не разбирая их содержимое.
 
-        Файлы должны начинаться с "playlist_" и заканчиваться ".json".
+        Файлы должны начинаться с "playlist_" и заканчиваться ".json" или ".apl".
+        Если плейлист есть в обоих форматах, выбирается файл в формате контроллера.
 
         Returns:
-            dict[str, PlayList]: Словарь, где ключ — имя плейлиста, значение — объект PlayList.
+            dict[str, str]: Словарь, где ключ — имя плейлиста, значение — путь к файлу.
         """
-        playlists = {}
+        files = {}
         if not os.path.exists(self.folder):
-            return playlists
-        for filename in os.listdir(self.folder):
-            if filename.startswith("playlist_") and filename.endswith(".json"):
-                name = filename[9:-5].replace("_", " ")
-                path = os.path.join(self.folder, filename)
-                with open(path, "r", encoding="utf-8") as f:
-                    tracks = json.load(f)
-                pl = PlayList()
-                for t in tracks:
-                    comp = Composition(t["title"], t["duration"], t["path"])
-                    pl.add_song(comp)
-                playlists[name] = pl
-        return playlists
\ No newline at end of file
+            return files
+        preferred = self.FORMATS[self.file_format]
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                stem, extension = os.path.splitext(entry.name)
+                if stem.startswith("playlist_") and extension in self.FORMATS.values():
+                    name = stem[9:].replace("_", " ")
+                    if name not in files or extension == preferred:
+                        files[name] = entry.path
+        return files
+
+    def load_playlist(self, name: str) -> PlayList:
+        """
+        Загружает один плейлист из файла снимка.
+
+        Бинарный снимок читается потоково прямо в узлы плейлиста. Если рядом
+        со снимком есть журнал изменений, он применяется поверх снимка.
+        Снимок с треками, записанными целиком, пересохраняется ссылками на библиотеку.
+        Если снимок найден только в другом формате, плейлист пересохраняется
+        в формате контроллера, а старый файл удаляется. В режиме read_only
+        плейлист не пересохраняется.
+
+        Args:
+            name (str): Имя плейлиста.
+
+        Returns:
+            PlayList: Загруженный плейлист.
+
+        Raises:
+            FileNotFoundError: Если снимок не найден ни в одном формате.
+        """
+        file_format = self.file_format
+        if not os.path.exists(self.snapshot_file(name)):
+            file_format = next((other for other in self.FORMATS
+                                if os.path.exists(self.snapshot_file(name, other))), self.file_format)
+        path = self.snapshot_file(name, file_format)
+        pl = PlayList()
+        if file_format == "binary":
+            reader = BinaryPlaylistReader(path, self.library)
+            for composition in reader:
+                pl.add_song(composition)
+            crc = reader.crc
+            inline_tracks = reader.inline_tracks
+        else:
+            with open(path, "rb") as f:
+                payload = f.read()
+            records = json.loads(payload.decode("utf-8"))
+            for t in records:
+                pl.add_song(self._composition_from_record(t))
+            crc = zlib.crc32(payload)
+            inline_tracks = sum("id" not in t for t in records)
+        self._replay_journal(name, pl, crc)
+        if self.read_only:
+            return pl
+        if self.library is not None and inline_tracks and file_format == self.file_format:
+            # снимок с треками целиком переводится на ссылки на библиотеку
+            self.save_playlist(name, pl)
+        elif file_format != self.file_format:
+            # перевод в формат контроллера; журнал уже применен и будет удален
+            self.save_playlist(name, pl)
+            self._write(os.remove, path)
+        return pl
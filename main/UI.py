@@ -1,11 +1,18 @@
+import os
+
 import wx
-import wx.adv
-from pygame import mixer
 
+from .audio_cache import shared_cache
 from .composition import Composition
+from .composition_list import CompositionListCtrl
+from .metadata import MetadataCache
 from .Playlist import PlayList
 from .PlayerController import PlayerController
 from .PlaylistJSONController import PlaylistJSONController
+from .play_order import REPEAT_ALL, REPEAT_OFF, REPEAT_ONE, PlayOrder
+from .search import SearchIndex
+from .waveform_view import WaveformStrip
+from .workers import BackgroundTasks
 
 class AudioPlayerFrame(wx.Frame):
     """
@@ -19,20 +26,38 @@ class AudioPlayerFrame(wx.Frame):
         controller (PlayerController): Контроллер для управления воспроизведением.
         playlists (dict): Словарь плейлистов, ключ — имя плейлиста, значение — объект PlayList.
         current_playlist (PlayList | None): Активный плейлист.
+        order (PlayOrder | None): Порядок воспроизведения играющего плейлиста.
         json_controller (PlaylistJSONController): Контроллер для работы с JSON-файлами плейлистов.
-        timer (wx.Timer): Таймер для обновления прогресса воспроизведения.
+        io_tasks (BackgroundTasks): Фоновая очередь файловых операций (запись и загрузка плейлистов).
+        audio_tasks (BackgroundTasks): Фоновая очередь операций с аудио (декодирование, воспроизведение).
+        metadata (MetadataCache): Кэш метаданных аудиофайлов.
+        search_index (SearchIndex): Поисковый индекс композиций загруженных плейлистов.
+        search_box (wx.SearchCtrl): Поле поиска композиций.
+        search_results (wx.ListBox): Результаты поиска (скрыт, пока поле поиска пусто).
         playlist_list (wx.ListBox): Список плейлистов в интерфейсе.
-        composition_list (wx.ListBox): Список композиций текущего плейлиста.
+        composition_list (CompositionListCtrl): Виртуальный список композиций текущего плейлиста.
         btn_play, btn_pause, btn_stop, btn_prev, btn_next (wx.Button): Кнопки управления воспроизведением.
-        progress (wx.Gauge): Прогресс-бар для отображения позиции воспроизведения.
+        progress (WaveformStrip): Полоса прогресса с обзором формы волны; щелчок перематывает трек.
+        volume_slider (wx.Slider): Громкость плеера в процентах.
+        normalize_box (wx.CheckBox): Выравнивание громкости треков по результатам анализа.
+        crossfade_choice (wx.Choice): Длительность плавного перехода между треками.
+        waveform_tasks (BackgroundTasks): Фоновая очередь построения обзоров формы волны.
+        waveforms (WaveformCache | None): Кэш обзоров на диске; создается при первом обращении.
     """
-    def __init__(self, parent=None, title="🎵 Audio Player"):
+    # Режимы повтора в порядке пунктов выпадающего списка
+    REPEAT_CHOICES = ((REPEAT_ALL, "🔁 Плейлист"), (REPEAT_ONE, "🔂 Трек"), (REPEAT_OFF, "Без повтора"))
+    # Длительности перехода между треками (с) в порядке пунктов выпадающего списка
+    CROSSFADE_CHOICES = ((0.0, "Без перехода"), (3.0, "Переход 3 с"), (6.0, "Переход 6 с"), (10.0, "Переход 10 с"))
+
+    def __init__(self, parent=None, title="🎵 Audio Player", startup_timer=None, stall_monitor=None):
         """
         Инициализация главного окна аудиоплеера.
 
         Args:
             parent (wx.Window | None): Родительское окно.
             title (str): Заголовок окна.
+            startup_timer (StartupTimer | None): Таймер для отчета о времени запуска.
+            stall_monitor (StallMonitor | None): Измеритель задержек цикла событий.
         """
         super().__init__(parent, title=title, size=wx.Size(700, 600))
 
@@ -41,18 +66,55 @@ class AudioPlayerFrame(wx.Frame):
         panel = wx.Panel(self)
 
         # === Контроллер и данные ===
-        self.controller = PlayerController()
+        # Следующий трек плейлиста ставится в очередь заранее и начинается без паузы
+        # Позиция интерполируется часами контроллера, поэтому прогресс обновляется с частотой 60 Гц
+        # Короткие и часто повторяемые треки воспроизводятся из кэша декодированного звука;
+        # тот же кэш получает звук, декодированный при определении длительности
+        # Загрузка и декодирование звука идут в очереди audio_tasks, а плейлист и порядок
+        # воспроизведения контроллер читает только в потоке интерфейса
+        self.audio_tasks = BackgroundTasks(wx.CallAfter, on_error=self.on_task_error, name="audio")
+        self.controller = PlayerController(gapless=True, position_interval=1 / 60, audio_cache=shared_cache(),
+                                           dispatch=wx.CallAfter, tasks=self.audio_tasks)
+        # position и error приходят из фонового потока контроллера; переходы между
+        # треками выполняются в потоке интерфейса через dispatch=wx.CallAfter
+        self.controller.subscribe("track_started", lambda track: wx.CallAfter(self.on_track_advanced, track))
+        self.controller.subscribe("track_ended", lambda track: wx.CallAfter(self.on_track_ended, track))
+        self.controller.subscribe("position", lambda position_ms: wx.CallAfter(self.update_progress, position_ms))
+        self.controller.subscribe("error", lambda error: wx.CallAfter(self.on_task_error, error))
         self.playlists = {}  # имя плейлиста -> PlayList
         self.current_playlist = None
-
-        self.json_controller = PlaylistJSONController()
-        self.playlists = self.json_controller.load_playlists()
-
-
-        # Таймер для обновления прогресса
-        self.timer = wx.Timer(self)
-        self.Bind(wx.EVT_TIMER, self.update_progress, self.timer)
-        self.timer.Start(500)  # обновление каждые 0.5 секунды
+        self.order = None
+
+        # Файловые операции выполняются вне потока интерфейса,
+        # результаты возвращаются через wx.CallAfter
+        self.io_tasks = BackgroundTasks(wx.CallAfter, on_error=self.on_task_error, name="io")
+        # Обзоры формы волны строятся в своей очереди, чтобы не задерживать команды воспроизведения
+        self.waveform_tasks = BackgroundTasks(wx.CallAfter, on_error=self.on_waveform_error, name="waveform")
+        self.waveforms = None
+        self._waveform_track = None
+        self.json_controller = PlaylistJSONController(journal=True, file_format="binary", writer=self.io_tasks)
+        # Сразу читаем только список файлов, сами плейлисты разбираются при первом обращении
+        self.playlists = self.json_controller.open_playlists()
+        # Плейлисты попадают в поисковый индекс по мере загрузки, в том числе фоновой
+        self.search_index = SearchIndex()
+        self._search_hits = []
+        self.playlists.on_loaded = self.search_index.add_playlist
+        self.metadata = MetadataCache(os.path.join(self.json_controller.folder, "metadata.sqlite"))
+        # Поправки громкости треков, проанализированных ранее, берутся из кэша метаданных
+        self.controller.metadata = self.metadata
+        self.importer = None  # конвейер импорта создается при первом импорте папки
+        self._import_cancel = None
+        self._loudness_cancel = None
+        if startup_timer:
+            startup_timer.mark("список плейлистов")
+
+
+        # Таймер-пульс для измерения задержек цикла событий
+        self.stall_monitor = stall_monitor
+        if stall_monitor:
+            self.stall_timer = wx.Timer(self)
+            self.Bind(wx.EVT_TIMER, lambda event: stall_monitor.tick(), self.stall_timer)
+            self.stall_timer.Start(stall_monitor.interval_ms)
 
         # === Главный сайзер ===
         root_sizer = wx.BoxSizer(wx.VERTICAL)
@@ -80,16 +142,29 @@ class AudioPlayerFrame(wx.Frame):
         # ==== Центральная колонка — Композиции ====
         composition_box = wx.StaticBox(panel, label="Композиции")
         composition_sizer = wx.StaticBoxSizer(composition_box, wx.VERTICAL)
-        self.composition_list = wx.ListBox(panel)
+        self.search_box = wx.SearchCtrl(panel, style=wx.TE_PROCESS_ENTER)
+        self.search_box.SetDescriptiveText("Поиск по названию и пути")
+        self.search_box.ShowCancelButton(True)
+        self.search_results = wx.ListBox(panel, size=wx.Size(-1, 120))
+        self.search_results.Hide()
+        self.composition_list = CompositionListCtrl(panel)
         btn_add_track = wx.Button(panel, label="➕ Добавить")
+        btn_import_folder = wx.Button(panel, label="📁 Папка")
         btn_delete_track = wx.Button(panel, label="🗑 Удалить")
         btn_up = wx.Button(panel, label="⬆ Вверх")
         btn_down = wx.Button(panel, label="⬇ Вниз")
+        btn_play_next = wx.Button(panel, label="⤵ Следующей")
+        btn_loudness = wx.Button(panel, label="🔊 Громкость")
         track_btn_sizer = wx.BoxSizer(wx.HORIZONTAL)
         track_btn_sizer.Add(btn_add_track, 1, wx.ALL, 3)
+        track_btn_sizer.Add(btn_import_folder, 1, wx.ALL, 3)
         track_btn_sizer.Add(btn_delete_track, 1, wx.ALL, 3)
         track_btn_sizer.Add(btn_up, 1, wx.ALL, 3)
         track_btn_sizer.Add(btn_down, 1, wx.ALL, 3)
+        track_btn_sizer.Add(btn_play_next, 1, wx.ALL, 3)
+        track_btn_sizer.Add(btn_loudness, 1, wx.ALL, 3)
+        composition_sizer.Add(self.search_box, 0, wx.ALL | wx.EXPAND, 5)
+        composition_sizer.Add(self.search_results, 0, wx.LEFT | wx.RIGHT | wx.EXPAND, 5)
         composition_sizer.Add(self.composition_list, 1, wx.ALL | wx.EXPAND, 5)
         composition_sizer.Add(track_btn_sizer, 0, wx.ALL | wx.EXPAND, 5)
 
@@ -111,16 +186,27 @@ class AudioPlayerFrame(wx.Frame):
         self.btn_next = wx.Button(panel, label="⏭")
         for b in (self.btn_prev, self.btn_play, self.btn_pause, self.btn_stop, self.btn_next):
             button_sizer.Add(b, 0, wx.ALL, 5)
+        self.btn_shuffle = wx.ToggleButton(panel, label="🔀")
+        self.repeat_choice = wx.Choice(panel, choices=[label for _, label in self.REPEAT_CHOICES])
+        self.repeat_choice.SetSelection(0)
+        button_sizer.Add(self.btn_shuffle, 0, wx.ALL, 5)
+        button_sizer.Add(self.repeat_choice, 0, wx.ALIGN_CENTER_VERTICAL | wx.ALL, 5)
+        self.crossfade_choice = wx.Choice(panel, choices=[label for _, label in self.CROSSFADE_CHOICES])
+        self.crossfade_choice.SetSelection(0)
+        button_sizer.Add(self.crossfade_choice, 0, wx.ALIGN_CENTER_VERTICAL | wx.ALL, 5)
 
         # Вторая строка — прогресс и громкость
         progress_sizer = wx.BoxSizer(wx.HORIZONTAL)
-        self.progress = wx.Gauge(panel, range=100, size=wx.Size(300, 20))
-        #self.volume_slider = wx.Slider(panel, value=50, minValue=0, maxValue=100,
-        #                               style=wx.SL_HORIZONTAL | wx.SL_LABELS)
+        self.progress = WaveformStrip(panel)
+        self.volume_slider = wx.Slider(panel, value=100, minValue=0, maxValue=100,
+                                       style=wx.SL_HORIZONTAL | wx.SL_LABELS)
+        self.normalize_box = wx.CheckBox(panel, label="Выравнивать")
+        self.normalize_box.SetValue(self.controller.normalize)
         progress_sizer.Add(wx.StaticText(panel, label="Прогресс:"), 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 5)
         progress_sizer.Add(self.progress, 1, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 15)
-        #progress_sizer.Add(wx.StaticText(panel, label="Громкость:"), 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 5)
-        #progress_sizer.Add(self.volume_slider, 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 5)
+        progress_sizer.Add(wx.StaticText(panel, label="Громкость:"), 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 5)
+        progress_sizer.Add(self.volume_slider, 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 5)
+        progress_sizer.Add(self.normalize_box, 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 5)
 
         control_sizer.Add(button_sizer, 0, wx.ALIGN_CENTER | wx.ALL, 5)
         control_sizer.Add(progress_sizer, 0, wx.EXPAND | wx.ALL, 5)
@@ -130,21 +216,38 @@ class AudioPlayerFrame(wx.Frame):
         root_sizer.Add(main_sizer, 1, wx.EXPAND | wx.ALL, 5)
         root_sizer.Add(control_sizer, 0, wx.EXPAND | wx.ALL, 10)
         panel.SetSizer(root_sizer)
+        self.CreateStatusBar()
 
         # === Привязка событий к методам интеграции ===
         btn_add_playlist.Bind(wx.EVT_BUTTON, self.on_add_playlist)
         btn_delete_playlist.Bind(wx.EVT_BUTTON, self.on_delete_playlist)
         btn_add_track.Bind(wx.EVT_BUTTON, self.on_add_composition)
+        btn_import_folder.Bind(wx.EVT_BUTTON, self.on_import_folder)
         btn_delete_track.Bind(wx.EVT_BUTTON, self.on_delete_composition)
         btn_up.Bind(wx.EVT_BUTTON, self.on_move_up)
         btn_down.Bind(wx.EVT_BUTTON, self.on_move_down)
+        btn_play_next.Bind(wx.EVT_BUTTON, self.on_play_next)
+        btn_loudness.Bind(wx.EVT_BUTTON, self.on_analyze_loudness)
+        self.volume_slider.Bind(wx.EVT_SLIDER, self.on_volume)
+        self.normalize_box.Bind(wx.EVT_CHECKBOX, self.on_normalize)
+        self.btn_shuffle.Bind(wx.EVT_TOGGLEBUTTON, self.on_order_settings)
+        self.repeat_choice.Bind(wx.EVT_CHOICE, self.on_order_settings)
+        self.crossfade_choice.Bind(wx.EVT_CHOICE, self.on_crossfade)
         self.btn_play.Bind(wx.EVT_BUTTON, self.on_play)
         self.btn_pause.Bind(wx.EVT_BUTTON, self.on_pause)
         self.btn_stop.Bind(wx.EVT_BUTTON, self.on_stop)
         self.btn_prev.Bind(wx.EVT_BUTTON, self.on_prev)
         self.btn_next.Bind(wx.EVT_BUTTON, self.on_next)
         self.playlist_list.Bind(wx.EVT_LISTBOX, self.on_select_playlist)
-        self.composition_list.Bind(wx.EVT_LISTBOX_DCLICK, self.on_play)
+        self.search_box.Bind(wx.EVT_TEXT, self.on_search)
+        self.search_box.Bind(wx.EVT_SEARCH_CANCEL, lambda event: self.search_box.Clear())
+        self.search_box.Bind(wx.EVT_TEXT_ENTER, lambda event: self.on_search_result(0))
+        self.search_results.Bind(wx.EVT_LISTBOX_DCLICK,
+                                 lambda event: self.on_search_result(self.search_results.GetSelection()))
+        self.composition_list.Bind(wx.EVT_LIST_ITEM_ACTIVATED, self.on_play)
+        self.composition_list.on_rows_dropped = self.on_compositions_dropped
+        self.progress.on_seek = self.on_seek
+        self.Bind(wx.EVT_CLOSE, self.on_close)
 
         # Подгружаем плейлисты из json
         for name in self.playlists:
@@ -158,6 +261,40 @@ class AudioPlayerFrame(wx.Frame):
 
         self.Centre()
         self.Show()
+        if startup_timer:
+            startup_timer.mark("окно создано")
+        # Остальные плейлисты догружаем в фоне, когда окно уже на экране:
+        # разбор JSON удерживает GIL и не должен задерживать первую отрисовку
+        wx.CallAfter(self.playlists.prefetch, 1)
+
+    def on_close(self, event):
+        """
+        Обработчик закрытия окна: останавливает фоновые потоки и загрузку плейлистов.
+        """
+        if self.stall_monitor:
+            self.stall_timer.Stop()
+        if self._import_cancel:
+            self._import_cancel.set()
+        if self._loudness_cancel:
+            self._loudness_cancel.set()
+        self.playlists.close()
+        self.audio_tasks.shutdown(wait=False)
+        self.waveform_tasks.shutdown(wait=False)
+        self.controller.close()
+        # Дожидаемся записи всех изменений плейлистов
+        self.io_tasks.shutdown()
+        self.json_controller.close()
+        self.metadata.close()
+        event.Skip()
+
+    def on_task_error(self, error: BaseException):
+        """
+        Показывает ошибку фоновой задачи.
+
+        Args:
+            error (BaseException): Исключение, возникшее в фоновой задаче.
+        """
+        wx.MessageBox(str(error), "Ошибка", wx.OK | wx.ICON_ERROR)
 
     # === Методы интеграции с PlayList и Composition ===
     def on_add_playlist(self, event):
@@ -201,9 +338,10 @@ class AudioPlayerFrame(wx.Frame):
         if sel != wx.NOT_FOUND:
             name = self.playlist_list.GetString(sel)
             del self.playlists[name]
+            self.search_index.remove_playlist(name)
             self.playlist_list.Delete(sel)
-            self.composition_list.Clear()
             self.current_playlist = None
+            self.refresh_composition_list()
             self.json_controller.delete_playlist_file(name)
 
     def on_select_playlist(self, event):
@@ -215,18 +353,85 @@ class AudioPlayerFrame(wx.Frame):
         sel = event.GetSelection()
         if sel != wx.NOT_FOUND:
             name = self.playlist_list.GetString(sel)
-            self.current_playlist = self.playlists[name]
+            if self.playlists.is_loaded(name):
+                self.current_playlist = self.playlists[name]
+                self.refresh_composition_list()
+                return
+            # Плейлист еще не разобран — загружаем его в фоне
+            self.current_playlist = None
             self.refresh_composition_list()
+            self.SetStatusText(f"Загрузка плейлиста «{name}»…")
+            self.io_tasks.submit(self.playlists.__getitem__, name,
+                                 on_done=lambda playlist: self.on_playlist_loaded(name, playlist))
+
+    def on_playlist_loaded(self, name: str, playlist: PlayList):
+        """
+        Показывает плейлист, загруженный в фоне, если он все еще выбран.
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Загруженный плейлист.
+        """
+        self.SetStatusText("")
+        sel = self.playlist_list.GetSelection()
+        if sel != wx.NOT_FOUND and self.playlist_list.GetString(sel) == name:
+            self.current_playlist = playlist
+            self.refresh_composition_list()
+
+    # === Поиск ===
+    def on_search(self, event):
+        """
+        Ищет композиции во всех загруженных плейлистах при каждом изменении запроса.
+
+        Запрос выполняется индексом за доли миллисекунды, поэтому откладывать его не нужно.
+        """
+        query = self.search_box.GetValue()
+        self._search_hits = self.search_index.search(query, limit=100)
+        self.search_results.Set([f"{composition.get_title()} — {name}" for name, composition in self._search_hits])
+        shown = bool(query.strip())
+        if shown != self.search_results.IsShown():
+            self.search_results.Show(shown)
+            self.search_results.GetParent().Layout()
+        if shown and not self._search_hits:
+            self.SetStatusText("Ничего не найдено")
+
+    def on_search_result(self, index: int):
+        """
+        Открывает плейлист найденной композиции и выделяет ее.
+
+        Args:
+            index (int): Номер результата в списке.
+        """
+        if not 0 <= index < len(self._search_hits):
+            return
+        name, composition = self._search_hits[index]
+        sel = self.playlist_list.FindString(name)
+        if sel == wx.NOT_FOUND or not self.playlists.is_loaded(name):
+            return
+        playlist = self.playlists[name]
+        node = playlist.find_node(composition)
+        if node is None:
+            return
+        if playlist is not self.current_playlist:
+            self.playlist_list.SetSelection(sel)
+            self.current_playlist = playlist
+            self.refresh_composition_list()
+        self.composition_list.SetSelection(playlist.index_of(node))
+        self.composition_list.SetFocus()
+
+    def current_playlist_name(self) -> str:
+        """
+        Возвращает имя выбранного в интерфейсе плейлиста.
+        """
+        return self.playlist_list.GetString(self.playlist_list.GetSelection())
 
     def refresh_composition_list(self):
         """
         Обновляет список композиций в интерфейсе для текущего плейлиста.
+
+        Список виртуальный, поэтому обновление не перебирает композиции.
         """
-        self.composition_list.Clear()
-        if not self.current_playlist:
-            return
-        for comp in self.current_playlist.get_all_songs():
-            self.composition_list.Append(comp.get_title())
+        self.composition_list.set_playlist(self.current_playlist)
 
     def on_add_composition(self, event):
         """
@@ -244,19 +449,98 @@ class AudioPlayerFrame(wx.Frame):
             if dlg.ShowModal() == wx.ID_CANCEL:
                 return
             path = dlg.GetPath()
-            title = path.split("\\")[-1]
-            duration = mixer.Sound(path).get_length()
-            comp = Composition(title, duration, path)
-            # Проверка на дубли
-            if any(s.get_title() == title for s in self.current_playlist.get_all_songs()):
-                wx.MessageBox("Такой трек уже есть!", "Ошибка", wx.OK | wx.ICON_WARNING)
+        name = self.current_playlist_name()
+        playlist = self.current_playlist
+        known = self.json_controller.known_track(path)
+        if known is not None:
+            # трек уже есть в библиотеке — файл повторно не читается
+            self.on_composition_probed(name, playlist, path, known)
+            return
+        # Длительность берется из кэша или из заголовка файла; проба выполняется в фоне
+        self.audio_tasks.submit(self.metadata.get, path,
+                                on_done=lambda info: self.on_composition_probed(name, playlist, path, info))
+
+    def on_composition_probed(self, name: str, playlist: PlayList, path: str, info):
+        """
+        Добавляет в плейлист композицию, метаданные которой определены в фоне.
+
+        Проверяет дубли по имени трека.
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист, в который добавлялся трек.
+            path (str): Путь к аудиофайлу.
+            info (TrackInfo | Composition): Метаданные трека или уже известная композиция библиотеки.
+        """
+        if name not in self.playlists or self.playlists[name] is not playlist:
+            return  # плейлист удален, пока определялись метаданные
+        comp = self.json_controller.intern(Composition(info.title, info.duration, path))
+        # Проверка на дубли
+        if playlist.find_by_title(info.title):
+            wx.MessageBox("Такой трек уже есть!", "Ошибка", wx.OK | wx.ICON_WARNING)
+            return
+        playlist.add_song(comp)
+        if playlist is self.current_playlist:
+            self.composition_list.sync_count()
+        self.requeue_next(playlist)
+        # Дописываем операцию в журнал плейлиста
+        self.json_controller.record_add(name, playlist, comp)
+
+
+    def on_import_folder(self, event):
+        """
+        Обработчик кнопки импорта папки.
+
+        Запускает фоновый импорт всех аудиофайлов из выбранного каталога
+        в текущий плейлист; пакеты композиций добавляются в потоке интерфейса.
+        """
+        if self.current_playlist is None:
+            wx.MessageBox("Выберите плейлист!", "Ошибка", wx.OK | wx.ICON_WARNING)
+            return
+        with wx.DirDialog(self, "Выберите папку с музыкой", style=wx.DD_DIR_MUST_EXIST) as dlg:
+            if dlg.ShowModal() == wx.ID_CANCEL:
                 return
-            self.current_playlist.add_song(comp)
-            self.composition_list.Append(comp.get_title())
-            # Обновляем JSON плейлиста
-            self.json_controller.save_playlist(self.playlist_list.GetString(self.playlist_list.GetSelection()),
-                                               self.current_playlist)
+            root = dlg.GetPath()
+        if self.importer is None:
+            from .importer import FolderImporter
+            self.importer = FolderImporter(self.metadata, library=self.json_controller.library)
+        name = self.current_playlist_name()
+        playlist = self.current_playlist
+        self._import_cancel = self.importer.start(
+            root,
+            on_batch=lambda batch: wx.CallAfter(self.on_import_batch, name, playlist, batch),
+            on_progress=lambda done, total: wx.CallAfter(self.SetStatusText, f"Импорт: {done} из {total}"),
+            on_done=lambda imported: wx.CallAfter(self.SetStatusText, f"Импортировано композиций: {imported}"),
+            skip=lambda path: playlist.find_by_path(path) is not None,
+            on_error=lambda error: wx.CallAfter(self.on_import_error, error),
+        )
+
+    def on_import_error(self, error: Exception):
+        """
+        Завершает импорт, прерванный ошибкой: уже добавленные пакеты остаются в плейлисте.
 
+        Args:
+            error (Exception): Ошибка импорта.
+        """
+        self.SetStatusText("Импорт прерван")
+        self.on_task_error(error)
+
+    def on_import_batch(self, name: str, playlist: PlayList, batch: list[Composition]):
+        """
+        Добавляет пакет импортированных композиций в плейлист и журнал.
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист, для которого запускался импорт.
+            batch (list[Composition]): Пакет композиций.
+        """
+        if name not in self.playlists or self.playlists[name] is not playlist:
+            return  # плейлист удален во время импорта
+        playlist.add_songs(batch)
+        if playlist is self.current_playlist:
+            self.composition_list.sync_count()
+        self.requeue_next(playlist)
+        self.json_controller.record_add_many(name, playlist, batch)
 
     def on_delete_composition(self, event):
         """
@@ -264,12 +548,10 @@ class AudioPlayerFrame(wx.Frame):
         """
         sel = self.composition_list.GetSelection()
         if sel != wx.NOT_FOUND and self.current_playlist:
-            title = self.composition_list.GetString(sel)
-            for s in self.current_playlist.get_all_songs():
-                if s.get_title() == title:
-                    self.current_playlist.remove_song(s)
-                    break
-            self.composition_list.Delete(sel) # удаляем выбранный элемент
+            self.current_playlist.remove_song(self.current_playlist.node_at(sel))
+            self.composition_list.refresh_from(sel) # строки ниже удаленной сдвигаются
+            self.requeue_next(self.current_playlist)
+            self.json_controller.record_remove(self.current_playlist_name(), self.current_playlist, sel)
 
 
     def on_move_up(self, event):
@@ -278,13 +560,12 @@ class AudioPlayerFrame(wx.Frame):
         """
         sel = self.composition_list.GetSelection()
         if sel != wx.NOT_FOUND and self.current_playlist:
-            title = self.composition_list.GetString(sel)
-            comp = next(c for c in self.current_playlist.get_all_songs() if c.get_title() == title)
-            self.current_playlist.move_up(comp)
-            self.refresh_composition_list()
-            # Обновляем JSON плейлиста
-            self.json_controller.save_playlist(self.playlist_list.GetString(self.playlist_list.GetSelection()),
-                                               self.current_playlist)
+            self.current_playlist.move_up(self.current_playlist.node_at(sel))
+            # Перерисовываем только две поменявшиеся строки
+            self.composition_list.refresh_rows(sel, (sel - 1) % len(self.current_playlist))
+            self.requeue_next(self.current_playlist)
+            # Дописываем операцию в журнал плейлиста
+            self.json_controller.record_move_up(self.current_playlist_name(), self.current_playlist, sel)
             # Оставляем выделение на перемещенном треке
             index = max(sel - 1, 0)
             self.composition_list.SetSelection(index)
@@ -295,16 +576,94 @@ class AudioPlayerFrame(wx.Frame):
         """
         sel = self.composition_list.GetSelection()
         if sel != wx.NOT_FOUND and self.current_playlist:
-            title = self.composition_list.GetString(sel)
-            comp = next(c for c in self.current_playlist.get_all_songs() if c.get_title() == title)
-            self.current_playlist.move_down(comp)
-            self.refresh_composition_list()
-            self.json_controller.save_playlist(self.playlist_list.GetString(self.playlist_list.GetSelection()),
-                                               self.current_playlist)
+            self.current_playlist.move_down(self.current_playlist.node_at(sel))
+            self.composition_list.refresh_rows(sel, (sel + 1) % len(self.current_playlist))
+            self.requeue_next(self.current_playlist)
+            self.json_controller.record_move_down(self.current_playlist_name(), self.current_playlist, sel)
             # Оставляем выделение на перемещенном треке
-            index = min(sel + 1, self.composition_list.GetCount() - 1)
+            index = min(sel + 1, self.composition_list.GetItemCount() - 1)
             self.composition_list.SetSelection(index)
 
+    def on_compositions_dropped(self, rows: list[int], index: int):
+        """
+        Перемещает перетащенные композиции текущего плейлиста одной операцией.
+
+        Args:
+            rows (list[int]): Номера перетащенных строк по возрастанию.
+            index (int): Новая позиция первой из них.
+        """
+        playlist = self.current_playlist
+        if not playlist or rows == list(range(index, index + len(rows))):
+            return
+        playlist.move_many([playlist.node_at(row) for row in rows], index)
+        # строки вне диапазона от первой перемещенной до последней не изменились
+        self.composition_list.RefreshItems(min(rows[0], index), max(rows[-1], index + len(rows) - 1))
+        self.requeue_next(playlist)
+        self.json_controller.record_move(self.current_playlist_name(), playlist, rows, index)
+        self.composition_list.select_rows(index, len(rows))
+
+    # === Порядок воспроизведения ===
+    def order_for(self, playlist: PlayList) -> PlayOrder:
+        """
+        Возвращает порядок воспроизведения плейлиста, создавая его при смене плейлиста.
+
+        Args:
+            playlist (PlayList): Плейлист.
+
+        Returns:
+            PlayOrder: Порядок с текущими настройками перемешивания и повтора.
+        """
+        if self.order is None or self.order.playlist is not playlist:
+            if self.order is not None:
+                self.order.close()
+            self.order = PlayOrder(playlist, shuffle=self.btn_shuffle.GetValue(), repeat=self.selected_repeat())
+        return self.order
+
+    def selected_repeat(self) -> str:
+        """
+        Возвращает режим повтора, выбранный в интерфейсе.
+        """
+        return self.REPEAT_CHOICES[self.repeat_choice.GetSelection()][0]
+
+    def on_order_settings(self, event):
+        """
+        Применяет переключатель перемешивания и режим повтора к текущему порядку.
+        """
+        if self.order is None:
+            return
+        if self.order.shuffle != self.btn_shuffle.GetValue():
+            self.order.set_shuffle(self.btn_shuffle.GetValue())
+        self.order.set_repeat(self.selected_repeat())
+        self.requeue_next(self.order.playlist)
+
+    def on_play_next(self, event):
+        """
+        Ставит выбранную композицию в очередь «играть следующей».
+        """
+        sel = self.composition_list.GetSelection()
+        if sel != wx.NOT_FOUND and self.current_playlist:
+            node = self.current_playlist.node_at(sel)
+            self.order_for(self.current_playlist).play_next(node)
+            self.requeue_next(self.current_playlist)
+            self.SetStatusText(f"Следующей: {node.data.get_title()}")
+
+    def play_node(self, node, select: bool = True):
+        """
+        Делает узел текущего плейлиста текущим и начинает его воспроизведение.
+
+        Args:
+            node (LinkedListItem): Узел текущего плейлиста.
+            select (bool): Отметить узел в порядке воспроизведения (False, если порядок уже перешел к нему).
+        """
+        order = self.order_for(self.current_playlist)
+        if select:
+            order.select(node)
+        self.composition_list.SetSelection(self.current_playlist.index_of(node))
+        # контроллер выбирает следующий трек здесь, а запускает трек в audio_tasks
+        self.controller.attach(self.current_playlist, order)
+        self.controller.play(node.data)
+        self.show_waveform(node.data)
+
     # === Кнопки воспроизведения ===
     def on_play(self, event):
         """
@@ -318,79 +677,207 @@ class AudioPlayerFrame(wx.Frame):
 
         # Если ничего не выбрано, ставим первую композицию
         if sel == wx.NOT_FOUND:
-            first_comp = self.current_playlist.first_item.data
-            self.current_playlist.current_node = self.current_playlist.first_item
-            self.composition_list.SetSelection(0)
-            self.controller.play(first_comp)
+            self.play_node(self.current_playlist.first_item)
         else:
-            title = self.composition_list.GetString(sel)
-            for c in self.current_playlist.get_all_songs():
-                if c.get_title() == title:
-                    node = self.current_playlist.find_node(c)
-                    self.current_playlist.current_node = node
-                    self.controller.play(c)
-                    break
+            self.play_node(self.current_playlist.node_at(sel))
 
     def on_pause(self, event):
         """
         Приостанавливает или возобновляет воспроизведение текущей композиции.
         """
-        self.controller.pause()
+        self.audio_tasks.submit(self.controller.pause)
 
     def on_stop(self, event):
         """
         Останавливает воспроизведение текущей композиции.
         """
-        self.controller.stop()
+        self.audio_tasks.submit(self.controller.stop)
+        self.progress.set_fraction(0.0)
 
     def on_prev(self, event):
         """
-        Переключает на предыдущую композицию в текущем плейлисте.
+        Переключает на предыдущую композицию: по кольцу плейлиста или, при перемешивании, по истории.
         """
         if not self.current_playlist or not self.current_playlist.first_item:
             return
 
-        prev_c = self.current_playlist.previous_song()
+        node = self.order_for(self.current_playlist).previous()
+        if node is not None:
+            self.play_node(node, select=False)
 
-        # Если текущий трек был первым, идем к последнему
-        if not prev_c:
-            self.current_playlist.current_node = self.current_playlist.last_item
-            prev_c = self.current_playlist.current_node.data
+    def on_next(self, event):
+        """
+        Переключает на следующую композицию с учетом перемешивания, повтора и очереди.
 
-        self.controller.play(prev_c)
+        После последней композиции плейлист начинается сначала, если повтор не выключен.
+        """
+        if not self.current_playlist or not self.current_playlist.first_item:
+            return
 
-        # Обновляем выделение в ListBox
-        all_titles = [c.get_title() for c in self.current_playlist.get_all_songs()]
-        index = all_titles.index(prev_c.get_title())
-        self.composition_list.SetSelection(index)
+        node = self.order_for(self.current_playlist).next()
+        if node is None:
+            self.on_stop(event)
+            return
+        self.play_node(node, select=False)
 
-    def on_next(self, event):
+    def on_track_advanced(self, track: Composition):
+        """
+        Отражает в интерфейсе автоматический переход к следующему треку.
+
+        Переход уже выполнен контроллером: current_node плейлиста сдвинут,
+        следующий трек поставлен в очередь.
+
+        Args:
+            track (Composition): Заигравшая композиция.
+        """
+        playlist = self.controller.playlist
+        if playlist is not None and playlist is self.current_playlist and playlist.current_node is not None:
+            self.composition_list.SetSelection(playlist.index_of(playlist.current_node))
+        self.SetStatusText(f"Играет: {track.get_title()}")
+        self.show_waveform(track)
+
+    # === Громкость ===
+    def on_volume(self, event):
+        """
+        Задает громкость плеера по положению ползунка.
+        """
+        self.audio_tasks.submit(self.controller.set_volume, self.volume_slider.GetValue() / 100)
+
+    def on_normalize(self, event):
+        """
+        Включает или выключает выравнивание громкости треков.
+        """
+        self.audio_tasks.submit(self.controller.set_normalize, self.normalize_box.GetValue())
+
+    def on_crossfade(self, event):
+        """
+        Задает длительность плавного перехода между треками.
+
+        Переход к следующему треку пересчитывается в audio_tasks, если он еще не начался.
+        """
+        seconds = self.CROSSFADE_CHOICES[self.crossfade_choice.GetSelection()][0]
+        self.controller.set_crossfade(seconds)
+
+    def on_analyze_loudness(self, event):
         """
-        Переключает на следующую композицию в текущем плейлисте.
+        Запускает фоновый анализ громкости композиций текущего плейлиста.
+
+        Файлы анализируются в пуле процессов; уже проанализированные берутся из кэша метаданных.
         """
         if not self.current_playlist or not self.current_playlist.first_item:
+            wx.MessageBox("Выберите плейлист с композициями!", "Ошибка", wx.OK | wx.ICON_WARNING)
             return
+        if self._loudness_cancel:
+            self._loudness_cancel.set()
+        from .loudness import LoudnessAnalyzer
+        analyzer = LoudnessAnalyzer(self.metadata)
+        self._loudness_cancel = analyzer.start(
+            self.current_playlist.get_all_songs(),
+            on_progress=lambda done, total: wx.CallAfter(self.SetStatusText, f"Анализ громкости: {done} из {total}"),
+            on_done=lambda analyzed: wx.CallAfter(self.on_loudness_done, analyzed),
+            on_error=lambda error: wx.CallAfter(self.on_loudness_error, error),
+        )
+
+    def on_loudness_done(self, analyzed: int):
+        """
+        Применяет поправку к играющему треку после анализа громкости.
+
+        Args:
+            analyzed (int): Число файлов, для которых известна поправка.
+        """
+        self.audio_tasks.submit(self.controller.refresh_volume)
+        self.SetStatusText(f"Громкость проанализирована: {analyzed} файлов")
+
+    def on_loudness_error(self, error: Exception):
+        """
+        Завершает анализ громкости, прерванный ошибкой: уже найденные поправки остаются в кэше.
+
+        Args:
+            error (Exception): Ошибка анализа.
+        """
+        self.SetStatusText("Анализ громкости прерван")
+        self.on_task_error(error)
 
-        next_c = self.current_playlist.next_song()
+    # === Обзор формы волны ===
+    def show_waveform(self, track: Composition):
+        """
+        Показывает обзор формы волны трека: из кэша на диске или построив его в фоне.
 
-        # Если текущий трек был последним, идем к первому
-        if not next_c:
-            self.current_playlist.current_node = self.current_playlist.first_item
-            next_c = self.current_playlist.current_node.data
+        Args:
+            track (Composition): Начинающаяся композиция.
+        """
+        if self.waveforms is None:
+            # numpy загружается при первом воспроизведении, а не при запуске
+            from .waveform import WaveformCache
+            self.waveforms = WaveformCache(os.path.join(self.json_controller.folder, "waveforms"))
+        self._waveform_track = track
+        self.progress.set_peaks(None)
+        self.waveform_tasks.submit(self.waveforms.get, track.get_path(),
+                                   on_done=lambda peaks: self.on_waveform_ready(track, peaks))
+
+    def on_waveform_ready(self, track: Composition, peaks):
+        """
+        Отображает построенный обзор, если трек еще играет.
 
-        self.controller.play(next_c)
+        Args:
+            track (Composition): Композиция, для которой строился обзор.
+            peaks (Peaks): Обзор формы волны.
+        """
+        if track is self._waveform_track:
+            self.progress.set_peaks(peaks)
 
-        # Обновляем выделение в ListBox
-        all_titles = [c.get_title() for c in self.current_playlist.get_all_songs()]
-        index = all_titles.index(next_c.get_title())
-        self.composition_list.SetSelection(index)
+    def on_waveform_error(self, error: BaseException):
+        """
+        Сообщает в строке состояния, что обзор построить не удалось; полоса остается простой.
+
+        Args:
+            error (BaseException): Исключение построения обзора.
+        """
+        self.SetStatusText(f"Обзор формы волны недоступен: {error}")
+
+    def requeue_next(self, playlist: PlayList):
+        """
+        Обновляет очередь контроллера после изменения играющего плейлиста.
+
+        Args:
+            playlist (PlayList): Измененный плейлист.
+        """
+        if playlist is self.controller.playlist:
+            self.controller.requeue()
 
     # === Метод обновления прогресса ===
-    def update_progress(self, event):
+    def update_progress(self, position_ms: float):
         """
         Обновляет прогресс-бар воспроизведения в интерфейсе.
-        Вызывается таймером каждые 0.5 секунды.
+
+        Вызывается по событию position контроллера, только пока трек играет.
+
+        Args:
+            position_ms (float): Позиция воспроизведения в миллисекундах.
+        """
+        track = self.controller.current_track
+        if track and track.get_duration():
+            self.progress.set_fraction(position_ms / 1000 / track.get_duration())
+
+    def on_seek(self, fraction: float):
+        """
+        Перематывает трек к месту щелчка по полосе прогресса.
+
+        Args:
+            fraction (float): Доля трека от 0 до 1.
+        """
+        track = self.controller.current_track
+        if track:
+            self.controller.seek(fraction * track.get_duration() * 1000)
+            self.progress.set_fraction(fraction)
+
+    def on_track_ended(self, track: Composition):
+        """
+        Сбрасывает прогресс, если после окончания трека воспроизведение остановилось.
+
+        Args:
+            track (Composition): Доигравшая композиция.
         """
-        if self.controller.is_playing and self.controller.current_track:
-            percent = self.controller.get_pos()
-            self.progress.SetValue(percent)
+        if not self.controller.is_playing:
+            self.progress.set_fraction(0.0)
+            self.SetStatusText("")
@@ -0,0 +1,194 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+# Бюджет кэша по умолчанию (байт декодированного звука)
+DEFAULT_BUDGET = 64 * 2 ** 20
+
+
+class CacheStats(NamedTuple):
+    """
+    Счетчики кэша декодированного звука.
+
+    Attributes:
+        hits (int): Сколько раз звук найден в кэше.
+        misses (int): Сколько раз файл пришлось декодировать.
+        evictions (int): Сколько записей вытеснено из-за бюджета или изменения файла.
+        entries (int): Число записей в кэше.
+        bytes (int): Объем декодированного звука в кэше.
+        budget (int): Бюджет кэша в байтах.
+    """
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+    budget: int
+
+
+class DecodedAudioCache:
+    """
+    LRU-кэш декодированного звука (pygame.mixer.Sound) с бюджетом по памяти.
+
+    Ключ записи — путь к файлу; запись действительна, пока не изменилось время
+    изменения файла. При превышении бюджета вытесняются давно не
+    использовавшиеся записи; файл, который больше всего бюджета, декодируется,
+    но в кэш не попадает. Размер записи — объем PCM в формате микшера.
+
+    Декодирование выполняется вне блокировки, поэтому медленный файл не
+    задерживает обращения к кэшу из других потоков. Микшер инициализируется
+    при первом декодировании, если он еще не инициализирован.
+
+    Attributes:
+        budget (int): Бюджет кэша в байтах.
+        _entries (OrderedDict[str, tuple[int, Sound, int]]): Путь -> (mtime_ns, звук, размер), от старых к новым.
+        _bytes (int): Текущий объем записей.
+        _hits (int): Счетчик попаданий.
+        _misses (int): Счетчик промахов.
+        _evictions (int): Счетчик вытеснений.
+        _lock (threading.Lock): Блокировка.
+    """
+    def __init__(self, budget: int = DEFAULT_BUDGET):
+        """
+        Инициализация пустого кэша.
+
+        Args:
+            budget (int): Бюджет кэша в байтах.
+        """
+        self.budget = budget
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _decode(path: str):
+        """Декодирует файл целиком и возвращает звук и его размер в байтах."""
+        from pygame import mixer
+        if not mixer.get_init():
+            mixer.init()
+        sound = mixer.Sound(path)
+        frequency, sample_format, channels = mixer.get_init()
+        size = round(sound.get_length() * frequency) * channels * (abs(sample_format) // 8)
+        return sound, size
+
+    def get(self, path: str):
+        """
+        Возвращает декодированный звук файла, декодируя его при промахе.
+
+        Args:
+            path (str): Путь к аудиофайлу.
+
+        Returns:
+            pygame.mixer.Sound: Декодированный звук.
+
+        Raises:
+            OSError: Если файл недоступен.
+            pygame.error: Если файл не удалось декодировать.
+        """
+        mtime_ns = os.stat(path).st_mtime_ns
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == mtime_ns:
+                self._entries.move_to_end(path)
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+        sound, size = self._decode(path)
+        with self._lock:
+            stale = self._entries.pop(path, None)
+            if stale is not None:
+                # файл изменился или другой поток успел декодировать его раньше
+                self._bytes -= stale[2]
+                if stale[0] != mtime_ns:
+                    self._evictions += 1
+            if size <= self.budget:
+                self._entries[path] = (mtime_ns, sound, size)
+                self._bytes += size
+                self._evict()
+        return sound
+
+    def _evict(self):
+        """Вытесняет давно не использовавшиеся записи, пока объем превышает бюджет."""
+        while self._bytes > self.budget:
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._evictions += 1
+
+    def contains(self, path: str) -> bool:
+        """
+        Проверяет, есть ли файл в кэше (без учета изменения файла и без обновления LRU).
+
+        Args:
+            path (str): Путь к аудиофайлу.
+
+        Returns:
+            bool: True, если запись есть.
+        """
+        with self._lock:
+            return path in self._entries
+
+    def set_budget(self, budget: int):
+        """
+        Меняет бюджет кэша, сразу вытесняя лишние записи.
+
+        Args:
+            budget (int): Новый бюджет в байтах.
+        """
+        with self._lock:
+            self.budget = budget
+            self._evict()
+
+    def clear(self):
+        """Удаляет все записи (счетчики сохраняются)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        """
+        Возвращает текущие счетчики кэша.
+
+        Returns:
+            CacheStats: Снимок счетчиков.
+        """
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._entries), self._bytes,
+                              self.budget)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache(budget: int = DEFAULT_BUDGET) -> DecodedAudioCache:
+    """
+    Возвращает общий кэш процесса, создавая его при первом вызове.
+
+    Args:
+        budget (int): Бюджет, если кэш еще не создан.
+
+    Returns:
+        DecodedAudioCache: Общий кэш.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = DecodedAudioCache(budget)
+        return _shared
+
+
+def active_cache() -> DecodedAudioCache | None:
+    """
+    Возвращает общий кэш, если он уже создан в этом процессе.
+
+    Процессы импорта кэш не создают, и декодированный ради длительности
+    звук в них не удерживается.
+
+    Returns:
+        DecodedAudioCache | None: Общий кэш или None.
+    """
+    return _shared
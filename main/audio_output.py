@@ -0,0 +1,600 @@
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+
+import pygame
+from pygame import mixer
+
+from .audio_cache import DecodedAudioCache
+from .composition import Composition
+from .metadata import probe_wav_format
+from .wav_map import MappedWav, is_wav
+
+# Треки не длиннее стольких секунд воспроизводятся из кэша декодированного звука
+CACHE_MAX_SECONDS = 60.0
+# Длительность порции PCM, которую MappedWavOutput передает микшеру за раз (с)
+WAV_CHUNK_SECONDS = 0.5
+# Как часто поток подачи проверяет канал, когда вот-вот сменится трек (с)
+_BOUNDARY_POLL = 0.005
+
+
+class SeekUnsupported(Exception):
+    """Вывод не может перемотать текущий трек; контроллер перезапускает трек с нужной позиции."""
+
+
+def wav_matches_mixer(path: str) -> bool:
+    """
+    Проверяет, что файл — WAV с целочисленным PCM в формате микшера.
+
+    Такие данные передаются микшеру порциями без преобразования.
+
+    Args:
+        path (str): Путь к файлу.
+
+    Returns:
+        bool: True, если частота, разрядность и число каналов совпадают с микшером.
+    """
+    if not is_wav(path):
+        return False
+    try:
+        wav = probe_wav_format(path)
+    except OSError:
+        return False
+    if wav is None or wav.format_tag != 1:
+        return False
+    frequency, sample_format, channels = mixer.get_init()
+    # 8-битный WAV беззнаковый, 16-битный — знаковый, как форматы микшера 8 и -16
+    wav_format = {8: 8, 16: -16}.get(wav.bits)
+    return (wav.sample_rate, wav_format, wav.channels) == (frequency, sample_format, channels)
+
+
+class AudioOutput(ABC):
+    """
+    Способ вывода звука для PlayerController.
+
+    Вывод запускает композицию, ставит следующую в очередь (gapless), ставит
+    на паузу и останавливает воспроизведение. По окончании каждого трека
+    (и при переходе к треку из очереди) вывод вызывает on_end — из своего
+    потока подачи или из check_end(), которую контроллер вызывает при
+    опросе. Очередь событий pygame не используется: она работает только с
+    инициализированным видео и только в главном потоке. Методы, кроме
+    prepare, вызываются под блокировкой контроллера. Подклассы реализуют play, queue, pause,
+    unpause и stop; остальные методы необязательны.
+
+    Attributes:
+        on_end (Callable[[], None]): Потокобезопасный сигнал окончания трека.
+        volume (float): Громкость вывода от 0 до 1.
+    """
+    def __init__(self, on_end: Callable[[], None]):
+        """
+        Инициализация вывода.
+
+        Args:
+            on_end (Callable[[], None]): Сигнал окончания трека; может вызываться из любого потока.
+        """
+        self.on_end = on_end
+        self.volume = 1.0
+
+    def accepts(self, composition: Composition) -> bool:
+        """
+        Проверяет, подходит ли вывод для композиции.
+
+        Args:
+            composition (Composition): Композиция.
+
+        Returns:
+            bool: True, если композицию следует воспроизводить этим выводом.
+        """
+        return True
+
+    def prepare(self, composition: Composition):
+        """
+        Заранее выполняет долгую часть загрузки композиции (например, декодирование).
+
+        Контроллер вызывает prepare без своей блокировки перед play или queue
+        той же композиции, чтобы они выполнялись быстро. По умолчанию ничего не делает.
+
+        Args:
+            composition (Composition): Композиция.
+        """
+
+    @abstractmethod
+    def play(self, composition: Composition, start: float = 0.0):
+        """
+        Запускает композицию (прежний трек этого вывода останавливается).
+
+        Args:
+            composition (Composition): Композиция.
+            start (float): Позиция начала в секундах.
+        """
+
+    @abstractmethod
+    def queue(self, composition: Composition):
+        """
+        Ставит композицию в очередь: она начнется сразу после текущей.
+
+        Args:
+            composition (Composition): Композиция.
+        """
+
+    def set_pos(self, seconds: float):
+        """
+        Перематывает текущий трек.
+
+        Args:
+            seconds (float): Новая позиция в секундах.
+
+        Raises:
+            SeekUnsupported: Если вывод не умеет перематывать (по умолчанию);
+                контроллер тогда перезапускает трек с нужной позиции.
+        """
+        raise SeekUnsupported(f"{type(self).__name__} cannot seek")
+
+    def get_pos(self) -> int | None:
+        """
+        Возвращает показание микшера: сколько миллисекунд прошло с play().
+
+        Returns:
+            int | None: Миллисекунды или None, если вывод не сообщает позицию
+                (тогда позиция ведется только часами контроллера).
+        """
+        return None
+
+    def overlap(self, composition: Composition) -> float:
+        """
+        Возвращает, за сколько секунд до конца композиции начинается следующая.
+
+        Контроллер учитывает это, чтобы вовремя проверить событие смены трека.
+
+        Args:
+            composition (Composition): Текущая композиция.
+
+        Returns:
+            float: Длительность перекрытия треков; 0 — следующий трек начинается после конца текущего.
+        """
+        return 0.0
+
+    def clear_queue(self):
+        """Отменяет трек из очереди, если вывод это умеет; иначе ничего не делает."""
+
+    def check_end(self):
+        """
+        Опрашивает микшер и вызывает on_end, если трек закончился или начался трек из очереди.
+
+        Нужна выводам, о которых микшер сообщает только событием pygame;
+        выводы с собственным потоком подачи вызывают on_end сами.
+        """
+
+    def set_volume(self, volume: float):
+        """
+        Задает громкость; она сохраняется при смене трека этого вывода.
+
+        Args:
+            volume (float): Громкость от 0 до 1.
+        """
+        self.volume = volume
+
+    @abstractmethod
+    def pause(self):
+        """Ставит воспроизведение на паузу."""
+
+    @abstractmethod
+    def unpause(self):
+        """Возобновляет воспроизведение."""
+
+    @abstractmethod
+    def stop(self):
+        """Останавливает воспроизведение и очищает очередь."""
+
+    def close(self):
+        """Освобождает ресурсы вывода (потоки, открытые файлы)."""
+
+
+class StreamOutput(AudioOutput):
+    """
+    Потоковое воспроизведение через mixer.music: файл декодируется по мере проигрывания.
+
+    Окончание трека определяется опросом: mixer.music.get_busy() становится
+    False, а при переходе к треку из очереди показание get_pos() начинается
+    заново, то есть уменьшается.
+
+    Attributes:
+        _active (bool): Трек запущен и его окончание еще не отмечено.
+        _paused (bool): Воспроизведение на паузе (get_busy() на паузе возвращает False).
+        _last_pos (int): Последнее показание get_pos().
+    """
+    def __init__(self, on_end: Callable[[], None]):
+        super().__init__(on_end)
+        self._active = False
+        self._paused = False
+        self._last_pos = 0
+
+    def play(self, composition: Composition, start: float = 0.0):
+        mixer.music.load(composition.get_path())
+        mixer.music.play(start=start)
+        self._active = True
+        self._paused = False
+        self._last_pos = 0
+
+    def queue(self, composition: Composition):
+        mixer.music.queue(composition.get_path())
+
+    def set_pos(self, seconds: float):
+        try:
+            mixer.music.set_pos(seconds)
+        except pygame.error as e:
+            # перемотку поддерживают не все форматы
+            raise SeekUnsupported(str(e)) from e
+
+    def set_volume(self, volume: float):
+        super().set_volume(volume)
+        mixer.music.set_volume(volume)
+
+    def get_pos(self) -> int | None:
+        position = mixer.music.get_pos()
+        if position < self._last_pos:
+            # микшер перешел к треку из очереди, а check_end() еще не вызывалась
+            self._last_pos = position
+            self.on_end()
+        self._last_pos = max(position, self._last_pos)
+        return position
+
+    def check_end(self):
+        if not self._active or self._paused:
+            return
+        if not mixer.music.get_busy():
+            self._active = False
+            self.on_end()
+            return
+        self.get_pos()
+
+    def pause(self):
+        mixer.music.pause()
+        self._paused = True
+
+    def unpause(self):
+        mixer.music.unpause()
+        self._paused = False
+
+    def stop(self):
+        mixer.music.stop()
+        self._active = False
+
+
+class CachedSoundOutput(AudioOutput):
+    """
+    Воспроизведение декодированного звука из DecodedAudioCache на выделенном канале микшера.
+
+    Подходит для коротких и часто повторяемых треков (джинглы): повторный
+    запуск не читает и не декодирует файл. Трек воспроизводится этим выводом,
+    если он не длиннее max_seconds или уже есть в кэше.
+
+    Окончание трека определяется опросом канала: канал освободился или
+    начал звук из очереди.
+
+    Attributes:
+        cache (DecodedAudioCache): Кэш декодированного звука.
+        max_seconds (float): Наибольшая длительность трека для этого вывода.
+        channel (pygame.mixer.Channel): Канал, зарезервированный за плеером.
+        _sound (pygame.mixer.Sound | None): Звук текущего трека.
+        _queued (pygame.mixer.Sound | None): Звук трека из очереди.
+    """
+    def __init__(self, on_end: Callable[[], None], cache: DecodedAudioCache, max_seconds: float = CACHE_MAX_SECONDS,
+                 channel: int = 0):
+        """
+        Инициализация вывода.
+
+        Args:
+            on_end (Callable[[], None]): Сигнал окончания трека.
+            cache (DecodedAudioCache): Кэш декодированного звука.
+            max_seconds (float): Наибольшая длительность трека для этого вывода.
+            channel (int): Номер канала микшера; каналы до него включительно резервируются.
+        """
+        super().__init__(on_end)
+        self.cache = cache
+        self.max_seconds = max_seconds
+        mixer.set_reserved(channel + 1)
+        self.channel = mixer.Channel(channel)
+        self._sound = None
+        self._queued = None
+
+    def accepts(self, composition: Composition) -> bool:
+        return composition.get_duration() <= self.max_seconds or self.cache.contains(composition.get_path())
+
+    @staticmethod
+    def _tail(sound, start: float):
+        """Возвращает новый звук с остатком sound начиная с позиции start (с)."""
+        frequency, sample_format, channels = mixer.get_init()
+        frame = channels * (abs(sample_format) // 8)
+        raw = sound.get_raw()
+        offset = min(int(start * frequency) * frame, len(raw))
+        return mixer.Sound(buffer=raw[offset:])
+
+    def prepare(self, composition: Composition):
+        # промах кэша декодирует файл здесь, вне блокировки; play и queue берут звук из кэша
+        self.cache.get(composition.get_path())
+
+    def play(self, composition: Composition, start: float = 0.0):
+        sound = self.cache.get(composition.get_path())
+        if start > 0:
+            sound = self._tail(sound, start)
+        self.channel.play(sound)
+        # Channel.play сбрасывает громкость канала
+        self.channel.set_volume(self.volume)
+        self._sound, self._queued = sound, None
+
+    def queue(self, composition: Composition):
+        sound = self.cache.get(composition.get_path())
+        self.channel.queue(sound)
+        self._queued = sound
+
+    def check_end(self):
+        if self._sound is None:
+            return
+        playing = self.channel.get_sound()
+        if self._queued is not None and playing is self._queued:
+            self._sound, self._queued = self._queued, None
+            self.on_end()
+        elif not self.channel.get_busy():
+            self._sound = self._queued = None
+            self.on_end()
+
+    def set_volume(self, volume: float):
+        super().set_volume(volume)
+        self.channel.set_volume(volume)
+
+    def pause(self):
+        self.channel.pause()
+
+    def unpause(self):
+        self.channel.unpause()
+
+    def stop(self):
+        self.channel.stop()
+        self._sound = self._queued = None
+
+
+class _WavTrack:
+    """Трек MappedWavOutput: отображение файла и позиция подачи в нем."""
+    def __init__(self, composition: Composition, start: float = 0.0):
+        self.composition = composition
+        self.wav = MappedWav(composition.get_path())
+        # хотя бы один кадр: окончание трека всегда отмечается сигналом on_end
+        self.offset = min(self.wav.offset_of(start), len(self.wav) - self.wav.format.block_align)
+        # до этого смещения страницы уже возвращены системе
+        self.released = self.offset
+
+    @property
+    def length(self) -> int:
+        """Размер данных трека в байтах."""
+        return len(self.wav)
+
+    def offset_of(self, seconds: float) -> int:
+        """Смещение кадра, ближайшего к позиции seconds."""
+        return self.wav.offset_of(seconds)
+
+    def next_sound(self, size: int, transform=None):
+        """
+        Создает звук из следующей порции данных и сдвигает позицию.
+
+        transform(piece, offset) может вернуть измененную копию порции (например,
+        с наложенной огибающей); она не должна ссылаться на piece.
+        """
+        with self.wav.chunk(self.offset, size) as piece:
+            # Sound копирует только эту порцию; сам файл в память не читается
+            sound = mixer.Sound(buffer=piece if transform is None else transform(piece, self.offset))
+            self.offset += len(piece)
+        return sound
+
+    def exhausted(self) -> bool:
+        return self.offset >= len(self.wav)
+
+    def release_played(self, end: int):
+        """Возвращает системе страницы до смещения end."""
+        if end > self.released:
+            self.wav.release(self.released, end)
+            self.released = end
+
+    def close(self):
+        self.wav.close()
+
+
+class MappedWavOutput(AudioOutput):
+    """
+    Воспроизведение WAV-файлов из отображения в память на выделенном канале микшера.
+
+    Файл не читается целиком и не декодируется: фоновый поток подачи
+    передает каналу порции PCM длиной chunk_seconds прямо из отображения
+    (memoryview-срезы без копирования), поддерживая одну порцию в очереди
+    канала. Запуск многочасовой записи мгновенный, а проигранные страницы
+    возвращаются системе, так что резидентная память не растет. Перемотка
+    сводится к смене смещения.
+
+    Подходят WAV с целочисленным PCM, частотой, разрядностью и числом каналов
+    как у микшера (данные передаются микшеру без преобразования); остальные
+    файлы воспроизводятся другими выводами.
+
+    Об окончании трека сообщает поток подачи (on_end): когда канал начинает
+    первую порцию трека из очереди и когда доиграна последняя порция.
+
+    Attributes:
+        chunk_seconds (float): Длительность порции в секундах.
+        channel (pygame.mixer.Channel): Канал, зарезервированный за плеером.
+        _current (_WavTrack | None): Трек, который сейчас подается на канал.
+        _next (_WavTrack | None): Трек из очереди.
+        _boundary (pygame.mixer.Sound | None): Первая порция трека из очереди, уже переданная каналу.
+        _played (list[tuple[_WavTrack, Sound, int]]): Порции в канале: трек, звук и смещение конца порции.
+        _paused (bool): Воспроизведение на паузе.
+        _condition (threading.Condition): Блокировка состояния и пробуждение потока подачи.
+        _thread (threading.Thread | None): Поток подачи; запускается при первом play().
+        _closed (bool): Вывод закрыт.
+    """
+    def __init__(self, on_end: Callable[[], None], chunk_seconds: float = WAV_CHUNK_SECONDS, channel: int = 1):
+        """
+        Инициализация вывода.
+
+        Args:
+            on_end (Callable[[], None]): Сигнал окончания трека.
+            chunk_seconds (float): Длительность порции в секундах.
+            channel (int): Номер канала микшера; каналы до него включительно резервируются.
+        """
+        super().__init__(on_end)
+        self.chunk_seconds = chunk_seconds
+        mixer.set_reserved(channel + 1)
+        self.channel = mixer.Channel(channel)
+        self._current = None
+        self._next = None
+        self._boundary = None
+        self._played = []
+        self._paused = False
+        self._condition = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    def accepts(self, composition: Composition) -> bool:
+        return wav_matches_mixer(composition.get_path())
+
+    def _chunk_size(self, track: _WavTrack) -> int:
+        wav = track.wav.format
+        return max(int(self.chunk_seconds * wav.sample_rate), 1) * wav.block_align
+
+    def _feed(self, track: _WavTrack):
+        """Передает каналу следующую порцию трека и возвращает ее; вызывается под блокировкой."""
+        sound = track.next_sound(self._chunk_size(track))
+        if self.channel.get_busy():
+            self.channel.queue(sound)
+        else:
+            self.channel.play(sound)
+            # Channel.play сбрасывает громкость канала
+            self.channel.set_volume(self.volume)
+        self._played.append((track, sound, track.offset))
+        return sound
+
+    def _close_tracks(self):
+        """Останавливает канал и закрывает треки; вызывается под блокировкой."""
+        self.channel.stop()
+        self._played.clear()
+        self._boundary = None
+        for track in (self._current, self._next):
+            if track is not None:
+                track.close()
+        self._current = self._next = None
+
+    def play(self, composition: Composition, start: float = 0.0):
+        track = _WavTrack(composition, start)
+        with self._condition:
+            self._close_tracks()
+            self._current = track
+            self._paused = False
+            # первая порция передается сразу, не дожидаясь потока подачи
+            self._feed(track)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="wav-feeder", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def queue(self, composition: Composition):
+        track = _WavTrack(composition)
+        with self._condition:
+            if self._next is not None:
+                self._next.close()
+            self._next = track
+            self._condition.notify()
+
+    def clear_queue(self):
+        with self._condition:
+            # начало трека из очереди уже в канале: отменять поздно
+            if self._next is not None and self._boundary is None:
+                self._next.close()
+                self._next = None
+
+    def set_pos(self, seconds: float):
+        with self._condition:
+            track = self._current
+            # если канал уже получил начало трека из очереди или позиция за
+            # концом файла, контроллер перезапускает трек через play()
+            if track is None or self._boundary is not None:
+                raise SeekUnsupported("the queued track has already reached the channel")
+            offset = track.wav.offset_of(seconds)
+            if offset >= len(track.wav):
+                raise SeekUnsupported("position is past the end of the file")
+            self.channel.stop()
+            self._played.clear()
+            track.offset = track.released = offset
+            self._feed(track)
+            if self._paused:
+                self.channel.pause()
+            self._condition.notify()
+
+    def set_volume(self, volume: float):
+        with self._condition:
+            super().set_volume(volume)
+            self.channel.set_volume(volume)
+
+    def pause(self):
+        with self._condition:
+            self._paused = True
+            self.channel.pause()
+
+    def unpause(self):
+        with self._condition:
+            self._paused = False
+            self.channel.unpause()
+            self._condition.notify()
+
+    def stop(self):
+        with self._condition:
+            self._close_tracks()
+            self._paused = False
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._close_tracks()
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _advance(self) -> float | None:
+        """
+        Один шаг потока подачи; вызывается под блокировкой.
+
+        Returns:
+            float | None: Через сколько секунд повторить шаг; None — ждать пробуждения.
+        """
+        if self._current is None:
+            return None
+        if self._paused:
+            return None
+        playing = self.channel.get_sound()
+        # порции перед играющей уже проиграны: их страницы больше не нужны
+        while self._played and self._played[0][1] is not playing:
+            track, _, end = self._played.pop(0)
+            track.release_played(end)
+        if self._boundary is not None and playing is self._boundary:
+            # канал перешел к треку из очереди
+            self._boundary = None
+            finished, self._current = self._current, self._next
+            self._next = None
+            finished.close()
+            self.on_end()
+        if self.channel.get_queue() is None:
+            if not self._current.exhausted():
+                self._feed(self._current)
+            elif self._next is not None and self._boundary is None:
+                self._boundary = self._feed(self._next)
+            elif self._boundary is None and not self.channel.get_busy():
+                # последняя порция доиграна, а очереди нет
+                self._close_tracks()
+                self.on_end()
+                return None
+        if self._boundary is not None or self._current.exhausted():
+            return _BOUNDARY_POLL
+        return self.chunk_seconds / 4
+
+    def _run(self):
+        """Цикл потока подачи."""
+        with self._condition:
+            while not self._closed:
+                timeout = self._advance()
+                self._condition.wait(timeout)
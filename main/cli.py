@@ -0,0 +1,179 @@
+import argparse
+import os
+import sys
+
+from .composition import format_duration
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Создает разборщик аргументов командной строки.
+
+    Returns:
+        argparse.ArgumentParser: Разборщик с командами list, search, import, queue, move, loudness, play, export
+            и migrate.
+    """
+    parser = argparse.ArgumentParser(prog="python -m main", description="Аудиоплеер без графического интерфейса.")
+    parser.add_argument("--folder", default="playlists", help="папка с плейлистами (по умолчанию playlists)")
+    parser.add_argument("--format", dest="file_format", choices=("binary", "json"), default="binary",
+                        help="формат файлов плейлистов")
+    parser.add_argument("--storage", dest="backend", choices=("files", "sqlite"), default="files",
+                        help="хранилище плейлистов: файл на плейлист или база playlists.sqlite")
+    parser.add_argument("--audio-driver", help="звуковой драйвер SDL, например dummy для нагрузочных тестов")
+    parser.add_argument("--audio-cache", type=int, default=64, metavar="MB",
+                        help="бюджет кэша декодированного звука в МБ (0 — без кэша)")
+    parser.add_argument("--no-gapless", dest="gapless", action="store_false",
+                        help="загружать следующий трек только после окончания текущего")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="список плейлистов или композиций плейлиста")
+    list_parser.add_argument("name", nargs="?", help="имя плейлиста")
+
+    search_parser = commands.add_parser("search", help="поиск композиций по названию и пути во всех плейлистах")
+    search_parser.add_argument("query", help="слова запроса (префиксы; допускаются опечатки)")
+    search_parser.add_argument("--limit", type=int, default=50, help="максимальное число результатов")
+
+    import_parser = commands.add_parser("import", help="импорт каталога с музыкой в плейлист")
+    import_parser.add_argument("name", help="имя плейлиста")
+    import_parser.add_argument("root", help="каталог с музыкой")
+
+    queue_parser = commands.add_parser("queue", help="добавить файлы в конец плейлиста")
+    queue_parser.add_argument("name", help="имя плейлиста")
+    queue_parser.add_argument("paths", nargs="+", help="аудиофайлы")
+
+    move_parser = commands.add_parser("move", help="переместить композиции плейлиста")
+    move_parser.add_argument("name", help="имя плейлиста")
+    move_parser.add_argument("numbers", nargs="+", type=int, help="номера композиций (с 1)")
+    move_parser.add_argument("--to", type=int, required=True, help="новый номер первой из перемещаемых композиций")
+
+    loudness_parser = commands.add_parser("loudness", help="проанализировать громкость композиций плейлиста")
+    loudness_parser.add_argument("name", help="имя плейлиста")
+
+    play_parser = commands.add_parser("play", help="воспроизвести плейлист")
+    play_parser.add_argument("name", help="имя плейлиста")
+    play_parser.add_argument("--index", type=int, default=0, help="номер первой композиции")
+    play_parser.add_argument("--tracks", type=int, help="сколько треков проиграть (по умолчанию весь плейлист)")
+    play_parser.add_argument("--seconds", type=float, help="ограничение времени воспроизведения")
+    play_parser.add_argument("--cache-stats", action="store_true", help="вывести счетчики кэша декодированного звука")
+    play_parser.add_argument("--volume", type=int, default=100, metavar="PERCENT", help="громкость от 0 до 100")
+    play_parser.add_argument("--no-normalize", dest="normalize", action="store_false",
+                             help="не выравнивать громкость треков по результатам анализа")
+    play_parser.add_argument("--crossfade", type=float, default=0.0, metavar="SECONDS",
+                             help="плавный переход между треками указанной длительности")
+    play_parser.add_argument("--fade-curve", choices=("equal_power", "linear", "s_curve"), default="equal_power",
+                             help="кривая перехода (по умолчанию equal_power)")
+
+    export_parser = commands.add_parser("export", help="экспорт плейлиста в .json, .apl, .m3u или .m3u8")
+    export_parser.add_argument("name", help="имя плейлиста")
+    export_parser.add_argument("path", help="файл для экспорта")
+
+    migrate_parser = commands.add_parser("migrate", help="перенести плейлисты из папки с файлами в базу SQLite")
+    migrate_parser.add_argument("source", help="папка с файлами плейлистов")
+    return parser
+
+
+def run(engine, args) -> int:
+    """
+    Выполняет команду.
+
+    Args:
+        engine (PlayerEngine): Движок плеера.
+        args (argparse.Namespace): Разобранные аргументы.
+
+    Returns:
+        int: Код завершения.
+    """
+    if args.command == "list":
+        if args.name is None:
+            for name in engine.list_playlists():
+                print(name)
+        else:
+            for number, composition in enumerate(engine.get_playlist(args.name).get_all_songs(), 1):
+                print(f"{number}\t{format_duration(composition.get_duration())}\t{composition.get_title()}")
+    elif args.command == "search":
+        for name, composition in engine.search(args.query, args.limit):
+            print(f"{name}\t{format_duration(composition.get_duration())}\t{composition.get_title()}")
+    elif args.command == "import":
+        imported = engine.import_folder(
+            args.name, args.root,
+            on_progress=lambda done, total: print(f"\rИмпорт: {done} из {total}", end="", file=sys.stderr))
+        print(file=sys.stderr)
+        print(f"Импортировано композиций: {imported}")
+    elif args.command == "queue":
+        for composition in engine.queue(args.name, args.paths):
+            print(f"Добавлено: {composition.get_title()}")
+    elif args.command == "move":
+        engine.move(args.name, [number - 1 for number in args.numbers], args.to - 1)
+    elif args.command == "loudness":
+        analyzed = engine.analyze_loudness(
+            args.name,
+            on_progress=lambda done, total: print(f"\rАнализ: {done} из {total}", end="", file=sys.stderr))
+        print(file=sys.stderr)
+        for number, composition in enumerate(engine.get_playlist(args.name).get_all_songs(), 1):
+            gain = "—" if composition.gain is None else f"{composition.gain:+.1f} дБ"
+            print(f"{number}\t{gain}\t{composition.get_title()}")
+        print(f"Проанализировано файлов: {analyzed}")
+    elif args.command == "play":
+        playlist = engine.get_playlist(args.name)
+        engine.controller.set_volume(args.volume / 100)
+        engine.controller.set_normalize(args.normalize)
+        engine.controller.set_crossfade(args.crossfade, args.fade_curve)
+        engine.play(args.name, args.index)
+        if not engine.controller.is_playing:
+            return 1
+        tracks = args.tracks if args.tracks is not None else len(playlist) - args.index
+        started = 1
+
+        def on_started(track):
+            nonlocal started
+            started += 1
+            if started <= tracks:
+                print(f"Играет: {track.get_title()}", flush=True)
+
+        engine.controller.subscribe("track_started", on_started)
+        print(f"Играет: {playlist.node_at(args.index).data.get_title()}", flush=True)
+        engine.wait(tracks, args.seconds)
+        stats = engine.cache_stats()
+        if args.cache_stats and stats is not None:
+            print(f"Кэш звука: попаданий {stats.hits}, промахов {stats.misses}, вытеснений {stats.evictions}, "
+                  f"{stats.entries} записей, {stats.bytes / 2 ** 20:.1f} из {stats.budget / 2 ** 20:.0f} МБ",
+                  file=sys.stderr)
+    elif args.command == "export":
+        engine.export(args.name, args.path)
+    elif args.command == "migrate":
+        if args.backend != "sqlite":
+            print("Перенос выполняется в базу: укажите --storage sqlite", file=sys.stderr)
+            return 2
+        print(f"Перенесено плейлистов: {engine.storage.import_files(args.source)}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Точка входа командной строки.
+
+    Args:
+        argv (list[str] | None): Аргументы; по умолчанию sys.argv[1:].
+
+    Returns:
+        int: Код завершения.
+    """
+    args = build_parser().parse_args(argv)
+    if args.audio_driver:
+        # драйвер выбирается при инициализации микшера, поэтому задается до импорта pygame
+        os.environ["SDL_AUDIODRIVER"] = args.audio_driver
+    from .engine import PlayerEngine
+    engine = PlayerEngine(args.folder, file_format=args.file_format, gapless=args.gapless, backend=args.backend,
+                          audio_cache_bytes=args.audio_cache * 2 ** 20)
+    try:
+        return run(engine, args)
+    except KeyError as e:
+        print(f"Плейлист не найден: {e.args[0]}", file=sys.stderr)
+        return 1
+    except (IndexError, OSError, ValueError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        engine.close()
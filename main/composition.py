@@ -6,8 +6,11 @@ class Composition:
         title (str): Название трека.
         duration (float): Продолжительность трека в секундах.
         path (str): Путь к аудиофайлу.
+        gain (float | None): Поправка громкости в дБ по результатам анализа; None — трек не анализировался.
     """
-    def __init__(self, title: str, duration: float, path: str):
+    __slots__ = ("title", "duration", "path", "gain")
+
+    def __init__(self, title: str, duration: float, path: str, gain: float | None = None):
         """
         Инициализация объекта Composition.
 
@@ -15,10 +18,12 @@ class Composition:
             title (str): Название трека.
             duration (float): Продолжительность трека в секундах.
             path (str): Путь к аудиофайлу.
+            gain (float | None): Поправка громкости в дБ.
         """
         self.title = title
         self.duration = duration
         self.path = path
+        self.gain = gain
 
     def get_path(self) -> str:
         """
@@ -81,3 +86,17 @@ class Composition:
             return self.duration == other
 
         return False
+
+
+def format_duration(seconds: float) -> str:
+    """
+    Форматирует длительность в виде м:сс.
+
+    Args:
+        seconds (float): Длительность в секундах.
+
+    Returns:
+        str: Строка вида "3:07".
+    """
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    return f"{minutes}:{seconds:02d}"
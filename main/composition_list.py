@@ -0,0 +1,164 @@
+import wx
+
+from .composition import format_duration
+from .Playlist import PlayList
+
+
+class CompositionListCtrl(wx.ListCtrl):
+    """
+    Виртуальный список композиций.
+
+    Не хранит строки у себя: текст запрашивается у плейлиста только для видимых
+    строк (OnGetItemText), поэтому обновление не зависит от размера плейлиста.
+    Поддерживает методы GetSelection/SetSelection, как у wx.ListBox.
+
+    Выделенные строки можно перетащить мышью; при отпускании вызывается
+    on_rows_dropped(rows, index), где index — новая позиция первой из них.
+
+    Attributes:
+        playlist (PlayList | None): Отображаемый плейлист.
+        on_rows_dropped (Callable[[list[int], int], None] | None): Обработчик перетаскивания строк.
+        _drag_rows (list[int] | None): Перетаскиваемые строки.
+    """
+    COLUMNS = (("#", 60), ("Название", 360), ("Длительность", 100))
+
+    def __init__(self, parent):
+        """
+        Инициализация списка.
+
+        Args:
+            parent (wx.Window): Родительское окно.
+        """
+        super().__init__(parent, style=wx.LC_REPORT | wx.LC_VIRTUAL)
+        for number, (label, width) in enumerate(self.COLUMNS):
+            self.InsertColumn(number, label, width=width)
+        self.playlist = None
+        self.on_rows_dropped = None
+        self._drag_rows = None
+        self.Bind(wx.EVT_LIST_BEGIN_DRAG, self._on_begin_drag)
+        self.Bind(wx.EVT_LEFT_UP, self._on_drop)
+        self.Bind(wx.EVT_MOUSE_CAPTURE_LOST, self._on_capture_lost)
+
+    def set_playlist(self, playlist: PlayList | None):
+        """
+        Переключает список на другой плейлист.
+
+        Args:
+            playlist (PlayList | None): Новый плейлист или None, чтобы очистить список.
+        """
+        self.playlist = playlist
+        self.SetItemCount(len(playlist) if playlist else 0)
+        self.Refresh()
+
+    def sync_count(self):
+        """Подстраивает число строк под размер плейлиста (после добавления или удаления)."""
+        self.SetItemCount(len(self.playlist) if self.playlist else 0)
+
+    def refresh_rows(self, *rows: int):
+        """
+        Перерисовывает только указанные строки.
+
+        Args:
+            *rows (int): Номера строк.
+        """
+        count = self.GetItemCount()
+        for row in rows:
+            if 0 <= row < count:
+                self.RefreshItem(row)
+
+    def refresh_from(self, first: int):
+        """
+        Перерисовывает строки начиная с first (после удаления или вставки).
+
+        Args:
+            first (int): Номер первой изменившейся строки.
+        """
+        self.sync_count()
+        count = self.GetItemCount()
+        if 0 <= first < count:
+            self.RefreshItems(first, count - 1)
+
+    def OnGetItemText(self, item: int, column: int) -> str:
+        """Возвращает текст ячейки по запросу виртуального списка."""
+        if self.playlist is None or item >= len(self.playlist):
+            return ""
+        if column == 0:
+            return str(item + 1)
+        composition = self.playlist.node_at(item).data
+        if column == 1:
+            return composition.get_title()
+        return format_duration(composition.get_duration())
+
+    def get_selected_rows(self) -> list[int]:
+        """Возвращает номера выделенных строк по возрастанию."""
+        rows = []
+        row = self.GetFirstSelected()
+        while row != wx.NOT_FOUND:
+            rows.append(row)
+            row = self.GetNextSelected(row)
+        return rows
+
+    def select_rows(self, first: int, count: int):
+        """
+        Выделяет строки first ... first + count - 1, снимая прежнее выделение.
+
+        Args:
+            first (int): Номер первой строки.
+            count (int): Число строк.
+        """
+        for row in self.get_selected_rows():
+            self.Select(row, on=False)
+        for row in range(first, min(first + count, self.GetItemCount())):
+            self.Select(row)
+        if 0 <= first < self.GetItemCount():
+            self.Focus(first)
+
+    # === Перетаскивание ===
+    def _on_begin_drag(self, event):
+        """Начинает перетаскивание выделенных строк."""
+        rows = self.get_selected_rows()
+        if rows and self.on_rows_dropped is not None:
+            self._drag_rows = rows
+            self.SetCursor(wx.Cursor(wx.CURSOR_HAND))
+            self.CaptureMouse()
+
+    def _end_drag(self) -> list[int] | None:
+        """Завершает перетаскивание и возвращает перетаскиваемые строки."""
+        rows, self._drag_rows = self._drag_rows, None
+        self.SetCursor(wx.NullCursor)
+        if self.HasCapture():
+            self.ReleaseMouse()
+        return rows
+
+    def _on_capture_lost(self, event):
+        """Отменяет перетаскивание, если мышь перехвачена другим окном."""
+        self._end_drag()
+
+    def _on_drop(self, event):
+        """Перемещает строки туда, где отпущена кнопка мыши."""
+        event.Skip()
+        if self._drag_rows is None:
+            return
+        rows = self._end_drag()
+        position = event.GetPosition()
+        row, flags = self.HitTest(position)
+        if row == wx.NOT_FOUND:
+            # выше первой видимой строки (на заголовке) — перед ней, ниже последней — в конец
+            top = self.GetTopItem()
+            row = top if position.y < self.GetItemRect(top).y else self.GetItemCount()
+        # строки вставляются перед row; перемещаемые строки выше нее освобождают места
+        index = row - sum(1 for moved in rows if moved < row)
+        self.on_rows_dropped(rows, index)
+
+    def GetSelection(self) -> int:
+        """Возвращает номер выделенной строки или wx.NOT_FOUND."""
+        return self.GetFirstSelected()
+
+    def SetSelection(self, index: int):
+        """
+        Выделяет строку и прокручивает список к ней.
+
+        Args:
+            index (int): Номер строки.
+        """
+        self.select_rows(index, 1)
@@ -0,0 +1,598 @@
+import threading
+from collections.abc import Callable
+
+import numpy as np
+from pygame import mixer, sndarray
+
+from .audio_cache import DecodedAudioCache
+from .audio_output import (WAV_CHUNK_SECONDS, _BOUNDARY_POLL, AudioOutput, SeekUnsupported, _WavTrack,
+                           wav_matches_mixer)
+from .composition import Composition
+from .pcm import PcmReader, is_pcm_wav
+
+# Длительность перехода по умолчанию (с)
+DEFAULT_CROSSFADE = 4.0
+# Бюджет декодированного звука (байт). WAV подаются порциями, а сжатые форматы
+# pygame декодирует только целиком; в памяти одновременно бывают четыре таких
+# трека — затухающий, текущий, следующий и подготовленный ему на замену, —
+# поэтому трек принимается, если после декодирования займет не больше четверти
+# бюджета (64 МБ — около 6 мин звука 44,1 кГц / 16 бит / стерео); более длинные
+# воспроизводятся другими выводами
+DECODED_BUDGET = 256 * 2 ** 20
+
+# Кривые нарастания громкости: доля перехода x от 0 до 1 -> множитель.
+# Затухание уходящего трека — та же кривая от 1 - x.
+FADE_CURVES = {
+    "linear": lambda x: x,
+    # сумма мощностей двух треков постоянна: без провала громкости в середине перехода
+    "equal_power": lambda x: np.sin(x * (np.pi / 2)),
+    "s_curve": lambda x: 0.5 - 0.5 * np.cos(x * np.pi),
+}
+
+# Тип отсчетов и значение тишины для форматов микшера
+_MIXER_TYPES = {8: (np.uint8, 128.0), -8: (np.int8, 0.0), 16: (np.uint16, 32768.0), -16: (np.int16, 0.0),
+                32: (np.float32, 0.0), -32: (np.int32, 0.0)}
+
+
+class _ConvertedWavTrack:
+    """
+    Трек CrossfadeOutput из WAV не в формате микшера; интерфейс как у _WavTrack.
+
+    Отсчеты читаются из отображения файла (PcmReader) только для очередной
+    порции и преобразуются в формат микшера: число каналов сводится или
+    размножается, частота пересчитывается линейной интерполяцией, а
+    проигранные страницы возвращаются системе. Память не зависит от длины
+    трека. Смещения считаются в байтах преобразованного звука.
+    """
+    def __init__(self, composition: Composition, start: float = 0.0):
+        self.composition = composition
+        self.reader = PcmReader(composition.get_path())
+        self.frequency, sample_format, self.channels = mixer.get_init()
+        self.dtype, self.zero = _MIXER_TYPES[sample_format]
+        self.scale = 1.0 if sample_format == 32 else float(2 ** (abs(sample_format) - 1))
+        self.frame = self.channels * np.dtype(self.dtype).itemsize
+        # сколько кадров файла приходится на кадр микшера
+        self.ratio = self.reader.sample_rate / self.frequency
+        self.frames = int(self.reader.total_frames / self.ratio)
+        self.offset = min(self.offset_of(start), self.length - self.frame)
+        self.released = self.offset
+
+    @property
+    def length(self) -> int:
+        return self.frames * self.frame
+
+    def offset_of(self, seconds: float) -> int:
+        return min(int(seconds * self.frequency) * self.frame, self.length)
+
+    def _source_frame(self, offset: int) -> int:
+        """Кадр файла, соответствующий смещению в преобразованном звуке."""
+        return int(offset // self.frame * self.ratio)
+
+    def _convert(self, first: int, count: int) -> np.ndarray:
+        """Возвращает count кадров микшера начиная с first в формате микшера."""
+        positions = (first + np.arange(count, dtype=np.float64)) * self.ratio
+        base = int(positions[0])
+        source = self.reader.read(base, int(positions[-1]) - base + 2)
+        positions -= base
+        index = positions.astype(np.int64)
+        weight = (positions - index).astype(np.float32)[:, None]
+        following = np.minimum(index + 1, len(source) - 1)
+        samples = source[index] * (1 - weight) + source[following] * weight
+        channels = samples.shape[1]
+        if channels != self.channels:
+            if self.channels == 1:
+                samples = samples.mean(axis=1, keepdims=True)
+            elif channels == 1:
+                samples = np.repeat(samples, self.channels, axis=1)
+            else:
+                # лишние каналы отбрасываются, недостающие повторяют последний
+                keep = [min(i, channels - 1) for i in range(self.channels)]
+                samples = samples[:, keep]
+        samples = samples * self.scale + self.zero
+        if self.dtype != np.float32:
+            info = np.iinfo(self.dtype)
+            samples = np.clip(np.rint(samples), info.min, info.max)
+        return np.ascontiguousarray(samples, dtype=self.dtype)
+
+    def next_sound(self, size: int, transform=None):
+        count = min(size, self.length - self.offset) // self.frame
+        piece = memoryview(self._convert(self.offset // self.frame, count).reshape(-1).view(np.uint8))
+        sound = mixer.Sound(buffer=piece if transform is None else transform(piece, self.offset))
+        self.offset += len(piece)
+        return sound
+
+    def exhausted(self) -> bool:
+        return self.offset >= self.length
+
+    def release_played(self, end: int):
+        """Возвращает системе страницы файла до смещения end."""
+        if end > self.released:
+            self.reader.release(self._source_frame(self.released), self._source_frame(end))
+            self.released = end
+
+    def close(self):
+        self.reader.close()
+
+
+class _DecodedTrack:
+    """
+    Трек CrossfadeOutput из декодированного звука; интерфейс как у _WavTrack.
+
+    Порции нарезаются из буфера звука без копирования. Звук, декодированный
+    не из кэша, один раз копируется в массив точного размера: mixer.Sound
+    хранит буфер преобразования формата, который втрое больше самого звука
+    (для 5 мин 22,05 кГц моно — около 150 МБ вместо 50 МБ).
+    """
+    def __init__(self, composition: Composition, cache: DecodedAudioCache | None = None, start: float = 0.0):
+        self.composition = composition
+        path = composition.get_path()
+        self.frequency, _, channels = mixer.get_init()
+        # длинный трек не вытесняет из кэша короткие: берется оттуда, только если уже декодирован
+        if cache is not None and cache.contains(path):
+            self.sound = cache.get(path)
+            samples = sndarray.samples(self.sound)
+            self.data = samples.reshape(-1).view(np.uint8)
+        else:
+            self.sound = None
+            samples = sndarray.samples(mixer.Sound(path))
+            self.data = samples.reshape(-1).view(np.uint8).copy()
+        self.frame = channels * samples.itemsize
+        self.offset = min(self.offset_of(start), self.length - self.frame)
+
+    @property
+    def length(self) -> int:
+        return len(self.data)
+
+    def offset_of(self, seconds: float) -> int:
+        return min(int(seconds * self.frequency) * self.frame, self.length)
+
+    def next_sound(self, size: int, transform=None):
+        piece = self.data[self.offset:self.offset + size]
+        sound = mixer.Sound(buffer=piece if transform is None else transform(memoryview(piece), self.offset))
+        self.offset += len(piece)
+        return sound
+
+    def exhausted(self) -> bool:
+        return self.offset >= self.length
+
+    def release_played(self, end: int):
+        """Звук уже в памяти целиком: освобождать нечего."""
+
+    def close(self):
+        self.sound = self.data = None
+
+
+class _Deck:
+    """
+    Дека CrossfadeOutput: канал микшера и трек, который на него подается.
+
+    Attributes:
+        channel (pygame.mixer.Channel): Канал деки.
+        track (_WavTrack | _ConvertedWavTrack | _DecodedTrack | None): Трек деки.
+        volume (float): Громкость канала (громкость трека с его поправкой).
+        fade_in (int): Длина нарастания в начале трека, байт; 0 — без нарастания.
+        fade_out (int | None): Смещение начала затухания; None — без затухания.
+        played (list[tuple[Sound, int]]): Порции в канале и смещения их концов.
+    """
+    def __init__(self, channel):
+        self.channel = channel
+        self.track = None
+        self.volume = 1.0
+        self.fade_in = 0
+        self.fade_out = None
+        self.played = []
+
+    def load(self, track, fade_in: int = 0):
+        """Назначает деке трек."""
+        self.track = track
+        self.fade_in = fade_in
+        self.fade_out = None
+
+    def release(self):
+        """Отдает системе страницы проигранных порций."""
+        playing = self.channel.get_sound()
+        while self.played and self.played[0][0] is not playing:
+            _, end = self.played.pop(0)
+            self.track.release_played(end)
+
+    def clear(self):
+        """Останавливает канал и закрывает трек."""
+        self.channel.stop()
+        self.played.clear()
+        if self.track is not None:
+            self.track.close()
+        self.track = None
+        self.fade_in = 0
+        self.fade_out = None
+
+
+class CrossfadeOutput(AudioOutput):
+    """
+    Воспроизведение с плавным переходом между треками на двух каналах микшера.
+
+    Каждый трек играет на своей деке (канале). За fade_seconds до конца
+    текущего трека следующий запускается на второй деке: хвост уходящего
+    трека затухает, а начало следующего нарастает по кривой fade_curve.
+    Огибающая накладывается на отсчеты (NumPy) только в порциях, попадающих
+    в переход, — остальные порции передаются микшеру без обработки, а
+    сводит две деки сам микшер SDL. Поток подачи работает в фоне,
+    поддерживая в канале каждой деки одну порцию chunk_seconds в очереди,
+    и запускает следующий трек, как только канал уходящего начал первую
+    порцию затухания.
+
+    Данные подаются порциями: WAV в формате микшера — из отображения файла
+    в память, как в MappedWavOutput, остальные PCM WAV — из отображения с
+    преобразованием каждой порции в формат микшера, поэтому память не
+    зависит от длины трека. Сжатые форматы pygame декодирует только
+    целиком: треки, которые в декодированном виде заняли бы больше четверти
+    decoded_budget, этим выводом не воспроизводятся. Размер оценивается по
+    длительности и формату микшера; треки, уже декодированные в кэше,
+    принимаются всегда.
+
+    Долгая часть подготовки — открытие и декодирование — выполняется в
+    prepare(), которую контроллер вызывает заранее и без своей блокировки;
+    play() и queue() подставляют уже готовый трек.
+
+    Переход длится не дольше половины каждого из двух треков. Сигнал
+    окончания трека подается в начале перехода, поэтому позиция и
+    громкость следующего трека ведутся с момента его запуска; громкость
+    уходящего трека сохраняется до конца затухания. При fade_seconds = 0
+    вывод не принимает треков.
+
+    Attributes:
+        fade_seconds (float): Длительность перехода в секундах.
+        fade_curve (str): Кривая перехода, ключ FADE_CURVES.
+        cache (DecodedAudioCache | None): Кэш декодированного звука.
+        decoded_budget (int): Бюджет в байтах на треки, которые нужно декодировать целиком.
+        chunk_seconds (float): Длительность порции в секундах.
+        _decks (tuple[_Deck, _Deck]): Деки.
+        _current (_Deck): Дека текущего трека.
+        _fading (_Deck | None): Дека затухающего трека во время перехода.
+        _next (_WavTrack | _ConvertedWavTrack | _DecodedTrack | None): Трек из очереди.
+        _prepared (_WavTrack | _ConvertedWavTrack | _DecodedTrack | None): Трек, открытый prepare().
+        _boundary (pygame.mixer.Sound | None): Первая порция затухания текущего трека, уже переданная каналу.
+        _paused (bool): Воспроизведение на паузе.
+        _condition (threading.Condition): Блокировка состояния и пробуждение потока подачи.
+        _thread (threading.Thread | None): Поток подачи; запускается при первом play().
+        _closed (bool): Вывод закрыт.
+    """
+    def __init__(self, on_end: Callable[[], None], fade_seconds: float = DEFAULT_CROSSFADE,
+                 fade_curve: str = "equal_power", cache: DecodedAudioCache | None = None,
+                 decoded_budget: int = DECODED_BUDGET, chunk_seconds: float = WAV_CHUNK_SECONDS, channel: int = 2):
+        """
+        Инициализация вывода.
+
+        Args:
+            on_end (Callable[[], None]): Сигнал окончания трека.
+            fade_seconds (float): Длительность перехода в секундах.
+            fade_curve (str): Кривая перехода, ключ FADE_CURVES.
+            cache (DecodedAudioCache | None): Кэш, из которого берутся уже декодированные треки.
+            decoded_budget (int): Бюджет в байтах на одновременно открытые треки сжатых форматов.
+            chunk_seconds (float): Длительность порции в секундах.
+            channel (int): Номер первого из двух каналов микшера; каналы до второго включительно резервируются.
+
+        Raises:
+            ValueError: Если кривая неизвестна.
+        """
+        super().__init__(on_end)
+        self.fade_seconds = 0.0
+        self.fade_curve = "equal_power"
+        self.set_fade(fade_seconds, fade_curve)
+        self.cache = cache
+        self.decoded_budget = decoded_budget
+        self.chunk_seconds = chunk_seconds
+        mixer.set_reserved(channel + 2)
+        self._decks = (_Deck(mixer.Channel(channel)), _Deck(mixer.Channel(channel + 1)))
+        self._current = self._decks[0]
+        self._fading = None
+        self._next = None
+        self._prepared = None
+        self._boundary = None
+        self._paused = False
+        self._condition = threading.Condition()
+        self._thread = None
+        self._closed = False
+        frequency, sample_format, channels = mixer.get_init()
+        self._frequency = frequency
+        self._channels = channels
+        self._dtype, self._zero = _MIXER_TYPES[sample_format]
+        self._frame = channels * np.dtype(self._dtype).itemsize
+
+    def set_fade(self, seconds: float, curve: str | None = None):
+        """
+        Задает длительность и кривую перехода; действуют с ближайшего перехода, который еще не начался.
+
+        Args:
+            seconds (float): Длительность перехода; 0 — вывод не принимает треков.
+            curve (str | None): Кривая перехода, ключ FADE_CURVES; None — прежняя.
+
+        Raises:
+            ValueError: Если кривая неизвестна.
+        """
+        if curve is not None and curve not in FADE_CURVES:
+            raise ValueError(f"unknown fade curve: {curve}")
+        self.fade_seconds = max(seconds, 0.0)
+        if curve is not None:
+            self.fade_curve = curve
+
+    def accepts(self, composition: Composition) -> bool:
+        if self.fade_seconds <= 0:
+            return False
+        path = composition.get_path()
+        if wav_matches_mixer(path) or is_pcm_wav(path):
+            return True
+        return self.decoded_size(composition) <= self.decoded_budget // 4 or (
+            self.cache is not None and self.cache.contains(path))
+
+    def decoded_size(self, composition: Composition) -> int:
+        """
+        Оценивает, сколько байт займет композиция, декодированная в формат микшера.
+
+        Args:
+            composition (Composition): Композиция.
+
+        Returns:
+            int: Размер по длительности, частоте и размеру кадра микшера.
+        """
+        return int(composition.get_duration() * self._frequency) * self._frame
+
+    def overlap(self, composition: Composition) -> float:
+        return min(self.fade_seconds, composition.get_duration() / 2)
+
+    def _open(self, composition: Composition, start: float = 0.0):
+        """Открывает трек: WAV — отображением (с преобразованием, если формат не микшера), остальное — декодированием."""
+        path = composition.get_path()
+        if wav_matches_mixer(path):
+            return _WavTrack(composition, start)
+        if is_pcm_wav(path):
+            return _ConvertedWavTrack(composition, start)
+        return _DecodedTrack(composition, self.cache, start)
+
+    def prepare(self, composition: Composition):
+        # открытие и декодирование идут здесь, вне блокировок контроллера и
+        # потока подачи; play и queue только подставляют готовый трек
+        track = self._open(composition)
+        with self._condition:
+            previous, self._prepared = self._prepared, track
+        if previous is not None:
+            previous.close()
+
+    def _ready(self, composition: Composition, start: float = 0.0):
+        """Возвращает трек, подготовленный prepare(), или открывает его сразу."""
+        with self._condition:
+            track, self._prepared = self._prepared, None
+        if track is not None and track.composition is composition:
+            offset = track.offset_of(start)
+            if offset < track.length:
+                track.offset = track.released = offset
+                return track
+        if track is not None:
+            track.close()
+        return self._open(composition, start)
+
+    def _shape(self, deck: _Deck, piece: memoryview, offset: int) -> np.ndarray:
+        """Накладывает огибающую перехода на порцию трека деки, начинающуюся со смещения offset."""
+        samples = np.frombuffer(piece, dtype=self._dtype).reshape(-1, self._channels)
+        positions = offset + np.arange(len(samples), dtype=np.int64) * self._frame
+        curve = FADE_CURVES[self.fade_curve]
+        gains = np.ones(len(samples), dtype=np.float32)
+        if deck.fade_in:
+            rising = positions < deck.fade_in
+            gains[rising] = curve(positions[rising] / deck.fade_in)
+        if deck.fade_out is not None:
+            length = max(deck.track.length - deck.fade_out, 1)
+            falling = positions >= deck.fade_out
+            gains[falling] *= curve(1.0 - (positions[falling] - deck.fade_out) / length)
+        shaped = (samples.astype(np.float32) - self._zero) * gains[:, None] + self._zero
+        if self._dtype != np.float32:
+            shaped = np.rint(shaped)
+        # массив samples ссылается на piece: результат — независимая копия
+        return shaped.astype(self._dtype)
+
+    def _feed(self, deck: _Deck, limit: int | None = None):
+        """Передает каналу деки следующую порцию трека и возвращает ее; вызывается под блокировкой."""
+        track = deck.track
+        size = max(int(self.chunk_seconds * self._frequency), 1) * self._frame
+        if limit is not None:
+            size = min(size, limit)
+        end = track.offset + size
+        # огибающая нужна только порциям, попадающим в нарастание или затухание
+        shaped = track.offset < deck.fade_in or (deck.fade_out is not None and end > deck.fade_out)
+        sound = track.next_sound(size, (lambda piece, offset: self._shape(deck, piece, offset)) if shaped else None)
+        if deck.channel.get_busy():
+            deck.channel.queue(sound)
+        else:
+            deck.channel.play(sound)
+            # Channel.play сбрасывает громкость канала
+            deck.channel.set_volume(deck.volume)
+        deck.played.append((sound, track.offset))
+        return sound
+
+    def _plan(self):
+        """Назначает затухание текущего трека под трек из очереди; вызывается под блокировкой."""
+        current, following = self._current, self._next
+        track = current.track
+        if track is None or following is None or current.fade_out is not None:
+            return
+        fade = int(self.fade_seconds * self._frequency) * self._frame
+        # переход не длиннее половины каждого трека
+        fade = min(fade, track.length // 2 // self._frame * self._frame,
+                   following.length // 2 // self._frame * self._frame)
+        # затухают только порции, еще не переданные каналу
+        current.fade_out = max(track.length - fade, track.offset)
+
+    def _stop_all(self):
+        """Останавливает обе деки и закрывает трек из очереди и подготовленный; вызывается под блокировкой."""
+        for deck in self._decks:
+            deck.clear()
+        for track in (self._next, self._prepared):
+            if track is not None:
+                track.close()
+        self._next = self._prepared = None
+        self._fading = None
+        self._boundary = None
+
+    def play(self, composition: Composition, start: float = 0.0):
+        track = self._ready(composition, start)
+        with self._condition:
+            self._stop_all()
+            self._current.load(track)
+            self._current.volume = self.volume
+            self._paused = False
+            # первая порция передается сразу, не дожидаясь потока подачи
+            self._feed(self._current)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="crossfade-feeder", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def queue(self, composition: Composition):
+        # трек уже открыт в prepare(); без нее открывается здесь
+        track = self._ready(composition)
+        with self._condition:
+            if self._next is not None:
+                self._next.close()
+            self._next = track
+            if self._boundary is None:
+                # затухание еще не началось: длина перехода пересчитывается под новый трек
+                self._current.fade_out = None
+                self._plan()
+            self._condition.notify()
+
+    def clear_queue(self):
+        with self._condition:
+            if self._next is not None:
+                self._next.close()
+                self._next = None
+                if self._boundary is None:
+                    self._current.fade_out = None
+
+    def set_pos(self, seconds: float):
+        with self._condition:
+            deck = self._current
+            # во время перехода контроллер перезапускает трек через play()
+            if deck.track is None or self._fading is not None or self._boundary is not None:
+                raise SeekUnsupported("a crossfade is in progress")
+            offset = deck.track.offset_of(seconds)
+            if offset >= deck.track.length:
+                raise SeekUnsupported("position is past the end of the track")
+            deck.channel.stop()
+            deck.played.clear()
+            deck.track.offset = deck.track.released = offset
+            deck.fade_out = None
+            self._plan()
+            self._feed(deck)
+            if self._paused:
+                deck.channel.pause()
+            self._condition.notify()
+
+    def set_volume(self, volume: float):
+        with self._condition:
+            super().set_volume(volume)
+            # затухающий трек сохраняет свою громкость
+            self._current.volume = volume
+            self._current.channel.set_volume(volume)
+
+    def pause(self):
+        with self._condition:
+            self._paused = True
+            for deck in self._decks:
+                deck.channel.pause()
+
+    def unpause(self):
+        with self._condition:
+            self._paused = False
+            for deck in self._decks:
+                deck.channel.unpause()
+            self._condition.notify()
+
+    def stop(self):
+        with self._condition:
+            self._stop_all()
+            self._paused = False
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._stop_all()
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _switch(self):
+        """Запускает трек из очереди на свободной деке; вызывается под блокировкой."""
+        outgoing = self._current
+        if self._fading is not None:
+            self._fading.clear()
+        incoming = self._decks[1] if outgoing is self._decks[0] else self._decks[0]
+        # нарастание длится столько же, сколько затухание уходящего трека
+        fade_in = outgoing.track.length - outgoing.fade_out if outgoing.fade_out is not None else 0
+        incoming.load(self._next, min(fade_in, self._next.length))
+        incoming.volume = self.volume
+        self._next = None
+        self._boundary = None
+        self._current = incoming
+        self._feed(incoming)
+        if outgoing.track.exhausted() and not outgoing.channel.get_busy():
+            outgoing.clear()
+            self._fading = None
+        else:
+            self._fading = outgoing
+        self._plan()
+        self.on_end()
+
+    def _advance(self) -> float | None:
+        """
+        Один шаг потока подачи; вызывается под блокировкой.
+
+        Returns:
+            float | None: Через сколько секунд повторить шаг; None — ждать пробуждения.
+        """
+        current = self._current
+        if current.track is None or self._paused:
+            return None
+        for deck in self._decks:
+            if deck.track is not None:
+                deck.release()
+        if self._boundary is not None and current.channel.get_sound() is self._boundary:
+            # канал начал затухание: следующий трек стартует одновременно
+            if self._next is not None:
+                self._switch()
+            else:
+                # очередь отменили, когда затухание уже было подано: трек просто доигрывает
+                self._boundary = None
+        elif self._next is not None and current.track.exhausted() and not current.channel.get_busy():
+            # переход не поместился (трек уже подан до конца): следующий начинается сразу после текущего
+            self._switch()
+        current = self._current
+        fading = self._fading
+        if fading is not None and fading.channel.get_queue() is None:
+            if not fading.track.exhausted():
+                self._feed(fading)
+            elif not fading.channel.get_busy():
+                fading.clear()
+                self._fading = None
+        if current.channel.get_queue() is None:
+            track = current.track
+            if not track.exhausted():
+                start = track.offset
+                before_fade = current.fade_out is not None and start < current.fade_out
+                # порция обрывается на начале затухания, чтобы следующий трек стартовал точно с ним
+                sound = self._feed(current, current.fade_out - start if before_fade else None)
+                if start == current.fade_out and self._next is not None:
+                    self._boundary = sound
+            elif self._next is None and not current.channel.get_busy() and self._fading is None:
+                # последняя порция доиграна, а очереди нет
+                current.clear()
+                self.on_end()
+                return None
+        if self._boundary is not None or current.track is None or current.track.exhausted():
+            return _BOUNDARY_POLL
+        return self.chunk_seconds / 4
+
+    def _run(self):
+        """Цикл потока подачи."""
+        with self._condition:
+            while not self._closed:
+                timeout = self._advance()
+                self._condition.wait(timeout)
@@ -0,0 +1,287 @@
+import os
+import queue
+import time
+from collections.abc import Callable
+
+from .audio_cache import CacheStats, shared_cache
+from .composition import Composition
+from .metadata import MetadataCache
+from .Playlist import PlayList
+from .search import SearchIndex
+from .storage import open_storage
+
+
+class PlayerEngine:
+    """
+    Плеер без графического интерфейса.
+
+    Объединяет хранилище плейлистов (PlaylistStorage), кэш метаданных
+    и PlayerController. Модуль не импортирует wx, а pygame и пул процессов
+    импорта загружаются только при первом обращении к ним, поэтому команды
+    работы с плейлистами запускаются быстро.
+
+    Attributes:
+        storage (PlaylistStorage): Хранилище плейлистов.
+        playlists (LazyPlaylists): Плейлисты с отложенной загрузкой.
+        metadata (MetadataCache): Кэш метаданных аудиофайлов.
+        search_index (SearchIndex): Поисковый индекс загруженных плейлистов.
+        audio_cache (DecodedAudioCache | None): Кэш декодированного звука, общий с пробой длительности.
+        gapless (bool): Воспроизводить плейлист без пауз между треками.
+        _calls (queue.SimpleQueue): Переходы между треками, которые контроллер передает
+            потоку движка; их выполняет wait().
+        _controller (PlayerController | None): Контроллер воспроизведения, создается по требованию.
+    """
+    def __init__(self, folder: str = "playlists", file_format: str = "binary", journal: bool = True,
+                 gapless: bool = True, backend: str = "files", audio_cache_bytes: int = 64 * 2 ** 20):
+        """
+        Инициализация движка.
+
+        Args:
+            folder (str): Папка с плейлистами.
+            file_format (str): Формат снимков: "json" или "binary".
+            journal (bool): Записывать изменения в журнал.
+            gapless (bool): Воспроизводить плейлист без пауз между треками.
+            backend (str): Хранилище плейлистов: "files" (файл на плейлист) или "sqlite".
+            audio_cache_bytes (int): Бюджет кэша декодированного звука; 0 — без кэша.
+        """
+        self.storage = open_storage(folder, backend, journal=journal, file_format=file_format)
+        self.playlists = self.storage.open_playlists()
+        self.search_index = SearchIndex()
+        self.playlists.on_loaded = self.search_index.add_playlist
+        self.metadata = MetadataCache(os.path.join(folder, "metadata.sqlite"))
+        self.gapless = gapless
+        self.audio_cache = shared_cache(audio_cache_bytes) if audio_cache_bytes > 0 else None
+        self._calls = queue.SimpleQueue()
+        self._controller = None
+
+    @property
+    def controller(self):
+        """Контроллер воспроизведения; микшер инициализируется при первом обращении."""
+        if self._controller is None:
+            from .PlayerController import PlayerController
+            self._controller = PlayerController(gapless=self.gapless, audio_cache=self.audio_cache,
+                                                metadata=self.metadata,
+                                                dispatch=lambda fn, *args: self._calls.put((fn, args)))
+        return self._controller
+
+    def list_playlists(self) -> list[str]:
+        """
+        Возвращает имена плейлистов, не разбирая их файлы.
+
+        Returns:
+            list[str]: Имена в алфавитном порядке.
+        """
+        return sorted(self.playlists)
+
+    def get_playlist(self, name: str, create: bool = False) -> PlayList:
+        """
+        Возвращает плейлист по имени.
+
+        Args:
+            name (str): Имя плейлиста.
+            create (bool): Создать пустой плейлист, если его нет.
+
+        Returns:
+            PlayList: Плейлист.
+
+        Raises:
+            KeyError: Если плейлиста нет и create=False.
+        """
+        if name not in self.playlists:
+            if not create:
+                raise KeyError(name)
+            self.playlists[name] = PlayList()
+            self.storage.save_playlist(name, self.playlists[name])
+        return self.playlists[name]
+
+    def import_folder(self, name: str, root: str, on_progress: Callable[[int, int], None] | None = None) -> int:
+        """
+        Импортирует каталог в плейлист (плейлист создается при необходимости).
+
+        Относительный путь каталога переводится в абсолютный: в плейлист,
+        журнал и библиотеку попадают пути, не зависящие от текущего каталога.
+
+        Args:
+            name (str): Имя плейлиста.
+            root (str): Корневой каталог с музыкой (абсолютный или относительно текущего каталога).
+            on_progress (Callable[[int, int], None] | None): Получает ход работы.
+
+        Returns:
+            int: Число импортированных композиций.
+        """
+        from .importer import FolderImporter
+        playlist = self.get_playlist(name, create=True)
+        importer = FolderImporter(self.metadata, library=self.storage.library)
+        return self.storage.import_folder(name, playlist, os.path.abspath(root), importer, on_progress)
+
+    def analyze_loudness(self, name: str, on_progress: Callable[[int, int], None] | None = None) -> int:
+        """
+        Анализирует громкость композиций плейлиста и задает их поправки.
+
+        Результаты сохраняются в кэше метаданных, поэтому повторный анализ
+        и воспроизведение в следующих запусках файлы не читают.
+
+        Args:
+            name (str): Имя плейлиста.
+            on_progress (Callable[[int, int], None] | None): Получает ход работы.
+
+        Returns:
+            int: Число файлов, для которых известна поправка.
+
+        Raises:
+            KeyError: Если плейлиста нет.
+        """
+        from .loudness import LoudnessAnalyzer
+        analyzed = LoudnessAnalyzer(self.metadata).run(self.get_playlist(name).get_all_songs(), on_progress)
+        if self._controller is not None:
+            self._controller.refresh_volume()
+        return analyzed
+
+    def queue(self, name: str, paths: list[str]) -> list[Composition]:
+        """
+        Добавляет файлы в конец плейлиста (плейлист создается при необходимости).
+
+        Args:
+            name (str): Имя плейлиста.
+            paths (list[str]): Пути к аудиофайлам (относительные переводятся в абсолютные).
+
+        Returns:
+            list[Composition]: Добавленные композиции.
+        """
+        playlist = self.get_playlist(name, create=True)
+        compositions = []
+        for path in map(os.path.abspath, paths):
+            composition = self.storage.known_track(path)
+            if composition is None:
+                info = self.metadata.get(path)
+                composition = self.storage.intern(Composition(info.title, info.duration, path))
+            compositions.append(composition)
+        playlist.add_songs(compositions)
+        self.storage.record_add_many(name, playlist, compositions)
+        if self._controller is not None and self._controller.playlist is playlist:
+            self._controller.requeue()
+        return compositions
+
+    def move(self, name: str, indices: list[int], index: int):
+        """
+        Перемещает композиции плейлиста подряд, начиная с позиции index.
+
+        Args:
+            name (str): Имя плейлиста.
+            indices (list[int]): Позиции перемещаемых композиций.
+            index (int): Позиция первой перемещенной композиции после перемещения.
+
+        Raises:
+            KeyError: Если плейлиста нет.
+            IndexError: Если позиция вне диапазона.
+        """
+        playlist = self.get_playlist(name)
+        nodes = [playlist.node_at(i) for i in indices]
+        before = [playlist.index_of(node) for node in nodes]
+        playlist.move_many(nodes, index)
+        self.storage.record_move(name, playlist, before, min(playlist.index_of(node) for node in nodes))
+        if self._controller is not None and self._controller.playlist is playlist:
+            self._controller.requeue()
+
+    def export(self, name: str, path: str):
+        """
+        Экспортирует плейлист в файл (.json, .apl, .m3u или .m3u8).
+
+        Args:
+            name (str): Имя плейлиста.
+            path (str): Путь к файлу.
+        """
+        self.storage.export_playlist(self.get_playlist(name), path)
+
+    def search(self, query: str, limit: int = 50) -> list[tuple[str, Composition]]:
+        """
+        Ищет композиции по названию и пути во всех плейлистах (загружая еще не загруженные).
+
+        Args:
+            query (str): Запрос.
+            limit (int): Максимальное число результатов.
+
+        Returns:
+            list[tuple[str, Composition]]: Имя плейлиста и композиция для каждого результата.
+        """
+        for name in self.playlists:
+            self.playlists[name]
+        return self.search_index.search(query, limit)
+
+    def play(self, name: str, index: int = 0):
+        """
+        Начинает воспроизведение плейлиста с указанной композиции.
+
+        Args:
+            name (str): Имя плейлиста.
+            index (int): Номер композиции.
+
+        Raises:
+            KeyError: Если плейлиста нет.
+            IndexError: Если плейлист пуст или номер вне диапазона.
+        """
+        playlist = self.get_playlist(name)
+        node = playlist.node_at(index)
+        playlist.current_node = node
+        self.controller.attach(playlist)
+        self.controller.play(node.data)
+
+    def wait(self, tracks: int | None = None, timeout: float | None = None) -> int:
+        """
+        Ждет окончания воспроизведения.
+
+        Переходы к следующему треку выполняются здесь, в потоке движка, а не в
+        фоновом потоке контроллера: плейлист меняет только поток движка.
+
+        Args:
+            tracks (int | None): Сколько треков дождаться; None — пока воспроизведение не остановится.
+            timeout (float | None): Максимальное время ожидания в секундах.
+
+        Returns:
+            int: Число доигравших треков.
+        """
+        controller = self.controller
+        deadline = None if timeout is None else time.monotonic() + timeout
+        ended = 0
+
+        def on_ended(track):
+            nonlocal ended
+            ended += 1
+
+        unsubscribe = controller.subscribe("track_ended", on_ended)
+        try:
+            while controller.is_playing and (tracks is None or ended < tracks):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                try:
+                    fn, args = self._calls.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                fn(*args)
+        finally:
+            unsubscribe()
+        return ended
+
+    def cache_stats(self) -> CacheStats | None:
+        """
+        Возвращает счетчики кэша декодированного звука.
+
+        Returns:
+            CacheStats | None: Счетчики или None, если кэш отключен.
+        """
+        return None if self.audio_cache is None else self.audio_cache.stats()
+
+    def stop(self):
+        """Останавливает воспроизведение."""
+        if self._controller is not None:
+            self._controller.stop()
+
+    def close(self):
+        """Останавливает воспроизведение и освобождает ресурсы."""
+        if self._controller is not None:
+            self._controller.stop()
+            self._controller.close()
+        self.playlists.close()
+        self.storage.close()
+        self.metadata.close()
@@ -0,0 +1,218 @@
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+from .composition import Composition
+from .metadata import MetadataCache, TrackInfo, probe_track
+
+AUDIO_EXTENSIONS = (".mp3", ".wav")
+
+
+def scan_audio_files(root: str, extensions=AUDIO_EXTENSIONS) -> Iterator[str]:
+    """
+    Обходит дерево каталогов через os.scandir и выдает пути к аудиофайлам.
+
+    Обход итеративный (без рекурсии), каталоги внутри одного уровня и файлы
+    выдаются в отсортированном порядке, символические ссылки на каталоги не раскрываются.
+
+    Args:
+        root (str): Корневой каталог.
+        extensions (tuple[str, ...]): Допустимые расширения в нижнем регистре.
+
+    Returns:
+        Iterator[str]: Пути к найденным файлам.
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        subdirectories = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append(entry.path)
+            elif entry.name.lower().endswith(extensions) and entry.is_file():
+                yield entry.path
+        stack.extend(reversed(subdirectories))
+
+
+def _probe_or_none(path: str) -> TrackInfo | None:
+    """Проба метаданных для пула процессов: поврежденные файлы пропускаются."""
+    try:
+        return probe_track(path)
+    except Exception:
+        return None
+
+
+class FolderImporter:
+    """
+    Конвейер массового импорта каталога с аудиофайлами.
+
+    Обходит дерево каталогов, отбрасывает дубликаты, берет метаданные из кэша,
+    а для промахов определяет их в пуле процессов. Треки, уже известные общей
+    библиотеке, берутся из нее без обращения к файлу. Готовые композиции
+    передаются пакетами в обработчик on_batch, ход работы — в on_progress.
+
+    Attributes:
+        metadata (MetadataCache | None): Кэш метаданных.
+        library (TrackLibrary | None): Общая библиотека треков.
+        batch_size (int): Размер пакета композиций.
+        workers (int | None): Число процессов для проб.
+    """
+    def __init__(self, metadata: MetadataCache | None = None, batch_size: int = 500, workers: int | None = None,
+                 library=None):
+        """
+        Инициализация конвейера.
+
+        Args:
+            metadata (MetadataCache | None): Кэш метаданных; без него каждый файл пробуется заново.
+            batch_size (int): Размер пакета композиций.
+            workers (int | None): Число процессов для проб (по умолчанию — число ядер).
+            library (TrackLibrary | None): Библиотека, в которую попадают импортированные треки.
+        """
+        self.metadata = metadata
+        self.library = library
+        self.batch_size = batch_size
+        self.workers = workers
+
+    def run(self, root: str, on_batch: Callable[[list[Composition]], None],
+            on_progress: Callable[[int, int], None] | None = None,
+            skip: Callable[[str], bool] | None = None,
+            cancel: threading.Event | None = None) -> int:
+        """
+        Выполняет импорт в текущем потоке.
+
+        Args:
+            root (str): Корневой каталог.
+            on_batch (Callable[[list[Composition]], None]): Получает очередной пакет композиций.
+            on_progress (Callable[[int, int], None] | None): Получает число обработанных и всего найденных файлов.
+            skip (Callable[[str], bool] | None): Возвращает True для путей, которые уже есть в плейлисте.
+            cancel (threading.Event | None): Событие для досрочной остановки.
+
+        Returns:
+            int: Число импортированных композиций.
+        """
+        seen = set()
+        paths = []
+        for path in scan_audio_files(root):
+            key = os.path.normcase(os.path.realpath(path))
+            if key in seen or (skip and skip(path)):
+                continue
+            seen.add(key)
+            paths.append(path)
+        total = len(paths)
+        if on_progress:
+            on_progress(0, total)
+        imported = 0
+        executor = None
+        try:
+            for start in range(0, total, self.batch_size):
+                if cancel is not None and cancel.is_set():
+                    break
+                chunk = paths[start:start + self.batch_size]
+                known = [self.library.find(path) if self.library is not None else None for path in chunk]
+                missing = [path for path, composition in zip(chunk, known) if composition is None]
+                infos, executor = self._probe_chunk(missing, executor)
+                probed = iter(infos)
+                batch = []
+                for path, composition in zip(chunk, known):
+                    if composition is None:
+                        info = next(probed)
+                        if info is None:
+                            continue
+                        composition = self._composition(info, path)
+                    batch.append(composition)
+                if batch:
+                    on_batch(batch)
+                    imported += len(batch)
+                if on_progress:
+                    on_progress(start + len(chunk), total)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        return imported
+
+    def _composition(self, info: TrackInfo, path: str) -> Composition:
+        """Создает композицию (общую, если задана библиотека)."""
+        if self.library is not None:
+            return self.library.add(info.title, info.duration, path)
+        return Composition(info.title, info.duration, path)
+
+    def _probe_chunk(self, chunk: list[str], executor: ProcessPoolExecutor | None):
+        """
+        Определяет метаданные пакета файлов: попадания берутся из кэша, промахи — из пула процессов.
+
+        Returns:
+            tuple[list[TrackInfo | None], ProcessPoolExecutor | None]: Метаданные в порядке путей и пул.
+        """
+        infos = [None] * len(chunk)
+        stats = [None] * len(chunk)
+        misses = []
+        for number, path in enumerate(chunk):
+            try:
+                stats[number] = os.stat(path)
+            except OSError:
+                continue
+            if self.metadata is not None:
+                infos[number] = self.metadata.lookup(path, stats[number])
+            if infos[number] is None:
+                misses.append(number)
+        if misses:
+            if executor is None:
+                executor = ProcessPoolExecutor(max_workers=self.workers)
+            workers = self.workers or os.cpu_count() or 1
+            probed = executor.map(_probe_or_none, [chunk[number] for number in misses],
+                                  chunksize=max(1, len(misses) // (4 * workers)))
+            fresh = []
+            for number, info in zip(misses, probed):
+                infos[number] = info
+                if info is not None:
+                    fresh.append((chunk[number], info, stats[number]))
+            if self.metadata is not None and fresh:
+                self.metadata.store_many(fresh)
+        return infos, executor
+
+    def start(self, root: str, on_batch: Callable[[list[Composition]], None],
+              on_progress: Callable[[int, int], None] | None = None,
+              on_done: Callable[[int], None] | None = None,
+              skip: Callable[[str], bool] | None = None,
+              on_error: Callable[[Exception], None] | None = None) -> threading.Event:
+        """
+        Запускает импорт в фоновом потоке.
+
+        Обработчики вызываются из фонового потока; графический интерфейс должен
+        переносить их в свой поток (например, через wx.CallAfter).
+
+        Args:
+            root (str): Корневой каталог.
+            on_batch (Callable[[list[Composition]], None]): Получает очередной пакет композиций.
+            on_progress (Callable[[int, int], None] | None): Получает ход работы.
+            on_done (Callable[[int], None] | None): Получает число импортированных композиций.
+            skip (Callable[[str], bool] | None): Фильтр уже добавленных путей.
+            on_error (Callable[[Exception], None] | None): Получает ошибку, прервавшую импорт
+                (нет доступа к каталогу, сбой пула процессов); вызывается вместо on_done.
+                Без обработчика ошибка передается threading.excepthook.
+
+        Returns:
+            threading.Event: Событие, установка которого останавливает импорт.
+        """
+        cancel = threading.Event()
+
+        def worker():
+            try:
+                imported = self.run(root, on_batch, on_progress, skip, cancel)
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(e)
+                return
+            if on_done:
+                on_done(imported)
+
+        threading.Thread(target=worker, name="folder-import", daemon=True).start()
+        return cancel
@@ -0,0 +1,111 @@
+import threading
+from collections.abc import Callable, MutableMapping
+
+from .Playlist import PlayList
+
+
+class LazyPlaylists(MutableMapping):
+    """
+    Словарь плейлистов с отложенной загрузкой.
+
+    Хранит имена всех плейлистов, но разбирает файл плейлиста только при первом
+    обращении к нему. Может догружать остальные плейлисты в фоновом пуле потоков.
+
+    Attributes:
+        _entries (dict[str, PlayList | None]): Загруженные плейлисты; None — еще не загружен.
+        _loader (Callable[[str], PlayList]): Функция загрузки плейлиста по имени.
+        _locks (dict[str, threading.Lock]): Блокировки, исключающие двойную загрузку.
+        _executor (ThreadPoolExecutor | None): Пул фоновой загрузки.
+        on_loaded (Callable[[str, PlayList], None] | None): Вызывается, когда плейлист загружен
+            или добавлен; может вызываться из потока фоновой загрузки.
+    """
+    def __init__(self, names, loader: Callable[[str], PlayList]):
+        """
+        Инициализация словаря.
+
+        Args:
+            names (Iterable[str]): Имена доступных плейлистов.
+            loader (Callable[[str], PlayList]): Функция загрузки плейлиста по имени.
+        """
+        self._entries = {name: None for name in names}
+        self._loader = loader
+        self._locks = {name: threading.Lock() for name in self._entries}
+        self._executor = None
+        self.on_loaded = None
+
+    def _load(self, name: str) -> PlayList:
+        """Загружает плейлист, если он еще не загружен другим потоком."""
+        with self._locks[name]:
+            playlist = self._entries.get(name)
+            if playlist is None and name in self._entries:
+                playlist = self._loader(name)
+                # уведомление до публикации: подписчики успевают подписаться на изменения плейлиста
+                if self.on_loaded is not None:
+                    self.on_loaded(name, playlist)
+                self._entries[name] = playlist
+            return playlist
+
+    def __getitem__(self, name: str) -> PlayList:
+        """Возвращает плейлист, загружая его при первом обращении."""
+        playlist = self._entries[name]
+        if playlist is None:
+            playlist = self._load(name)
+        return playlist
+
+    def __setitem__(self, name: str, playlist: PlayList):
+        """Добавляет уже созданный плейлист."""
+        self._locks.setdefault(name, threading.Lock())
+        self._entries[name] = playlist
+        if self.on_loaded is not None:
+            self.on_loaded(name, playlist)
+
+    def __delitem__(self, name: str):
+        """Удаляет плейлист из словаря."""
+        with self._locks[name]:
+            del self._entries[name]
+        del self._locks[name]
+
+    def __contains__(self, name) -> bool:
+        """Проверяет наличие плейлиста без его загрузки."""
+        return name in self._entries
+
+    def __iter__(self):
+        """Итератор по именам плейлистов."""
+        return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        """Количество плейлистов."""
+        return len(self._entries)
+
+    def is_loaded(self, name: str) -> bool:
+        """
+        Проверяет, загружен ли плейлист.
+
+        Args:
+            name (str): Имя плейлиста.
+
+        Returns:
+            bool: True, если плейлист уже разобран.
+        """
+        return self._entries.get(name) is not None
+
+    def prefetch(self, max_workers: int | None = None):
+        """
+        Запускает фоновую загрузку всех еще не загруженных плейлистов.
+
+        Args:
+            max_workers (int | None): Размер пула потоков.
+
+        Returns:
+            list[Future]: Задачи загрузки.
+        """
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="playlist-prefetch")
+        return [self._executor.submit(self._load, name) for name in self if not self.is_loaded(name)]
+
+    def close(self):
+        """Останавливает фоновую загрузку, отменяя еще не начатые задачи."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
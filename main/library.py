@@ -0,0 +1,256 @@
+import json
+import os
+import threading
+
+from .composition import Composition
+
+
+def normalize_path(path: str) -> str:
+    """
+    Приводит путь к виду, по которому совпадающие файлы считаются одним треком.
+
+    Убираются лишние разделители и ссылки «.»/«..»; на Windows путь
+    дополнительно приводится к нижнему регистру с единым разделителем.
+
+    Args:
+        path (str): Путь к аудиофайлу.
+
+    Returns:
+        str: Нормализованный путь.
+    """
+    return os.path.normcase(os.path.normpath(path))
+
+
+class TrackLibrary:
+    """
+    Общая библиотека треков всех плейлистов.
+
+    Каждый файл (по нормализованному пути) представлен одним объектом
+    Composition с постоянным номером, поэтому трек, входящий в несколько
+    плейлистов, хранится в памяти и на диске один раз, а плейлисты ссылаются
+    на него по номеру. Сведения о треке определяются при первом добавлении.
+
+    Библиотека хранится в файле формата JSON Lines: строка с номером N —
+    список [название, длительность, путь] трека N. Треки из библиотеки не
+    удаляются, поэтому файл только дописывается: take_unsaved() отдает строки
+    треков, добавленных после прошлой записи. Недописанная последняя строка
+    (сбой во время записи) отбрасывается при загрузке.
+
+    Файл читается при первом обращении к библиотеке. Методы можно вызывать
+    из разных потоков (плейлисты загружаются в фоновом пуле). Хранилища с другим
+    способом записи (например, SQLite) переопределяют _load() и забирают новые
+    треки через take_unsaved_tracks().
+
+    Attributes:
+        path (str): Путь к файлу библиотеки.
+        read_only (bool): Только чтение: недописанная строка пропускается, но файл не обрезается.
+        _tracks (list[Composition]): Композиции по номерам.
+        _ids (dict[str, int]): Номера треков по нормализованному пути.
+        _saved (int): Сколько первых треков уже записано в файл (или отдано на запись).
+        _loaded (bool): Файл библиотеки прочитан.
+        _lock (threading.RLock): Блокировка.
+    """
+    def __init__(self, path: str = "library.jsonl", read_only: bool = False):
+        """
+        Инициализация библиотеки (файл читается при первом обращении).
+
+        Args:
+            path (str): Путь к файлу библиотеки.
+            read_only (bool): Не изменять файл при загрузке.
+        """
+        self.path = path
+        self.read_only = read_only
+        self._tracks = []
+        self._ids = {}
+        self._saved = 0
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def _ensure_loaded(self):
+        """Читает файл библиотеки при первом обращении."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._load()
+            self._saved = len(self._tracks)
+            self._loaded = True
+
+    def _append_loaded(self, track_id: int, composition: Composition):
+        """Добавляет трек, прочитанный из хранилища (номера идут подряд с нуля)."""
+        if track_id != len(self._tracks):
+            raise ValueError(f"track library ids are not contiguous at {track_id}")
+        self._ids[normalize_path(composition.path)] = track_id
+        self._tracks.append(composition)
+
+    def _load(self):
+        """Читает треки из файла, отрезая недописанную последнюю строку."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            payload = f.read()
+        valid_size = payload.rfind(b"\n") + 1
+        # строки делятся по b"\n" в байтах: размер считается по самому файлу,
+        # а "\r" перед переводом строки JSON пропускает как пробел
+        lines = payload[:valid_size].split(b"\n")[:-1]
+        try:
+            # быстрый путь: весь файл разбирается одним вызовом
+            records = json.loads(b"[" + b",".join(lines) + b"]")
+        except ValueError:
+            records = []
+            valid_size = 0
+            for line in lines:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+                valid_size += len(line) + 1
+        for title, duration, path in records:
+            self._append_loaded(len(self._tracks), Composition(title, duration, path))
+        if valid_size != len(payload) and not self.read_only:
+            # следующие записи должны начинаться с новой строки
+            os.truncate(self.path, valid_size)
+
+    def __len__(self) -> int:
+        """Возвращает число треков в библиотеке."""
+        self._ensure_loaded()
+        return len(self._tracks)
+
+    def find(self, path: str) -> Composition | None:
+        """
+        Ищет трек по пути.
+
+        Args:
+            path (str): Путь к аудиофайлу (в любом написании).
+
+        Returns:
+            Composition | None: Композиция библиотеки или None.
+        """
+        self._ensure_loaded()
+        track_id = self._ids.get(normalize_path(path))
+        return None if track_id is None else self._tracks[track_id]
+
+    def add(self, title: str, duration: float, path: str) -> Composition:
+        """
+        Возвращает композицию библиотеки для файла, добавляя трек при первом упоминании.
+
+        Args:
+            title (str): Название трека.
+            duration (float): Длительность в секундах.
+            path (str): Путь к аудиофайлу.
+
+        Returns:
+            Composition: Общий объект композиции (для уже известного файла — прежний).
+        """
+        self._ensure_loaded()
+        key = normalize_path(path)
+        with self._lock:
+            track_id = self._ids.get(key)
+            if track_id is None:
+                track_id = self._ids[key] = len(self._tracks)
+                self._tracks.append(Composition(title, duration, path))
+            return self._tracks[track_id]
+
+    def intern(self, composition: Composition) -> Composition:
+        """
+        Заменяет композицию общим объектом библиотеки.
+
+        Args:
+            composition (Composition): Композиция, созданная вне библиотеки.
+
+        Returns:
+            Composition: Объект библиотеки для того же файла.
+        """
+        self._ensure_loaded()
+        key = normalize_path(composition.path)
+        with self._lock:
+            track_id = self._ids.get(key)
+            if track_id is None:
+                track_id = self._ids[key] = len(self._tracks)
+                self._tracks.append(composition)
+            return self._tracks[track_id]
+
+    def track_id(self, composition: Composition) -> int:
+        """
+        Возвращает номер трека, добавляя его в библиотеку при необходимости.
+
+        Args:
+            composition (Composition): Композиция.
+
+        Returns:
+            int: Номер трека.
+        """
+        self._ensure_loaded()
+        track_id = self._ids.get(normalize_path(composition.path))
+        if track_id is None:
+            self.intern(composition)
+            track_id = self._ids[normalize_path(composition.path)]
+        return track_id
+
+    def get(self, track_id: int) -> Composition:
+        """
+        Возвращает композицию по номеру.
+
+        Args:
+            track_id (int): Номер трека.
+
+        Returns:
+            Composition: Композиция библиотеки.
+
+        Raises:
+            KeyError: Если трека с таким номером нет.
+        """
+        self._ensure_loaded()
+        if not 0 <= track_id < len(self._tracks):
+            raise KeyError(track_id)
+        return self._tracks[track_id]
+
+    def take_unsaved_tracks(self) -> list[tuple[int, Composition]]:
+        """
+        Возвращает треки, добавленные после прошлого вызова.
+
+        Треки считаются сохраненными сразу: их нужно записать раньше плейлистов,
+        которые на них ссылаются.
+
+        Returns:
+            list[tuple[int, Composition]]: Номера и композиции новых треков.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            first = self._saved
+            tracks = self._tracks[first:]
+            self._saved = len(self._tracks)
+        return list(enumerate(tracks, first))
+
+    def take_unsaved(self) -> str:
+        """
+        Возвращает строки файла для треков, добавленных после прошлого вызова.
+
+        Строки нужно записать через append_records() раньше снимков, которые на них ссылаются.
+
+        Returns:
+            str: Строки JSON Lines (пустая строка, если новых треков нет).
+        """
+        return "".join(json.dumps([c.title, c.duration, c.path], ensure_ascii=False) + "\n"
+                       for _, c in self.take_unsaved_tracks())
+
+    def append_records(self, text: str):
+        """
+        Дописывает строки в файл библиотеки и сбрасывает их на диск.
+
+        Args:
+            text (str): Строки, полученные от take_unsaved().
+        """
+        # двоичный режим: переводы строк не заменяются на "\r\n", и смещения
+        # совпадают с теми, что считает _load
+        with open(self.path, "ab") as f:
+            f.write(text.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def save(self):
+        """Записывает в файл треки, добавленные после прошлой записи."""
+        text = self.take_unsaved()
+        if text:
+            self.append_records(text)
@@ -1,3 +1,4 @@
+from bisect import bisect_right
 from typing import Iterator
 
 
@@ -9,7 +10,10 @@ class LinkedListItem:
         data: Данные, хранимые в узле.
         _next_item (LinkedListItem | None): Ссылка на следующий узел.
         _previous_item (LinkedListItem | None): Ссылка на предыдущий узел.
+        _block (list | None): Блок позиционного индекса, в котором лежит узел.
     """
+    __slots__ = ("data", "_next_item", "_previous_item", "_block")
+
     def __init__(self, data=None):
         """
         Инициализация узла списка.
@@ -20,6 +24,7 @@ class LinkedListItem:
         self.data = data
         self._next_item = None
         self._previous_item = None
+        self._block = None
 
     @property
     def next_item(self):
@@ -61,12 +66,144 @@ class LinkedListItem:
         return f"Node (data={self.data}, _next_item={self._next_item}, _previous_item={self._previous_item})"
 
 
+class _BlockIndex:
+    """
+    Блочный позиционный индекс поверх кольца.
+
+    Узлы в порядке обхода от головы разбиты на блоки ограниченного размера.
+    Вставка и удаление стоят O(BLOCK_SIZE), доступ по позиции — O(log n)
+    по префиксным суммам размеров блоков, которые пересчитываются лениво.
+
+    Attributes:
+        blocks (list[list[LinkedListItem]]): Блоки узлов в порядке обхода.
+        _offsets (list[int] | None): Позиции первых узлов блоков.
+        _block_positions (dict[int, int] | None): Номер блока по id(блока).
+    """
+    BLOCK_SIZE = 256
+
+    def __init__(self, nodes):
+        """
+        Строит индекс по узлам в порядке обхода.
+
+        Args:
+            nodes (Iterable[LinkedListItem]): Узлы списка начиная с головы.
+        """
+        self.blocks = []
+        block = []
+        for node in nodes:
+            if len(block) == self.BLOCK_SIZE:
+                self.blocks.append(block)
+                block = []
+            block.append(node)
+            node._block = block
+        if block:
+            self.blocks.append(block)
+        self._offsets = None
+        self._block_positions = None
+
+    def _invalidate(self):
+        """Сбрасывает префиксные суммы после изменения структуры."""
+        self._offsets = None
+        self._block_positions = None
+
+    def _ensure_offsets(self):
+        """Пересчитывает префиксные суммы размеров блоков, если они устарели."""
+        if self._offsets is not None:
+            return
+        offsets = []
+        positions = {}
+        total = 0
+        for number, block in enumerate(self.blocks):
+            offsets.append(total)
+            positions[id(block)] = number
+            total += len(block)
+        self._offsets = offsets
+        self._block_positions = positions
+
+    def _split(self, block: list):
+        """Делит переполненный блок пополам."""
+        half = len(block) // 2
+        tail = block[half:]
+        del block[half:]
+        for node in tail:
+            node._block = tail
+        for number, candidate in enumerate(self.blocks):
+            if candidate is block:
+                self.blocks.insert(number + 1, tail)
+                return
+
+    def insert_after(self, previous: LinkedListItem | None, node: LinkedListItem):
+        """
+        Регистрирует узел, вставленный после previous.
+
+        Args:
+            previous (LinkedListItem | None): Предшествующий узел; None — вставка в начало.
+            node (LinkedListItem): Новый узел.
+        """
+        if not self.blocks:
+            block = [node]
+            self.blocks.append(block)
+        elif previous is None:
+            block = self.blocks[0]
+            block.insert(0, node)
+        else:
+            block = previous._block
+            block.insert(_position_in(block, previous) + 1, node)
+        node._block = block
+        if len(block) > 2 * self.BLOCK_SIZE:
+            self._split(block)
+        self._invalidate()
+
+    def remove(self, node: LinkedListItem):
+        """
+        Удаляет узел из индекса.
+
+        Args:
+            node (LinkedListItem): Удаляемый узел.
+        """
+        block = node._block
+        del block[_position_in(block, node)]
+        node._block = None
+        if not block:
+            for number, candidate in enumerate(self.blocks):
+                if candidate is block:
+                    del self.blocks[number]
+                    break
+        self._invalidate()
+
+    def node_at(self, index: int) -> LinkedListItem:
+        """Возвращает узел по позиции (индекс уже проверен вызывающим)."""
+        self._ensure_offsets()
+        number = bisect_right(self._offsets, index) - 1
+        return self.blocks[number][index - self._offsets[number]]
+
+    def index_of(self, node: LinkedListItem) -> int:
+        """Возвращает позицию узла в порядке обхода."""
+        self._ensure_offsets()
+        block = node._block
+        number = self._block_positions.get(id(block)) if block is not None else None
+        if number is None:
+            raise ValueError("node not found")
+        return self._offsets[number] + _position_in(block, node)
+
+
+def _position_in(block: list, node: LinkedListItem) -> int:
+    """Ищет узел в блоке по идентичности."""
+    for position, candidate in enumerate(block):
+        if candidate is node:
+            return position
+    raise ValueError("node not found")
+
+
 class LinkedList:
     """
     Кольцевой двусвязный список.
 
     Attributes:
         _head (LinkedListItem | None): Первый элемент списка.
+        _size (int): Количество элементов, поддерживается при каждом изменении.
+        _positions (_BlockIndex | None): Позиционный индекс; строится при первом
+            обращении по индексу и далее поддерживается инкрементально.
     """
     def __init__(self, first_item=None):
         """
@@ -76,6 +213,10 @@ class LinkedList:
             first_item (LinkedListItem | None): Первый узел списка (по умолчанию None).
         """
         self._head = first_item
+        self._positions = None
+        self._size = 0
+        if first_item is not None:
+            self._size = sum(1 for _ in self)
 
     @property
     def first_item(self):
@@ -89,47 +230,127 @@ class LinkedList:
             return None
         return self._head.previous_item
 
-    def append_left(self, item: LinkedListItem):
+    def _find(self, data) -> LinkedListItem | None:
+        """
+        Ищет первый узел, данные которого равны data.
+
+        Args:
+            data: Данные для поиска.
+
+        Returns:
+            LinkedListItem | None: Найденный узел или None.
+        """
+        for node in self:
+            if node.data == data:
+                return node
+        return None
+
+    def _link_after(self, previous: LinkedListItem | None, node: LinkedListItem, head: bool = False):
+        """
+        Встраивает узел в кольцо справа от previous.
+
+        Все добавления в список проходят через этот метод, поэтому наследники
+        могут переопределять его для поддержки собственных индексов.
+
+        Args:
+            previous (LinkedListItem | None): Узел, после которого вставляем; None — если список пуст.
+            node (LinkedListItem): Новый узел.
+            head (bool): Сделать ли новый узел головой списка.
+        """
+        self._size += 1
+        if previous is None:
+            node.next_item = node
+            node.previous_item = node
+            self._head = node
+        else:
+            next_node = previous.next_item
+            previous.next_item = node
+            node.next_item = next_node
+            if head:
+                self._head = node
+        if self._positions is not None:
+            self._positions.insert_after(None if head else previous, node)
+
+    def _unlink(self, node: LinkedListItem):
+        """
+        Исключает узел из кольца за O(1).
+
+        Все удаления из списка проходят через этот метод.
+
+        Args:
+            node (LinkedListItem): Удаляемый узел.
+        """
+        self._size -= 1
+        if self._positions is not None:
+            self._positions.remove(node)
+        if node.next_item is node:
+            self._head = None
+        else:
+            node.previous_item.next_item = node.next_item
+            if node is self._head:
+                self._head = node.next_item
+        node._next_item = None
+        node._previous_item = None
+
+    def _move_after(self, node: LinkedListItem, previous: LinkedListItem, head: bool = False):
+        """
+        Переносит узел списка справа от previous за O(1), не пересоздавая его.
+
+        Узел остается в списке, поэтому размер не меняется, а _link_after и
+        _unlink не вызываются. Все перестановки проходят через этот метод.
+
+        Args:
+            node (LinkedListItem): Перемещаемый узел.
+            previous (LinkedListItem): Узел, после которого окажется node (сам node — только вместе с head).
+            head (bool): Сделать ли перемещенный узел головой списка.
+        """
+        if previous is node:
+            if not head:
+                return
+        else:
+            if node is self._head:
+                self._head = node.next_item
+            node.previous_item.next_item = node.next_item
+            next_node = previous.next_item
+            previous.next_item = node
+            node.next_item = next_node
+        if head:
+            self._head = node
+        if self._positions is not None:
+            self._positions.remove(node)
+            self._positions.insert_after(None if head else previous, node)
+
+    def append_left(self, item: LinkedListItem) -> LinkedListItem:
         """
         Добавляет элемент в начало списка.
 
         Args:
             item: Данные для нового узла.
+
+        Returns:
+            LinkedListItem: Созданный узел.
         """
         new_node = LinkedListItem(item)
-        if not self._head:
-            new_node.next_item = new_node
-            new_node.previous_item = new_node
-            self._head = new_node
-            return
-        last = self.last
-        new_node.next_item = self._head
-        new_node.previous_item = last
-        last.next_item = new_node
-        self._head.previous_item = new_node
-        self._head = new_node
-
+        self._link_after(self.last, new_node, head=True)
+        return new_node
 
-    def append_right(self, item: LinkedListItem):
+    def append_right(self, item: LinkedListItem) -> LinkedListItem:
         """
         Добавляет элемент в конец списка.
 
         Args:
             item: Данные для нового узла.
+
+        Returns:
+            LinkedListItem: Созданный узел.
         """
-        if not self._head:
-            self.append_left(item)
-        else:
-            last = self.last
-            new_node = LinkedListItem(item)
-            new_node.next_item = self._head
-            new_node.previous_item = last
-            last.next_item = new_node
-            self._head.previous_item = new_node
-
-    def append(self, item: LinkedListItem):
+        new_node = LinkedListItem(item)
+        self._link_after(self.last, new_node)
+        return new_node
+
+    def append(self, item: LinkedListItem) -> LinkedListItem:
         """Синоним метода append_right."""
-        self.append_right(item)
+        return self.append_right(item)
 
     def remove(self, item: LinkedListItem):
         """
@@ -143,23 +364,12 @@ class LinkedList:
         """
         if not self.first_item:
             raise ValueError("list is empty")
-        current = self.first_item
-        while True:
-            if current.data == item:
-                if current.next_item is current: #Ищем первое вхождение
-                    self._head = None
-                    return
-                current.previous_item.next_item = current.next_item
-                current.next_item.previous_item = current.previous_item
-                if current is self._head:
-                    self._head = current.next_item
-                return
-            current = current.next_item
-            if current is self._head:
-                break
-        raise ValueError("item not found")
+        node = self._find(item)
+        if node is None:
+            raise ValueError("item not found")
+        self._unlink(node)
 
-    def insert(self, previous: LinkedListItem, item: LinkedListItem):
+    def insert(self, previous: LinkedListItem, item: LinkedListItem) -> LinkedListItem:
         """
         Вставляет новый элемент справа от указанного элемента.
 
@@ -167,37 +377,24 @@ class LinkedList:
             previous: Данные узла, после которого вставляем.
             item: Данные для нового узла.
 
+        Returns:
+            LinkedListItem: Созданный узел.
+
         Raises:
             ValueError: Если список пуст или предыдущий узел не найден.
         """
         if not self.first_item:
             raise ValueError("list is empty")
-        current = self.first_item
-        while True:
-            if current.data == previous:
-                new_node = LinkedListItem(item)
-                next_node = current.next_item
-                current.next_item = new_node
-                new_node.previous_item = current
-                new_node.next_item = next_node
-                next_node.previous_item = new_node
-                return
-            current = current.next_item
-            if current is self.first_item:
-                break
-        raise ValueError("node not found")
-
+        current = self._find(previous)
+        if current is None:
+            raise ValueError("node not found")
+        new_node = LinkedListItem(item)
+        self._link_after(current, new_node)
+        return new_node
 
     def __len__(self) -> int:
-        """Возвращает количество элементов в списке."""
-        if self.first_item is None:
-            return 0
-        count = 1
-        current = self._head.next_item
-        while current and current is not self._head:
-            count += 1
-            current = current.next_item
-        return count
+        """Возвращает количество элементов в списке за O(1)."""
+        return self._size
 
     def __iter__(self) -> Iterator[LinkedListItem]:
         """Итератор по узлам списка (LinkedListItem)."""
@@ -223,15 +420,48 @@ class LinkedList:
         Raises:
             IndexError: Если индекс вне диапазона.
         """
-        size = len(self)
+        return self.node_at(index).data
+
+    def _ensure_positions(self) -> _BlockIndex:
+        """Включает позиционный индекс при первом обращении."""
+        if self._positions is None:
+            self._positions = _BlockIndex(self)
+        return self._positions
+
+    def node_at(self, index: int) -> LinkedListItem:
+        """
+        Возвращает узел по индексу за O(log n).
+
+        Args:
+            index (int): Индекс элемента (может быть отрицательным).
+
+        Returns:
+            LinkedListItem: Узел на указанной позиции.
+
+        Raises:
+            IndexError: Если индекс вне диапазона.
+        """
+        size = self._size
         if index < 0:
             index += size
         if index < 0 or index >= size:
             raise IndexError("index out of range")
-        current = self._head
-        for _ in range(index):
-            current = current.next_item
-        return current.data
+        return self._ensure_positions().node_at(index)
+
+    def index_of(self, node: LinkedListItem) -> int:
+        """
+        Возвращает позицию узла в списке.
+
+        Args:
+            node (LinkedListItem): Узел этого списка.
+
+        Returns:
+            int: Индекс узла, считая от головы.
+
+        Raises:
+            ValueError: Если узел не принадлежит списку.
+        """
+        return self._ensure_positions().index_of(node)
 
     def __contains__(self, item: LinkedListItem) -> bool:
         """
@@ -243,10 +473,7 @@ class LinkedList:
         Returns:
             bool: True, если элемент найден, иначе False.
         """
-        for node in self:
-            if node.data == item:
-                return True
-        return False
+        return self._find(item) is not None
 
     def __reversed__(self):
         """Итератор по элементам списка в обратном порядке."""
@@ -0,0 +1,273 @@
+import math
+import os
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .composition import Composition
+from .metadata import LoudnessInfo, MetadataCache
+from .pcm import BLOCK_FRAMES, PcmReader
+
+# Целевая громкость, LUFS (уровень ReplayGain 2.0)
+REFERENCE_LOUDNESS = -18.0
+# Длительность сегмента, по которому накапливается средний квадрат (с)
+SEGMENT_SECONDS = 0.1
+# Окно стробирования — четыре сегмента (400 мс) с перекрытием 75 %
+_WINDOW_SEGMENTS = 4
+# Абсолютный порог (LUFS) и относительный порог (LU ниже средней громкости) стробирования
+_ABSOLUTE_GATE = -70.0
+_RELATIVE_GATE = -10.0
+
+
+def _lufs(mean_square):
+    """
+    Переводит средний квадрат (сумму по каналам) в LUFS.
+
+    Стандартное смещение -0.691 дБ компенсирует усиление K-фильтра на 1 кГц;
+    без фильтра оно не нужно: тон 1 кГц дает ту же громкость, что и по стандарту.
+    """
+    return 10 * np.log10(mean_square)
+
+
+def measure_loudness(path: str) -> LoudnessInfo:
+    """
+    Измеряет приближенную интегральную громкость трека.
+
+    Стробированная громкость по схеме ITU-R BS.1770: средний квадрат
+    считается по сегментам 100 мс, сегменты объединяются в окна 400 мс с
+    перекрытием 75 %, затем отбрасываются окна тише -70 LUFS и окна на 10 LU
+    тише средней громкости оставшихся. K-взвешивание (рекурсивный фильтр) не
+    применяется, поэтому результат — стробированный RMS: на средних частотах он
+    совпадает с LUFS, а записи с выраженными низкими или высокими частотами
+    оцениваются на 1–2 дБ иначе.
+
+    Отсчеты читаются блоками через PcmReader, все вычисления над блоком
+    векторные. Хвост короче сегмента не учитывается.
+
+    Args:
+        path (str): Путь к аудиофайлу.
+
+    Returns:
+        LoudnessInfo: Громкость и пиковый уровень; у тишины громкость равна порогу -70 LUFS.
+
+    Raises:
+        OSError: Если файл недоступен.
+        pygame.error: Если файл не удалось декодировать.
+    """
+    with PcmReader(path) as reader:
+        segment = max(int(reader.sample_rate * SEGMENT_SECONDS), 1)
+        channels = reader.channels
+        powers = []
+        peak = 0.0
+        for block in reader.float_blocks(max(BLOCK_FRAMES // segment, 1) * segment):
+            peak = max(peak, float(np.abs(block).max(initial=0.0)))
+            whole = len(block) // segment * segment
+            if whole:
+                # средний квадрат каждого канала по сегментам, затем сумма по каналам
+                squares = np.square(block[:whole]).reshape(-1, segment, channels).mean(axis=1)
+                powers.append(squares.sum(axis=1))
+    if not powers:
+        return LoudnessInfo(_ABSOLUTE_GATE, peak)
+    segments = np.concatenate(powers)
+    if len(segments) >= _WINDOW_SEGMENTS:
+        windows = np.convolve(segments, np.full(_WINDOW_SEGMENTS, 1 / _WINDOW_SEGMENTS), mode="valid")
+    else:
+        windows = np.array([segments.mean()])
+    with np.errstate(divide="ignore"):
+        levels = _lufs(windows)
+    gated = windows[levels > _ABSOLUTE_GATE]
+    if not gated.size:
+        return LoudnessInfo(_ABSOLUTE_GATE, peak)
+    threshold = _lufs(gated.mean()) + _RELATIVE_GATE
+    gated = gated[_lufs(gated) > threshold]
+    return LoudnessInfo(float(_lufs(gated.mean())), peak)
+
+
+def replay_gain(info: LoudnessInfo, reference: float = REFERENCE_LOUDNESS) -> float:
+    """
+    Вычисляет поправку громкости трека.
+
+    Поправка доводит громкость до reference, но не поднимает пик выше полной
+    шкалы; у тишины поправка нулевая.
+
+    Args:
+        info (LoudnessInfo): Результат анализа.
+        reference (float): Целевая громкость, LUFS.
+
+    Returns:
+        float: Поправка в дБ.
+    """
+    if info.peak <= 0:
+        return 0.0
+    return min(reference - info.loudness, -20 * math.log10(info.peak))
+
+
+def gain_to_volume(gain: float) -> float:
+    """
+    Переводит поправку в множитель громкости микшера.
+
+    Микшер pygame не усиливает звук (громкость не больше 1), поэтому
+    положительная поправка тихих треков не применяется: выравнивание
+    достигается ослаблением громких.
+
+    Args:
+        gain (float): Поправка в дБ.
+
+    Returns:
+        float: Множитель от 0 до 1.
+    """
+    return min(10 ** (gain / 20), 1.0)
+
+
+def _measure_or_none(path: str) -> LoudnessInfo | None:
+    """Анализ для пула процессов: поврежденные файлы пропускаются."""
+    try:
+        return measure_loudness(path)
+    except Exception:
+        return None
+
+
+class LoudnessAnalyzer:
+    """
+    Пакетный анализ громкости композиций.
+
+    Результаты берутся из кэша метаданных, а промахи анализируются в пуле
+    процессов (каждый файл — отдельная задача). Поправка записывается в
+    Composition.gain всех переданных композиций с этим путем, а результат
+    анализа — в кэш, откуда его при воспроизведении берет PlayerController.
+
+    Attributes:
+        metadata (MetadataCache | None): Кэш метаданных.
+        reference (float): Целевая громкость, LUFS.
+        batch_size (int): Сколько файлов анализируется между сохранениями и отчетами о ходе работы.
+        workers (int | None): Число процессов.
+    """
+    def __init__(self, metadata: MetadataCache | None = None, reference: float = REFERENCE_LOUDNESS,
+                 batch_size: int = 32, workers: int | None = None):
+        """
+        Инициализация анализатора.
+
+        Args:
+            metadata (MetadataCache | None): Кэш метаданных; без него каждый файл анализируется заново.
+            reference (float): Целевая громкость, LUFS.
+            batch_size (int): Размер пакета файлов.
+            workers (int | None): Число процессов (по умолчанию — число ядер).
+        """
+        self.metadata = metadata
+        self.reference = reference
+        self.batch_size = batch_size
+        self.workers = workers
+
+    def run(self, compositions: Iterable[Composition], on_progress: Callable[[int, int], None] | None = None,
+            cancel: threading.Event | None = None) -> int:
+        """
+        Выполняет анализ в текущем потоке.
+
+        Args:
+            compositions (Iterable[Composition]): Композиции.
+            on_progress (Callable[[int, int], None] | None): Получает число обработанных и всего файлов.
+            cancel (threading.Event | None): Событие для досрочной остановки.
+
+        Returns:
+            int: Число файлов, для которых известна поправка.
+        """
+        by_path = {}
+        for composition in compositions:
+            by_path.setdefault(composition.get_path(), []).append(composition)
+        paths = list(by_path)
+        total = len(paths)
+        if on_progress:
+            on_progress(0, total)
+        analyzed = 0
+        executor = None
+        try:
+            for start in range(0, total, self.batch_size):
+                if cancel is not None and cancel.is_set():
+                    break
+                chunk = paths[start:start + self.batch_size]
+                infos, executor = self._analyze_chunk(chunk, executor)
+                for path, info in zip(chunk, infos):
+                    if info is None:
+                        continue
+                    gain = replay_gain(info, self.reference)
+                    for composition in by_path[path]:
+                        composition.gain = gain
+                    analyzed += 1
+                if on_progress:
+                    on_progress(start + len(chunk), total)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        return analyzed
+
+    def _analyze_chunk(self, chunk: list[str], executor: ProcessPoolExecutor | None):
+        """
+        Анализирует пакет файлов: попадания берутся из кэша, промахи — из пула процессов.
+
+        Returns:
+            tuple[list[LoudnessInfo | None], ProcessPoolExecutor | None]: Результаты в порядке путей и пул.
+        """
+        infos = [None] * len(chunk)
+        stats = [None] * len(chunk)
+        misses = []
+        for number, path in enumerate(chunk):
+            try:
+                stats[number] = os.stat(path)
+            except OSError:
+                continue
+            if self.metadata is not None:
+                infos[number] = self.metadata.lookup_loudness(path, stats[number])
+            if infos[number] is None:
+                misses.append(number)
+        if misses:
+            if executor is None:
+                executor = ProcessPoolExecutor(max_workers=self.workers)
+            # анализ одного файла длится секунды, поэтому файлы раздаются по одному
+            measured = executor.map(_measure_or_none, [chunk[number] for number in misses])
+            fresh = []
+            for number, info in zip(misses, measured):
+                infos[number] = info
+                if info is not None:
+                    fresh.append((chunk[number], info, stats[number]))
+            if self.metadata is not None and fresh:
+                self.metadata.store_loudness_many(fresh)
+        return infos, executor
+
+    def start(self, compositions: Iterable[Composition], on_progress: Callable[[int, int], None] | None = None,
+              on_done: Callable[[int], None] | None = None,
+              on_error: Callable[[Exception], None] | None = None) -> threading.Event:
+        """
+        Запускает анализ в фоновом потоке.
+
+        Обработчики вызываются из фонового потока; графический интерфейс должен
+        переносить их в свой поток (например, через wx.CallAfter).
+
+        Args:
+            compositions (Iterable[Composition]): Композиции.
+            on_progress (Callable[[int, int], None] | None): Получает ход работы.
+            on_done (Callable[[int], None] | None): Получает число файлов с известной поправкой.
+            on_error (Callable[[Exception], None] | None): Получает ошибку, прервавшую анализ
+                (сбой пула процессов или кэша метаданных); вызывается вместо on_done.
+                Без обработчика ошибка передается threading.excepthook.
+
+        Returns:
+            threading.Event: Событие, установка которого останавливает анализ.
+        """
+        cancel = threading.Event()
+        compositions = list(compositions)
+
+        def worker():
+            try:
+                analyzed = self.run(compositions, on_progress, cancel)
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(e)
+                return
+            if on_done:
+                on_done(analyzed)
+
+        threading.Thread(target=worker, name="loudness-analysis", daemon=True).start()
+        return cancel
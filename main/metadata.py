@@ -0,0 +1,405 @@
+import os
+import sqlite3
+import struct
+import threading
+from typing import NamedTuple
+
+from .audio_cache import active_cache
+
+# Битрейты MPEG Audio, кбит/с: [MPEG-1 | MPEG-2/2.5][слой I, II, III][индекс]
+_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Частоты дискретизации по версии MPEG (3 — MPEG-1, 2 — MPEG-2, 0 — MPEG-2.5)
+_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+# Сколько байт от начала аудиоданных просматривается в поисках первого кадра
+_MP3_SYNC_WINDOW = 64 * 1024
+
+
+class TrackInfo(NamedTuple):
+    """
+    Метаданные аудиофайла.
+
+    Attributes:
+        title (str): Название трека (имя файла).
+        duration (float): Длительность в секундах.
+        format (str): Формат файла по расширению, например "mp3".
+    """
+    title: str
+    duration: float
+    format: str
+
+
+class LoudnessInfo(NamedTuple):
+    """
+    Результат анализа громкости трека.
+
+    Attributes:
+        loudness (float): Приближенная интегральная громкость, LUFS.
+        peak (float): Наибольший модуль отсчета (1.0 — полная шкала).
+    """
+    loudness: float
+    peak: float
+
+
+class WavFormat(NamedTuple):
+    """
+    Формат и расположение аудиоданных WAV-файла.
+
+    Attributes:
+        format_tag (int): Код формата (1 — PCM, 3 — float); у WAVE_FORMAT_EXTENSIBLE — код из подформата.
+        channels (int): Число каналов.
+        sample_rate (int): Частота дискретизации, Гц.
+        byte_rate (int): Байт в секунду.
+        block_align (int): Размер кадра (отсчеты всех каналов) в байтах.
+        bits (int): Бит на отсчет.
+        data_offset (int): Смещение чанка data от начала файла.
+        data_size (int): Размер аудиоданных в байтах (не больше фактического остатка файла).
+    """
+    format_tag: int
+    channels: int
+    sample_rate: int
+    byte_rate: int
+    block_align: int
+    bits: int
+    data_offset: int
+    data_size: int
+
+
+def probe_wav_format(path: str) -> WavFormat | None:
+    """
+    Разбирает заголовок RIFF WAV-файла, не читая аудиоданные.
+
+    Args:
+        path (str): Путь к файлу.
+
+    Returns:
+        WavFormat | None: Формат или None, если заголовок не распознан.
+    """
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            return None
+        fields = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                return None
+            chunk_id, chunk_size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+            if chunk_id == b"fmt ":
+                fmt = f.read(chunk_size)
+                if len(fmt) < 16:
+                    return None
+                fields = list(struct.unpack("<HHIIHH", fmt[:16]))
+                if fields[0] == 0xFFFE and len(fmt) >= 26:
+                    # WAVE_FORMAT_EXTENSIBLE: настоящий код формата в начале GUID подформата
+                    fields[0] = struct.unpack("<H", fmt[24:26])[0]
+                if chunk_size % 2:
+                    f.seek(1, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if fields is None or not fields[3]:
+                    return None
+                # размер data может быть завышен у недописанных файлов
+                data_size = min(chunk_size, os.fstat(f.fileno()).st_size - f.tell())
+                return WavFormat(*fields, f.tell(), data_size)
+            else:
+                # чанки выровнены по двум байтам
+                f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+
+def probe_wav_duration(path: str) -> float | None:
+    """
+    Определяет длительность WAV по заголовку RIFF, не читая аудиоданные.
+
+    Args:
+        path (str): Путь к файлу.
+
+    Returns:
+        float | None: Длительность в секундах или None, если заголовок не распознан.
+    """
+    wav = probe_wav_format(path)
+    if wav is None:
+        return None
+    return wav.data_size / wav.byte_rate
+
+
+def _skip_id3v2(f) -> int:
+    """Возвращает смещение начала аудиоданных после тега ID3v2 (или 0)."""
+    header = f.read(10)
+    if len(header) == 10 and header[:3] == b"ID3":
+        size = 0
+        for byte in header[6:10]:
+            size = (size << 7) | (byte & 0x7F)
+        footer = 10 if header[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+
+def probe_mp3_duration(path: str) -> float | None:
+    """
+    Определяет длительность MP3 по заголовкам кадров, не декодируя звук.
+
+    Использует число кадров из заголовка Xing/Info или VBRI (файлы VBR),
+    а при их отсутствии оценивает длительность по битрейту первого кадра (CBR).
+
+    Args:
+        path (str): Путь к файлу.
+
+    Returns:
+        float | None: Длительность в секундах или None, если кадр не найден.
+    """
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        audio_start = _skip_id3v2(f)
+        f.seek(audio_start)
+        window = f.read(_MP3_SYNC_WINDOW)
+        if file_size >= 128:
+            f.seek(file_size - 128)
+            has_id3v1 = f.read(3) == b"TAG"
+        else:
+            has_id3v1 = False
+    position = 0
+    while True:
+        position = window.find(b"\xff", position)
+        if position < 0 or position + 4 > len(window):
+            return None
+        b1, b2, b3 = window[position + 1], window[position + 2], window[position + 3]
+        version_bits = (b1 >> 3) & 0x03
+        layer_bits = (b1 >> 1) & 0x03
+        bitrate_index = b2 >> 4
+        rate_index = (b2 >> 2) & 0x03
+        if (b1 & 0xE0) == 0xE0 and version_bits != 1 and layer_bits != 0 \
+                and bitrate_index not in (0, 15) and rate_index != 3:
+            break
+        position += 1
+    version = 1 if version_bits == 3 else 2
+    layer = 4 - layer_bits
+    sample_rate = _SAMPLE_RATES[version_bits][rate_index]
+    bitrate = _BITRATES[(version, layer)][bitrate_index] * 1000
+    mono = (b3 >> 6) == 3
+    if layer == 1:
+        samples_per_frame = 384
+    elif layer == 2 or version == 1:
+        samples_per_frame = 1152
+    else:
+        samples_per_frame = 576
+
+    # Заголовок Xing/Info стоит после побочной информации первого кадра
+    side_info = (17 if mono else 32) if version == 1 else (9 if mono else 17)
+    xing = position + 4 + side_info
+    if window[xing:xing + 4] in (b"Xing", b"Info") and len(window) >= xing + 12:
+        flags = struct.unpack(">I", window[xing + 4:xing + 8])[0]
+        if flags & 0x01:
+            frames = struct.unpack(">I", window[xing + 8:xing + 12])[0]
+            return frames * samples_per_frame / sample_rate
+    vbri = position + 4 + 32
+    if window[vbri:vbri + 4] == b"VBRI" and len(window) >= vbri + 18:
+        frames = struct.unpack(">I", window[vbri + 14:vbri + 18])[0]
+        return frames * samples_per_frame / sample_rate
+
+    audio_size = file_size - audio_start - position - (128 if has_id3v1 else 0)
+    return audio_size * 8 / bitrate
+
+
+def decode_duration(path: str) -> float:
+    """
+    Определяет длительность полным декодированием файла через pygame.
+
+    Медленный резервный путь для файлов, заголовок которых не распознан.
+    Если в процессе есть общий кэш декодированного звука (его создает плеер),
+    декодированный файл остается в нем и при воспроизведении не декодируется снова.
+
+    Args:
+        path (str): Путь к файлу.
+
+    Returns:
+        float: Длительность в секундах.
+    """
+    cache = active_cache()
+    if cache is not None:
+        return cache.get(path).get_length()
+    from pygame import mixer
+    if not mixer.get_init():
+        mixer.init()
+    return mixer.Sound(path).get_length()
+
+
+def probe_duration(path: str) -> float:
+    """
+    Определяет длительность трека: сначала по заголовку, затем полным декодированием.
+
+    Args:
+        path (str): Путь к аудиофайлу.
+
+    Returns:
+        float: Длительность в секундах.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    duration = None
+    try:
+        if extension == ".wav":
+            duration = probe_wav_duration(path)
+        elif extension == ".mp3":
+            duration = probe_mp3_duration(path)
+    except (OSError, struct.error, IndexError):
+        duration = None
+    if duration is None:
+        duration = decode_duration(path)
+    return duration
+
+
+def probe_track(path: str) -> TrackInfo:
+    """
+    Собирает метаданные трека без обращения к кэшу.
+
+    Args:
+        path (str): Путь к аудиофайлу.
+
+    Returns:
+        TrackInfo: Метаданные трека.
+    """
+    return TrackInfo(os.path.basename(path), probe_duration(path), os.path.splitext(path)[1].lower().lstrip("."))
+
+
+class MetadataCache:
+    """
+    Постоянный кэш метаданных треков в SQLite.
+
+    Ключ записи — путь к файлу; запись считается актуальной, пока совпадают
+    размер файла и время его изменения. Результаты анализа громкости хранятся
+    в отдельной таблице с тем же ключом. Методы можно вызывать из разных потоков.
+
+    Attributes:
+        path (str): Путь к файлу базы данных.
+        _connection (sqlite3.Connection): Соединение с базой.
+        _lock (threading.Lock): Блокировка доступа к соединению.
+    """
+    def __init__(self, path: str = "metadata.sqlite"):
+        """
+        Открывает (или создает) базу кэша.
+
+        Args:
+            path (str): Путь к файлу базы данных.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS tracks ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, "
+            "title TEXT NOT NULL, duration REAL NOT NULL, format TEXT NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS loudness ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, "
+            "loudness REAL NOT NULL, peak REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def lookup(self, path: str, stat: os.stat_result | None = None) -> TrackInfo | None:
+        """
+        Ищет актуальную запись о файле, не выполняя пробу.
+
+        Args:
+            path (str): Путь к аудиофайлу.
+            stat (os.stat_result | None): Уже полученные сведения о файле.
+
+        Returns:
+            TrackInfo | None: Метаданные или None, если записи нет или файл изменился.
+        """
+        stat = stat or os.stat(path)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT title, duration, format FROM tracks WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, stat.st_size, stat.st_mtime_ns),
+            ).fetchone()
+        return TrackInfo(*row) if row else None
+
+    def store(self, path: str, info: TrackInfo, stat: os.stat_result | None = None):
+        """
+        Сохраняет метаданные файла.
+
+        Args:
+            path (str): Путь к аудиофайлу.
+            info (TrackInfo): Метаданные.
+            stat (os.stat_result | None): Сведения о файле на момент пробы.
+        """
+        self.store_many([(path, info, stat or os.stat(path))])
+
+    def store_many(self, entries):
+        """
+        Сохраняет метаданные нескольких файлов одной транзакцией.
+
+        Args:
+            entries (Iterable[tuple[str, TrackInfo, os.stat_result]]): Путь, метаданные и сведения о файле.
+        """
+        rows = [(path, stat.st_size, stat.st_mtime_ns, *info) for path, info, stat in entries]
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO tracks (path, size, mtime_ns, title, duration, format) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._connection.commit()
+
+    def lookup_loudness(self, path: str, stat: os.stat_result | None = None) -> LoudnessInfo | None:
+        """
+        Ищет актуальный результат анализа громкости файла.
+
+        Args:
+            path (str): Путь к аудиофайлу.
+            stat (os.stat_result | None): Уже полученные сведения о файле.
+
+        Returns:
+            LoudnessInfo | None: Результат или None, если анализа не было или файл изменился.
+        """
+        stat = stat or os.stat(path)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT loudness, peak FROM loudness WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, stat.st_size, stat.st_mtime_ns),
+            ).fetchone()
+        return LoudnessInfo(*row) if row else None
+
+    def store_loudness_many(self, entries):
+        """
+        Сохраняет результаты анализа громкости нескольких файлов одной транзакцией.
+
+        Args:
+            entries (Iterable[tuple[str, LoudnessInfo, os.stat_result]]): Путь, результат и сведения о файле.
+        """
+        rows = [(path, stat.st_size, stat.st_mtime_ns, *info) for path, info, stat in entries]
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO loudness (path, size, mtime_ns, loudness, peak) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._connection.commit()
+
+    def get(self, path: str) -> TrackInfo:
+        """
+        Возвращает метаданные файла из кэша, выполняя пробу при промахе.
+
+        Args:
+            path (str): Путь к аудиофайлу.
+
+        Returns:
+            TrackInfo: Метаданные трека.
+        """
+        stat = os.stat(path)
+        info = self.lookup(path, stat)
+        if info is None:
+            info = probe_track(path)
+            self.store(path, info, stat)
+        return info
+
+    def close(self):
+        """Закрывает соединение с базой."""
+        with self._lock:
+            self._connection.close()
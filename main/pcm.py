@@ -0,0 +1,220 @@
+from collections.abc import Iterator
+
+import numpy as np
+
+from .audio_cache import active_cache
+from .metadata import probe_wav_format
+from .wav_map import MappedWav, is_wav
+
+# Сколько кадров отдается за раз: блок в несколько мегабайт помещается в кэш процессора
+BLOCK_FRAMES = 2 ** 18
+
+# Тип отсчетов, значение тишины и множитель приведения к [-1, 1] для целочисленного PCM WAV
+_PCM_TYPES = {8: (np.uint8, 128.0, 1 / 128), 16: (np.int16, 0.0, 1 / 2 ** 15), 32: (np.int32, 0.0, 1 / 2 ** 31)}
+
+
+def _wav_supported(format_tag: int, bits: int) -> bool:
+    """Проверяет, умеет ли PcmReader читать отсчеты WAV напрямую."""
+    return (format_tag == 3 and bits == 32) or (format_tag == 1 and (bits == 24 or bits in _PCM_TYPES))
+
+
+def is_pcm_wav(path: str) -> bool:
+    """
+    Проверяет по заголовку, что PcmReader прочитает файл из отображения в память, не декодируя его.
+
+    Args:
+        path (str): Путь к файлу.
+
+    Returns:
+        bool: True для WAV с PCM 8/16/24/32 бит или float 32 бит.
+    """
+    if not is_wav(path):
+        return False
+    try:
+        wav = probe_wav_format(path)
+    except OSError:
+        return False
+    return wav is not None and _wav_supported(wav.format_tag, wav.bits)
+
+
+class PcmReader:
+    """
+    Источник отсчетов аудиофайла блоками для векторной обработки NumPy.
+
+    WAV с PCM 8/16/24/32 бит или float 32 бит читается из отображения файла
+    в память: блоки — представления страниц без копирования, а прочитанные
+    страницы возвращаются системе, поэтому файл любой длины обрабатывается в
+    постоянном объеме памяти. Остальные форматы pygame умеет только
+    декодировать целиком: используется общий кэш декодированного звука, если
+    он есть, а блоки нарезаются из буфера звука без копирования.
+
+    Блок действителен до следующего шага итерации: не сохраняйте его.
+    Произвольный отрезок файла читается методом read().
+
+    Attributes:
+        path (str): Путь к файлу.
+        sample_rate (int): Частота дискретизации, Гц.
+        channels (int): Число каналов.
+        total_frames (int): Число кадров.
+        _wav (MappedWav | None): Отображенный WAV.
+        _samples (np.ndarray | None): Отсчеты декодированного звука, (кадры[, каналы]).
+        _zero (float): Значение тишины в отсчетах.
+        _scale (float): Множитель приведения отсчетов к [-1, 1].
+    """
+    def __init__(self, path: str):
+        """
+        Открывает файл.
+
+        Args:
+            path (str): Путь к аудиофайлу.
+
+        Raises:
+            OSError: Если файл недоступен.
+            pygame.error: Если файл не удалось декодировать.
+        """
+        self.path = path
+        self._wav = None
+        self._samples = None
+        if is_wav(path):
+            try:
+                wav = MappedWav(path)
+            except ValueError:
+                wav = None
+            if wav is not None and _wav_supported(wav.format.format_tag, wav.format.bits):
+                self._open_wav(wav)
+                return
+            if wav is not None:
+                wav.close()
+        self._decode()
+
+    def _open_wav(self, wav: MappedWav):
+        fmt = wav.format
+        self._wav = wav
+        self.sample_rate = fmt.sample_rate
+        self.channels = fmt.channels
+        self.total_frames = len(wav) // fmt.block_align
+        if fmt.format_tag == 3:
+            self._zero, self._scale = 0.0, 1.0
+        elif fmt.bits == 24:
+            self._zero, self._scale = 0.0, 1 / 2 ** 23
+        else:
+            _, self._zero, self._scale = _PCM_TYPES[fmt.bits]
+
+    def _decode(self):
+        from pygame import mixer, sndarray
+        cache = active_cache()
+        if cache is not None:
+            sound = cache.get(self.path)
+        else:
+            if not mixer.get_init():
+                mixer.init()
+            sound = mixer.Sound(self.path)
+        self.sample_rate, sample_format, self.channels = mixer.get_init()
+        # массив ссылается на буфер звука без копирования
+        self._samples = sndarray.samples(sound)
+        self.total_frames = len(self._samples)
+        bits = abs(sample_format)
+        floating = self._samples.dtype.kind == "f"
+        self._zero = 0.0 if sample_format < 0 or floating else float(2 ** (bits - 1))
+        self._scale = 1.0 if floating else 1 / 2 ** (bits - 1)
+
+    @property
+    def duration(self) -> float:
+        """Длительность в секундах."""
+        return self.total_frames / self.sample_rate
+
+    def _wav_block(self, piece: memoryview) -> np.ndarray:
+        """Представляет порцию WAV как массив отсчетов."""
+        fmt = self._wav.format
+        if fmt.format_tag == 3:
+            return np.frombuffer(piece, dtype=np.float32)
+        if fmt.bits == 24:
+            # 24-битные отсчеты собираются из трех байт со знаковым старшим
+            raw = np.frombuffer(piece, dtype=np.uint8).reshape(-1, 3)
+            return (raw[:, 2].astype(np.int8).astype(np.int32) << 16) | (raw[:, 1].astype(np.int32) << 8) | raw[:, 0]
+        return np.frombuffer(piece, dtype=_PCM_TYPES[fmt.bits][0])
+
+    def blocks(self, block_frames: int = BLOCK_FRAMES) -> Iterator[tuple[np.ndarray, float, float]]:
+        """
+        Выдает отсчеты блоками в исходном формате.
+
+        Args:
+            block_frames (int): Кадров в блоке (последний блок короче).
+
+        Returns:
+            Iterator[tuple[np.ndarray, float, float]]: Одномерный массив отсчетов
+                (каналы чередуются), значение тишины и множитель приведения к [-1, 1].
+        """
+        if self._wav is not None:
+            size = block_frames * self._wav.format.block_align
+            for offset in range(0, len(self._wav), size):
+                yield self._wav_block(self._wav.chunk(offset, size)), self._zero, self._scale
+                # прочитанные страницы больше не нужны: память не растет с длиной файла
+                self._wav.release(offset, offset + size)
+        else:
+            for start in range(0, self.total_frames, block_frames):
+                yield self._samples[start:start + block_frames].reshape(-1), self._zero, self._scale
+
+    def float_blocks(self, block_frames: int = BLOCK_FRAMES) -> Iterator[np.ndarray]:
+        """
+        Выдает отсчеты блоками, приведенными к float32 в [-1, 1].
+
+        Args:
+            block_frames (int): Кадров в блоке (последний блок короче).
+
+        Returns:
+            Iterator[np.ndarray]: Массивы формы (кадры, каналы).
+        """
+        for samples, zero, scale in self.blocks(block_frames):
+            yield self._to_float(samples, zero, scale)
+
+    def _to_float(self, samples: np.ndarray, zero: float, scale: float) -> np.ndarray:
+        """Приводит отсчеты к float32 в [-1, 1] (копия) формы (кадры, каналы)."""
+        block = samples.astype(np.float32)
+        if zero:
+            block -= zero
+        if scale != 1.0:
+            block *= scale
+        return block.reshape(-1, self.channels)
+
+    def read(self, start: int, frames: int) -> np.ndarray:
+        """
+        Читает кадры с позиции start, приведенные к float32 в [-1, 1].
+
+        Args:
+            start (int): Номер первого кадра.
+            frames (int): Сколько кадров прочитать (в конце файла меньше).
+
+        Returns:
+            np.ndarray: Независимый массив формы (кадры, каналы).
+        """
+        if self._wav is None:
+            return self._to_float(self._samples[start:start + frames].reshape(-1), self._zero, self._scale)
+        align = self._wav.format.block_align
+        with self._wav.chunk(start * align, frames * align) as piece:
+            # копия создается до освобождения среза
+            return self._to_float(self._wav_block(piece), self._zero, self._scale)
+
+    def release(self, start: int, end: int):
+        """
+        Возвращает системе страницы кадров от start до end (для WAV из отображения).
+
+        Args:
+            start (int): Первый освобождаемый кадр.
+            end (int): Кадр, до которого данные больше не нужны.
+        """
+        if self._wav is not None:
+            align = self._wav.format.block_align
+            self._wav.release(start * align, end * align)
+
+    def close(self):
+        """Закрывает файл."""
+        if self._wav is not None:
+            self._wav.close()
+        self._wav = self._samples = None
+
+    def __enter__(self) -> "PcmReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,311 @@
+import random
+import threading
+from collections import deque
+
+from .linked_list import LinkedListItem
+from .Playlist import PlayList
+
+# Режимы повтора
+REPEAT_OFF = "off"
+REPEAT_ALL = "all"
+REPEAT_ONE = "one"
+REPEAT_MODES = (REPEAT_OFF, REPEAT_ALL, REPEAT_ONE)
+
+# Сколько прослушанных треков помнит история для «предыдущего» в режиме перемешивания
+HISTORY_LIMIT = 1000
+
+
+class PlayOrder:
+    """
+    Порядок воспроизведения поверх кольцевого PlayList.
+
+    Поддерживает перемешивание, режимы повтора и очередь «играть следующим».
+    Плейлист не копируется: порядок хранит только ссылки на его узлы.
+
+    Перемешивание — пошаговый алгоритм Фишера — Йетса: в пуле лежат узлы,
+    еще не звучавшие в текущем круге, и каждый шаг забирает из него случайный
+    узел за O(1) (обмен с последним элементом). Когда пул пуст, он заполняется
+    заново (новая перестановка), причем первым не может оказаться только что
+    звучавший трек. Добавленные в плейлист узлы попадают в пул, удаленные
+    исключаются из него за O(1) — порядок подписан на изменения плейлиста.
+
+    Порядок, как и плейлист, читается и изменяется только в потоке владельца
+    плейлиста: PlayerController выбирает следующий узел там же и передает
+    в поток звука уже готовый узел.
+
+    Attributes:
+        playlist (PlayList): Плейлист.
+        shuffle (bool): Включено перемешивание.
+        repeat (str): Режим повтора: REPEAT_OFF, REPEAT_ALL или REPEAT_ONE.
+        _rng (random.Random): Генератор случайных чисел.
+        _play_next (deque[LinkedListItem]): Очередь «играть следующим».
+        _pool (list[LinkedListItem]): Узлы, еще не звучавшие в текущем круге перемешивания.
+        _pool_index (dict[LinkedListItem, int]): Позиция узла в пуле.
+        _history (deque[LinkedListItem]): Прослушанные в режиме перемешивания узлы.
+        _back (int): На сколько шагов пользователь вернулся назад по истории.
+        _peeked (tuple[bool, LinkedListItem | None] | None): Выбранный заранее следующий узел.
+        _lock (threading.RLock): Блокировка (обработчики наблюдателя и шаги не прерывают друг друга).
+    """
+    def __init__(self, playlist: PlayList, shuffle: bool = False, repeat: str = REPEAT_ALL,
+                 rng: random.Random | None = None):
+        """
+        Инициализация порядка воспроизведения.
+
+        Args:
+            playlist (PlayList): Плейлист.
+            shuffle (bool): Включить перемешивание.
+            repeat (str): Режим повтора.
+            rng (random.Random | None): Генератор случайных чисел (для воспроизводимости).
+        """
+        self.playlist = playlist
+        self.shuffle = False
+        self.repeat = REPEAT_ALL
+        self._rng = rng or random.Random()
+        self._play_next = deque()
+        self._pool = []
+        self._pool_index = {}
+        self._history = deque(maxlen=HISTORY_LIMIT)
+        self._back = 0
+        self._peeked = None
+        self._lock = threading.RLock()
+        self.set_repeat(repeat)
+        self.set_shuffle(shuffle)
+        playlist.add_observer(self)
+
+    def close(self):
+        """Отписывает порядок от изменений плейлиста."""
+        self.playlist.remove_observer(self)
+
+    def _contains(self, node: LinkedListItem | None) -> bool:
+        """Проверяет, что узел все еще в плейлисте."""
+        return node is not None and self.playlist.find_node(node) is node
+
+    # === Настройки ===
+    def set_shuffle(self, shuffle: bool):
+        """
+        Включает или выключает перемешивание.
+
+        При включении начинается новый круг: в пул попадают все узлы, кроме текущего.
+
+        Args:
+            shuffle (bool): Включить перемешивание.
+        """
+        with self._lock:
+            self.shuffle = shuffle
+            self._pool.clear()
+            self._pool_index.clear()
+            self._history.clear()
+            self._back = 0
+            self._peeked = None
+            if shuffle:
+                self._refill()
+                current = self.playlist.current_node
+                if self._contains(current):
+                    self._take(current)
+                    self._history.append(current)
+
+    def set_repeat(self, repeat: str):
+        """
+        Задает режим повтора.
+
+        Args:
+            repeat (str): REPEAT_OFF, REPEAT_ALL или REPEAT_ONE.
+
+        Raises:
+            ValueError: Если режим неизвестен.
+        """
+        if repeat not in REPEAT_MODES:
+            raise ValueError(f"unknown repeat mode: {repeat}")
+        with self._lock:
+            self.repeat = repeat
+            self._peeked = None
+
+    def play_next(self, node: LinkedListItem):
+        """
+        Ставит узел в очередь «играть следующим» (после уже стоящих в ней).
+
+        Args:
+            node (LinkedListItem): Узел плейлиста.
+        """
+        with self._lock:
+            self._play_next.append(node)
+            self._peeked = None
+
+    def queued(self) -> list[LinkedListItem]:
+        """
+        Возвращает очередь «играть следующим».
+
+        Returns:
+            list[LinkedListItem]: Узлы в порядке воспроизведения.
+        """
+        with self._lock:
+            return [node for node in self._play_next if self._contains(node)]
+
+    # === Пул перемешивания ===
+    def _refill(self):
+        """Начинает новый круг перемешивания: все узлы плейлиста возвращаются в пул."""
+        self._pool = list(self.playlist)
+        self._pool_index = {node: index for index, node in enumerate(self._pool)}
+
+    def _take(self, node: LinkedListItem):
+        """Забирает узел из пула за O(1), ставя на его место последний элемент."""
+        index = self._pool_index.pop(node, None)
+        if index is None:
+            return
+        last = self._pool.pop()
+        if last is not node:
+            self._pool[index] = last
+            self._pool_index[last] = index
+
+    def _draw(self, avoid: LinkedListItem | None) -> LinkedListItem | None:
+        """Выбирает случайный узел пула, по возможности отличный от avoid."""
+        size = len(self._pool)
+        if size == 0:
+            return None
+        if size > 1 and avoid is not None and avoid in self._pool_index:
+            # avoid переносится в конец, и выбор идет среди остальных
+            index = self._pool_index[avoid]
+            last = self._pool[-1]
+            self._pool[index], self._pool[-1] = last, avoid
+            self._pool_index[last], self._pool_index[avoid] = index, size - 1
+            size -= 1
+        return self._pool[self._rng.randrange(size)]
+
+    # === Наблюдатель плейлиста ===
+    def on_node_added(self, node: LinkedListItem):
+        """Новый узел еще не звучал в текущем круге и попадает в пул."""
+        with self._lock:
+            if self.shuffle:
+                self._pool_index[node] = len(self._pool)
+                self._pool.append(node)
+            self._peeked = None
+
+    def on_node_removed(self, node: LinkedListItem):
+        """Удаленный узел исключается из пула; из очереди и истории он отбрасывается при обходе."""
+        with self._lock:
+            if self.shuffle:
+                self._take(node)
+            self._peeked = None
+
+    def on_node_moved(self, node: LinkedListItem):
+        """После перестановки следующий по порядку трек мог измениться."""
+        with self._lock:
+            self._peeked = None
+
+    # === Шаги ===
+    def _choose(self, auto: bool) -> LinkedListItem | None:
+        """Выбирает следующий узел, не изменяя состояния (кроме пула при начале нового круга)."""
+        current = self.playlist.current_node
+        if auto and self.repeat == REPEAT_ONE and self._contains(current):
+            return current
+        while self._play_next:
+            if self._contains(self._play_next[0]):
+                return self._play_next[0]
+            self._play_next.popleft()
+        if not self.shuffle:
+            if current is None or not self._contains(current):
+                return self.playlist.first_item
+            following = current.next_item
+            if following is self.playlist.first_item and self.repeat == REPEAT_OFF:
+                return None
+            return following
+        # движение вперед по истории после «предыдущего»
+        while self._back > 0:
+            node = self._history[-self._back]
+            if self._contains(node):
+                return node
+            del self._history[-self._back]
+            self._back -= 1
+        if not self._pool:
+            if self.repeat == REPEAT_OFF:
+                return None
+            self._refill()
+        return self._draw(avoid=current)
+
+    def peek(self, auto: bool = True) -> LinkedListItem | None:
+        """
+        Возвращает следующий узел, не переходя к нему.
+
+        Результат запоминается: последующий next() с тем же auto вернет тот же узел,
+        если плейлист и очередь не менялись.
+
+        Args:
+            auto (bool): Переход по окончании трека (учитывает повтор одного трека).
+
+        Returns:
+            LinkedListItem | None: Следующий узел или None, если воспроизведение должно закончиться.
+        """
+        with self._lock:
+            if self._peeked is None or self._peeked[0] != auto:
+                self._peeked = (auto, self._choose(auto))
+            return self._peeked[1]
+
+    def next(self, auto: bool = False) -> LinkedListItem | None:
+        """
+        Переходит к следующему узлу и делает его текущим.
+
+        Args:
+            auto (bool): Переход по окончании трека; при ручном переходе
+                повтор одного трека не действует.
+
+        Returns:
+            LinkedListItem | None: Новый текущий узел или None.
+        """
+        with self._lock:
+            node = self.peek(auto)
+            if node is not None:
+                self.select(node)
+            return node
+
+    def previous(self) -> LinkedListItem | None:
+        """
+        Переходит к предыдущему узлу: по кольцу или, при перемешивании, по истории.
+
+        Returns:
+            LinkedListItem | None: Новый текущий узел или None, если идти назад некуда.
+        """
+        with self._lock:
+            self._peeked = None
+            if not self.shuffle:
+                current = self.playlist.current_node
+                node = current.previous_item if self._contains(current) else self.playlist.last
+            else:
+                node = None
+                back = self._back
+                while back + 1 < len(self._history):
+                    back += 1
+                    candidate = self._history[-1 - back]
+                    if self._contains(candidate):
+                        node = candidate
+                        self._back = back
+                        break
+            if node is not None:
+                self.playlist.current_node = node
+            return node
+
+    def select(self, node: LinkedListItem):
+        """
+        Делает узел текущим (выбор пользователя или начавшийся трек).
+
+        Узел считается прозвучавшим в текущем круге и снимается с начала
+        очереди «играть следующим», если стоит там.
+
+        Args:
+            node (LinkedListItem): Узел плейлиста.
+        """
+        with self._lock:
+            self._peeked = None
+            if self._play_next and self._play_next[0] is node:
+                self._play_next.popleft()
+            if self.shuffle:
+                if self._back > 0 and self._history[-self._back] is node:
+                    self._back -= 1  # шаг вперед по истории
+                elif node is not self.playlist.current_node or not self._history:
+                    self._take(node)
+                    if self._back:
+                        # новый выбор после возврата назад отбрасывает «будущее» истории
+                        for _ in range(self._back):
+                            self._history.pop()
+                        self._back = 0
+                    self._history.append(node)
+            self.playlist.current_node = node
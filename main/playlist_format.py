@@ -0,0 +1,199 @@
+import struct
+import zlib
+from typing import Iterable, Iterator
+
+from .composition import Composition
+
+# Заголовок файла: сигнатура и номер версии формата
+MAGIC = b"APL\x01"
+
+# Запись каталога: тег, длина строки, затем строка в UTF-8.
+# Каталоги нумеруются по порядку появления в файле.
+DIRECTORY = b"D"
+# Запись трека: тег, номер каталога, длины имени файла и названия, длительность,
+# затем имя файла и название в UTF-8.
+TRACK = b"T"
+# Ссылка на трек общей библиотеки (TrackLibrary): тег и номер трека.
+REFERENCE = b"R"
+
+_DIRECTORY_HEADER = struct.Struct("<I")
+_TRACK_HEADER = struct.Struct("<IIId")
+_REFERENCE = struct.Struct("<I")
+
+CHUNK_SIZE = 1 << 20
+
+
+def split_path(path: str) -> tuple[str, str]:
+    """
+    Делит путь на каталог (с завершающим разделителем) и имя файла.
+
+    Учитываются оба разделителя, чтобы пути Windows корректно делились на любой ОС.
+
+    Args:
+        path (str): Путь к файлу.
+
+    Returns:
+        tuple[str, str]: Каталог и имя файла; их конкатенация дает исходный путь.
+    """
+    cut = max(path.rfind("/"), path.rfind("\\")) + 1
+    return path[:cut], path[cut:]
+
+
+def encode_playlist(compositions: Iterable[Composition]) -> bytes:
+    """
+    Кодирует композиции в бинарный формат плейлиста.
+
+    Каталоги путей записываются в таблицу строк один раз, перед первым треком,
+    который на них ссылается, поэтому файл читается за один проход.
+
+    Args:
+        compositions (Iterable[Composition]): Композиции в порядке плейлиста.
+
+    Returns:
+        bytes: Содержимое файла.
+    """
+    out = bytearray(MAGIC)
+    directories = {}
+    for composition in compositions:
+        directory, filename = split_path(composition.path)
+        directory_id = directories.get(directory)
+        if directory_id is None:
+            directory_id = directories[directory] = len(directories)
+            raw = directory.encode("utf-8")
+            out += DIRECTORY
+            out += _DIRECTORY_HEADER.pack(len(raw))
+            out += raw
+        raw_name = filename.encode("utf-8")
+        raw_title = composition.title.encode("utf-8")
+        out += TRACK
+        out += _TRACK_HEADER.pack(directory_id, len(raw_name), len(raw_title), composition.duration)
+        out += raw_name
+        out += raw_title
+    return bytes(out)
+
+
+def encode_references(track_ids: Iterable[int]) -> bytes:
+    """
+    Кодирует плейлист, состоящий из ссылок на треки библиотеки.
+
+    Args:
+        track_ids (Iterable[int]): Номера треков библиотеки в порядке плейлиста.
+
+    Returns:
+        bytes: Содержимое файла.
+    """
+    out = bytearray(MAGIC)
+    pack = _REFERENCE.pack
+    for track_id in track_ids:
+        out += REFERENCE
+        out += pack(track_id)
+    return bytes(out)
+
+
+class BinaryPlaylistReader:
+    """
+    Потоковый читатель бинарного файла плейлиста.
+
+    Читает файл блоками по CHUNK_SIZE байт и выдает композиции по одной,
+    не строя промежуточный список. После полного чтения в атрибуте crc
+    остается контрольная сумма файла.
+
+    Если задана библиотека, ссылки на треки разрешаются через нее, а треки,
+    записанные целиком, заменяются общими объектами библиотеки.
+
+    Attributes:
+        path (str): Путь к файлу.
+        library (TrackLibrary | None): Библиотека треков.
+        crc (int | None): CRC32 содержимого файла; известна после окончания чтения.
+        inline_tracks (int): Число треков, записанных целиком, а не ссылкой.
+    """
+    def __init__(self, path: str, library=None):
+        """
+        Инициализация читателя.
+
+        Args:
+            path (str): Путь к бинарному файлу плейлиста.
+            library (TrackLibrary | None): Библиотека для разрешения ссылок на треки.
+        """
+        self.path = path
+        self.library = library
+        self.crc = None
+        self.inline_tracks = 0
+
+    def __iter__(self) -> Iterator[Composition]:
+        """
+        Итератор по композициям файла.
+
+        Raises:
+            ValueError: Если файл поврежден, имеет неизвестный формат
+                или содержит ссылки на треки, а библиотека не задана.
+        """
+        directories = []
+        make = Composition if self.library is None else self.library.add
+        unpack_reference = _REFERENCE.unpack_from
+        reference_size = 1 + _REFERENCE.size
+        reference_tag = REFERENCE[0]
+        inline_tracks = 0
+        unpack_track = _TRACK_HEADER.unpack_from
+        unpack_directory = _DIRECTORY_HEADER.unpack_from
+        track_header = 1 + _TRACK_HEADER.size
+        directory_header = 1 + _DIRECTORY_HEADER.size
+        track_tag = TRACK[0]
+        directory_tag = DIRECTORY[0]
+        with open(self.path, "rb") as f:
+            buffer = f.read(CHUNK_SIZE)
+            crc = zlib.crc32(buffer)
+            if buffer[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"not a playlist file: {self.path}")
+            offset = len(MAGIC)
+            size = len(buffer)
+            eof = False
+            while True:
+                # размер записи известен только после разбора заголовка, поэтому
+                # при нехватке данных дочитываем следующий блок и повторяем разбор
+                end = -1
+                tag = buffer[offset] if offset < size else None
+                if tag == reference_tag:
+                    end = offset + reference_size
+                    if end <= size:
+                        if self.library is None:
+                            raise ValueError(f"playlist references the track library: {self.path}")
+                        track_id = unpack_reference(buffer, offset + 1)[0]
+                        offset = end
+                        yield self.library.get(track_id)
+                        continue
+                elif size - offset >= track_header:
+                    if tag == track_tag:
+                        directory_id, name_size, title_size, duration = unpack_track(buffer, offset + 1)
+                        start = offset + track_header
+                        middle = start + name_size
+                        end = middle + title_size
+                        if end <= size:
+                            offset = end
+                            inline_tracks += 1
+                            yield make(buffer[middle:end].decode("utf-8"), duration,
+                                       directories[directory_id] + buffer[start:middle].decode("utf-8"))
+                            continue
+                    elif tag == directory_tag:
+                        start = offset + directory_header
+                        end = start + unpack_directory(buffer, offset + 1)[0]
+                        if end <= size:
+                            directories.append(buffer[start:end].decode("utf-8"))
+                            offset = end
+                            continue
+                    else:
+                        raise ValueError(f"unknown record tag: {bytes([tag])!r}")
+                if eof:
+                    if offset != size:
+                        raise ValueError("truncated record")
+                    break
+                chunk = f.read(max(CHUNK_SIZE, end - size))
+                if not chunk:
+                    eof = True
+                    continue
+                crc = zlib.crc32(chunk, crc)
+                buffer = buffer[offset:] + chunk
+                offset = 0
+                size = len(buffer)
+        self.crc = crc
+        self.inline_tracks = inline_tracks
@@ -0,0 +1,101 @@
+import time
+
+# Расхождение с позицией микшера, после которого часы подстраиваются (мс)
+DRIFT_MS = 40.0
+
+
+class PositionClock:
+    """
+    Часы позиции воспроизведения.
+
+    Позиция считается по монотонному времени от момента запуска с учетом
+    смещения (перемотки) и пауз, поэтому между обновлениями позиции микшера
+    (mixer.music.get_pos() меняется шагами размером с аудиобуфер) она растет
+    плавно. Метод sync() сверяет часы с микшером и подстраивает их, только если
+    расхождение превысило DRIFT_MS. Все операции — несколько арифметических
+    действий, так что позицию можно запрашивать хоть 60 раз в секунду.
+
+    Attributes:
+        running (bool): Часы запущены.
+        paused (bool): Часы стоят на паузе.
+        _anchor_ms (float): Позиция в момент _anchor_time.
+        _anchor_time (float): Монотонное время привязки.
+        _paused_at (float | None): Монотонное время начала паузы.
+        _mixer_base_ms (float): Разница между позицией трека и показанием микшера.
+        _last_mixer_ms (int | None): Последнее показание микшера, переданное в sync().
+    """
+    def __init__(self):
+        """Инициализация остановленных часов."""
+        self.running = False
+        self.paused = False
+        self._anchor_ms = 0.0
+        self._anchor_time = 0.0
+        self._paused_at = None
+        self._mixer_base_ms = 0.0
+        self._last_mixer_ms = None
+
+    def start(self, position_ms: float = 0.0, mixer_ms: int = 0):
+        """
+        Запускает часы с указанной позиции.
+
+        Args:
+            position_ms (float): Позиция трека в миллисекундах.
+            mixer_ms (int): Показание микшера в этот момент (после play() — 0).
+        """
+        now = time.monotonic()
+        self._anchor_ms = position_ms
+        self._anchor_time = now
+        self._mixer_base_ms = position_ms - mixer_ms
+        self._last_mixer_ms = mixer_ms
+        self.running = True
+        if self.paused:
+            self._paused_at = now
+
+    def pause(self):
+        """Останавливает ход часов."""
+        if self.running and not self.paused:
+            self.paused = True
+            self._paused_at = time.monotonic()
+
+    def resume(self):
+        """Возобновляет ход часов после паузы."""
+        if self.paused:
+            if self._paused_at is not None:
+                self._anchor_time += time.monotonic() - self._paused_at
+            self.paused = False
+            self._paused_at = None
+
+    def stop(self):
+        """Останавливает и сбрасывает часы."""
+        self.running = False
+        self.paused = False
+        self._paused_at = None
+        self._anchor_ms = 0.0
+        self._last_mixer_ms = None
+
+    def position_ms(self) -> float:
+        """
+        Возвращает текущую позицию.
+
+        Returns:
+            float: Позиция в миллисекундах (0, если часы остановлены).
+        """
+        if not self.running:
+            return 0.0
+        now = self._paused_at if self.paused else time.monotonic()
+        return self._anchor_ms + (now - self._anchor_time) * 1000.0
+
+    def sync(self, mixer_ms: int):
+        """
+        Сверяет часы с показанием микшера.
+
+        Args:
+            mixer_ms (int): Значение mixer.music.get_pos() (мс с начала play()).
+        """
+        if not self.running or mixer_ms < 0 or mixer_ms == self._last_mixer_ms:
+            return
+        self._last_mixer_ms = mixer_ms
+        actual = self._mixer_base_ms + mixer_ms
+        if abs(actual - self.position_ms()) > DRIFT_MS:
+            self._anchor_ms = actual
+            self._anchor_time = self._paused_at if self.paused else time.monotonic()
@@ -0,0 +1,324 @@
+import heapq
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+
+from .composition import Composition
+from .Playlist import PlayList
+
+# Слова названия и пути: последовательности букв и цифр в нижнем регистре
+_WORD = re.compile(r"\w+")
+# Минимальное сходство триграмм (коэффициент Дайса) для нечеткого совпадения
+FUZZY_THRESHOLD = 0.5
+# Нечеткий поиск выполняется только для слов не короче этого
+FUZZY_MIN_LENGTH = 3
+# Наибольшая разница длин слова запроса и слова словаря при нечетком поиске
+FUZZY_LENGTH_DELTA = 2
+# Слово запроса проверяется по спискам документов (пересечением множеств),
+# если они не более чем во столько раз длиннее списка самого редкого слова
+INTERSECT_RATIO = 8
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Делит текст на слова для поиска.
+
+    Args:
+        text (str): Название, путь или запрос.
+
+    Returns:
+        list[str]: Слова в нижнем регистре.
+    """
+    return _WORD.findall(text.lower())
+
+
+def trigrams(word: str) -> set[str]:
+    """
+    Возвращает триграммы слова с границами (для нечеткого сравнения).
+
+    Args:
+        word (str): Слово.
+
+    Returns:
+        set[str]: Множество триграмм.
+    """
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _words_of(composition: Composition) -> set[str]:
+    """Слова названия и пути композиции."""
+    return set(tokenize(f"{composition.title}/{composition.path}"))
+
+
+class _PlaylistWatcher:
+    """Передает добавление и удаление узлов плейлиста в поисковый индекс."""
+    __slots__ = ("index", "name")
+
+    def __init__(self, index: "SearchIndex", name: str):
+        self.index = index
+        self.name = name
+
+    def on_node_added(self, node):
+        self.index.add(self.name, node.data)
+
+    def on_node_removed(self, node):
+        self.index.discard(self.name, node.data)
+
+    def on_node_moved(self, node):
+        pass  # порядок композиций на результаты поиска не влияет
+
+
+class SearchIndex:
+    """
+    Инвертированный индекс для поиска композиций по названию и пути во всех плейлистах.
+
+    Каждая композиция плейлиста — документ; его слова (из названия и всех частей
+    пути) попадают в списки документов по словам. Запрос ищет каждое свое слово
+    как префикс слов словаря (бинарный поиск в отсортированном словаре), а если
+    префикс ничего не нашел — нечетко, по триграммам слов словаря. Документ
+    должен содержать все слова запроса. Для одного слова документы перебираются,
+    пока не наберется limit результатов; для нескольких списки сопоставимой длины
+    пересекаются как множества, а слишком длинные проверяются по словам документов.
+
+    Индекс обновляется инкрементально: он подписан на изменения плейлистов.
+    Удаленные документы помечаются пустыми и вычищаются из списков, когда их
+    становится больше, чем действующих. Методы можно вызывать из разных потоков.
+
+    Attributes:
+        _docs (list[tuple[str, Composition] | None]): Документы по номерам; None — удален.
+        _doc_ids (dict[tuple[str, int], list[int]]): Номера документов по имени плейлиста и id композиции.
+        _postings (dict[str, list[int]]): Номера документов по словам.
+        _vocabulary (list[str] | None): Отсортированный словарь; None — требует перестроения.
+        _trigrams (dict[tuple[str, int], set[str]]): Слова словаря по триграмме и длине слова.
+        _playlists (dict[str, tuple[PlayList, _PlaylistWatcher]]): Проиндексированные плейлисты.
+        _live (int): Число действующих документов.
+        _removed (int): Число удаленных документов, еще не вычищенных из списков.
+        _lock (threading.RLock): Блокировка.
+    """
+    def __init__(self):
+        """Инициализация пустого индекса."""
+        self._docs = []
+        self._doc_ids = {}
+        self._postings = {}
+        self._vocabulary = None
+        self._trigrams = {}
+        self._playlists = {}
+        self._live = 0
+        self._removed = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """Возвращает число проиндексированных композиций."""
+        return self._live
+
+    # === Плейлисты ===
+    def add_playlist(self, name: str, playlist: PlayList):
+        """
+        Индексирует плейлист и подписывается на его изменения.
+
+        Повторное добавление того же плейлиста ничего не делает, другой объект
+        под тем же именем заменяет прежний.
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист.
+        """
+        with self._lock:
+            known = self._playlists.get(name)
+            if known is not None:
+                if known[0] is playlist:
+                    return
+                self.remove_playlist(name)
+            watcher = _PlaylistWatcher(self, name)
+            self._playlists[name] = (playlist, watcher)
+            for node in playlist:
+                self._add(name, node.data)
+            playlist.add_observer(watcher)
+
+    def remove_playlist(self, name: str):
+        """
+        Исключает плейлист из индекса.
+
+        Args:
+            name (str): Имя плейлиста.
+        """
+        with self._lock:
+            known = self._playlists.pop(name, None)
+            if known is None:
+                return
+            playlist, watcher = known
+            playlist.remove_observer(watcher)
+            for node in playlist:
+                self.discard(name, node.data)
+
+    # === Документы ===
+    def add(self, name: str, composition: Composition):
+        """
+        Добавляет композицию плейлиста в индекс.
+
+        Args:
+            name (str): Имя плейлиста.
+            composition (Composition): Композиция.
+        """
+        with self._lock:
+            self._add(name, composition)
+
+    def _add(self, name: str, composition: Composition):
+        """Добавляет документ (вызывается под блокировкой)."""
+        doc = len(self._docs)
+        self._docs.append((name, composition))
+        self._doc_ids.setdefault((name, id(composition)), []).append(doc)
+        self._live += 1
+        for word in _words_of(composition):
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = []
+                self._vocabulary = None
+                for trigram in trigrams(word):
+                    self._trigrams.setdefault((trigram, len(word)), set()).add(word)
+            postings.append(doc)
+
+    def discard(self, name: str, composition: Composition):
+        """
+        Удаляет из индекса одно вхождение композиции в плейлист.
+
+        Args:
+            name (str): Имя плейлиста.
+            composition (Composition): Композиция.
+        """
+        with self._lock:
+            key = (name, id(composition))
+            docs = self._doc_ids.get(key)
+            if not docs:
+                return
+            doc = docs.pop()
+            if not docs:
+                del self._doc_ids[key]
+            self._docs[doc] = None
+            self._live -= 1
+            self._removed += 1
+            if self._removed > self._live:
+                self._compact()
+
+    def _compact(self):
+        """Вычищает удаленные документы из списков и словаря."""
+        for word in list(self._postings):
+            postings = [doc for doc in self._postings[word] if self._docs[doc] is not None]
+            if postings:
+                self._postings[word] = postings
+                continue
+            del self._postings[word]
+            self._vocabulary = None
+            for trigram in trigrams(word):
+                key = (trigram, len(word))
+                words = self._trigrams.get(key)
+                if words is not None:
+                    words.discard(word)
+                    if not words:
+                        del self._trigrams[key]
+        self._removed = 0
+
+    # === Поиск ===
+    def _sorted_vocabulary(self) -> list[str]:
+        """Возвращает отсортированный словарь, перестраивая его после добавления новых слов."""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        return self._vocabulary
+
+    def _match(self, term: str, fuzzy: bool) -> list[str]:
+        """Находит слова словаря для слова запроса: по префиксу, а при неудаче — нечетко."""
+        vocabulary = self._sorted_vocabulary()
+        matches = []
+        position = bisect_left(vocabulary, term)
+        while position < len(vocabulary) and vocabulary[position].startswith(term):
+            matches.append(vocabulary[position])
+            position += 1
+        if matches or not fuzzy or len(term) < FUZZY_MIN_LENGTH:
+            return matches
+        # кандидаты — слова близкой длины с общими триграммами; подсчет общих триграмм идет в Counter
+        query = trigrams(term)
+        lengths = range(max(1, len(term) - FUZZY_LENGTH_DELTA), len(term) + FUZZY_LENGTH_DELTA + 1)
+        shared = Counter(chain.from_iterable(
+            self._trigrams.get((trigram, length), ()) for length in lengths for trigram in query))
+        # коэффициент Дайса: у слова длины n с границами n + 1 триграмма
+        minimum = FUZZY_THRESHOLD * (len(query) + lengths.start + 1) / 2
+        scored = []
+        for word, count in shared.items():
+            if count >= minimum:
+                score = 2 * count / (len(query) + len(word) + 1)
+                if score >= FUZZY_THRESHOLD:
+                    scored.append((score, word))
+        scored.sort(reverse=True)
+        return [word for _, word in scored]
+
+    def search(self, query: str, limit: int = 50, fuzzy: bool = True) -> list[tuple[str, Composition]]:
+        """
+        Ищет композиции, содержащие все слова запроса.
+
+        Args:
+            query (str): Запрос; каждое слово ищется как префикс слов названия или пути.
+            limit (int): Максимальное число результатов.
+            fuzzy (bool): Искать нечетко слова, для которых нет совпадений по префиксу.
+
+        Returns:
+            list[tuple[str, Composition]]: Имя плейлиста и композиция для каждого результата.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or limit <= 0:
+            return []
+        with self._lock:
+            matches = []
+            for term in terms:
+                words = self._match(term, fuzzy)
+                if not words:
+                    return []
+                matches.append(words)
+            order = sorted(range(len(terms)), key=lambda i: self._size(matches[i]))
+            first = matches[order[0]]
+            if len(terms) == 1:
+                return self._collect(first, limit)
+            # списки сопоставимой длины пересекаются множествами, длинные проверяются по словам документа
+            # (слова документа не хранятся, чтобы не удваивать память, и выделяются заново)
+            smallest = self._size(first)
+            candidates = self._union(first)
+            others = []
+            for i in order[1:]:
+                if self._size(matches[i]) <= smallest * INTERSECT_RATIO:
+                    candidates &= self._union(matches[i])
+                else:
+                    others.append(frozenset(matches[i]))
+            results = []
+            # без дополнительной проверки достаточно limit первых номеров
+            for doc in sorted(candidates) if others else heapq.nsmallest(limit + self._removed, candidates):
+                entry = self._docs[doc]
+                if entry is not None and all(not other.isdisjoint(_words_of(entry[1])) for other in others):
+                    results.append(entry)
+                    if len(results) >= limit:
+                        break
+            return results
+
+    def _size(self, words: list[str]) -> int:
+        """Суммарная длина списков документов слов."""
+        return sum(len(self._postings[word]) for word in words)
+
+    def _union(self, words: list[str]) -> set[int]:
+        """Номера документов, содержащих хотя бы одно из слов."""
+        return set().union(*(self._postings[word] for word in words))
+
+    def _collect(self, words: list[str], limit: int) -> list[tuple[str, Composition]]:
+        """Перебирает документы слов по порядку, пока не наберет limit результатов."""
+        results = []
+        seen = set()
+        for word in words:
+            for doc in self._postings[word]:
+                entry = self._docs[doc]
+                if entry is None or doc in seen:
+                    continue
+                seen.add(doc)
+                results.append(entry)
+                if len(results) >= limit:
+                    return results
+        return results
@@ -0,0 +1,456 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from .composition import Composition
+from .library import TrackLibrary
+from .Playlist import PlayList
+from .storage import PlaylistStorage
+
+# Шаг между позициями соседних композиций: между ними можно вставить запись, не сдвигая остальные
+GAP = 1024
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS tracks ("
+    "id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, title TEXT NOT NULL, duration REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS playlists (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS entries ("
+    "playlist_id INTEGER NOT NULL REFERENCES playlists (id) ON DELETE CASCADE, "
+    "position INTEGER NOT NULL, track_id INTEGER NOT NULL REFERENCES tracks (id), "
+    "PRIMARY KEY (playlist_id, position)) WITHOUT ROWID",
+)
+
+
+class _SQLiteTrackLibrary(TrackLibrary):
+    """
+    Библиотека треков, хранящаяся в таблице tracks.
+
+    Номера треков совпадают с id строк таблицы. Новые треки записывает
+    хранилище в той же транзакции, что и ссылающиеся на них плейлисты.
+    """
+    def __init__(self, storage: "SQLitePlaylistStorage"):
+        """
+        Инициализация библиотеки (таблица читается при первом обращении).
+
+        Args:
+            storage (SQLitePlaylistStorage): Хранилище с соединением с базой.
+        """
+        super().__init__(storage.path)
+        self._storage = storage
+
+    def _load(self):
+        """Читает треки из таблицы tracks."""
+        for track_id, title, duration, path in self._storage._query(
+                "SELECT id, title, duration, path FROM tracks ORDER BY id"):
+            self._append_loaded(track_id, Composition(title, duration, path))
+
+    def save(self):
+        """Записывает новые треки (вместе с остальными изменениями хранилища)."""
+        self._storage.flush()
+
+
+class SQLitePlaylistStorage(PlaylistStorage):
+    """
+    Хранилище плейлистов в базе SQLite.
+
+    Треки хранятся в таблице tracks (это общая библиотека треков), плейлисты —
+    в таблице playlists, а их состав — в таблице entries: строка на композицию
+    с позицией внутри плейлиста. Позиции идут с шагом GAP, поэтому перемещение
+    и вставка меняют одну-две строки, а не весь плейлист. Список плейлистов
+    читается одним запросом, без разбора их содержимого.
+
+    База работает в режиме WAL: чтение не блокируется записью. Изменения
+    копятся в очереди и выполняются одной транзакцией: при заданном writer —
+    все, что накопилось к моменту выполнения задачи записи; без него — каждая
+    операция (или блок batch()) сразу.
+
+    Позиции загруженных плейлистов хранятся в памяти, чтобы изменения
+    переводились в запросы без чтения базы. Методы record_* вызываются из одного
+    потока (как и у PlaylistJSONController), запросы к базе — из любых.
+
+    Attributes:
+        path (str): Путь к файлу базы данных.
+        folder (str): Папка базы (в ней же хранится кэш метаданных).
+        library (TrackLibrary): Библиотека треков из таблицы tracks.
+        writer (BackgroundTasks | None): Исполнитель транзакций; None — запись сразу.
+        _positions (dict[str, list[int]]): Позиции композиций загруженных плейлистов в порядке плейлиста.
+        _playlist_ids (dict[str, int]): Номера плейлистов в базе.
+        _pending (list[tuple[Callable, tuple]]): Операции, ожидающие записи.
+        _flush_scheduled (bool): Запись очереди уже поставлена исполнителю.
+        _batch_depth (int): Вложенность блоков batch().
+        _connection (sqlite3.Connection | None): Соединение с базой; None после close().
+        _lock (threading.RLock): Блокировка соединения и очереди.
+    """
+    def __init__(self, path: str = "playlists.sqlite", writer=None):
+        """
+        Открывает (или создает) базу плейлистов.
+
+        Args:
+            path (str): Путь к файлу базы данных.
+            writer (BackgroundTasks | None): Исполнитель операций записи с методом submit(fn, *args).
+        """
+        self.path = path
+        self.folder = os.path.dirname(path) or "."
+        os.makedirs(self.folder, exist_ok=True)
+        self.writer = writer
+        self._positions = {}
+        self._playlist_ids = {}
+        self._pending = []
+        self._flush_scheduled = False
+        self._batch_depth = 0
+        self._lock = threading.RLock()
+        # транзакции открываются явно, в _flush
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # в режиме WAL синхронизация при каждой транзакции не нужна для целостности базы
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA foreign_keys=ON")
+        for statement in SCHEMA:
+            self._connection.execute(statement)
+        self.library = _SQLiteTrackLibrary(self)
+
+    def _query(self, sql: str, params=()) -> list[tuple]:
+        """Выполняет запрос на чтение, предварительно записав накопленные изменения."""
+        with self._lock:
+            self._flush()
+            return self._connection.execute(sql, params).fetchall()
+
+    # === Очередь записи ===
+    def _enqueue(self, fn, *args):
+        """
+        Ставит операцию в очередь записи; перед ней записываются новые треки библиотеки.
+
+        Args:
+            fn (Callable): Функция fn(connection, *args), выполняемая в транзакции.
+            *args: Аргументы функции.
+        """
+        tracks = self.library.take_unsaved_tracks()
+        with self._lock:
+            if tracks:
+                self._pending.append((self._insert_tracks, (tracks,)))
+            self._pending.append((fn, args))
+            if self._batch_depth or self._flush_scheduled:
+                return
+            if self.writer is not None:
+                self._flush_scheduled = True
+        if self.writer is None:
+            self._flush()
+        else:
+            self.writer.submit(self._flush)
+
+    def _flush(self):
+        """Выполняет накопленные операции одной транзакцией."""
+        with self._lock:
+            self._flush_scheduled = False
+            pending, self._pending = self._pending, []
+            if not pending or self._connection is None:
+                return
+            connection = self._connection
+            connection.execute("BEGIN")
+            try:
+                for fn, args in pending:
+                    fn(connection, *args)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def flush(self):
+        """Записывает накопленные изменения, не дожидаясь исполнителя."""
+        self._flush()
+
+    @contextmanager
+    def batch(self):
+        """
+        Объединяет изменения внутри блока with в одну транзакцию.
+
+        Пример:
+            with storage.batch():
+                for name, playlist in playlists.items():
+                    storage.save_playlist(name, playlist)
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                outermost = self._batch_depth == 0
+            if outermost:
+                self._flush()
+
+    def close(self):
+        """Записывает накопленные изменения и закрывает соединение."""
+        with self._lock:
+            if self._connection is None:
+                return
+            self._flush()
+            self._connection.close()
+            self._connection = None
+
+    # === Операции в транзакции ===
+    @staticmethod
+    def _insert_tracks(connection: sqlite3.Connection, tracks: list[tuple[int, Composition]]):
+        """Добавляет новые треки библиотеки."""
+        connection.executemany("INSERT INTO tracks (id, path, title, duration) VALUES (?, ?, ?, ?)",
+                               [(track_id, c.path, c.title, c.duration) for track_id, c in tracks])
+
+    def _playlist_id(self, connection: sqlite3.Connection, name: str) -> int:
+        """Возвращает номер плейлиста в базе, создавая плейлист при необходимости."""
+        playlist_id = self._playlist_ids.get(name)
+        if playlist_id is None:
+            row = connection.execute("SELECT id FROM playlists WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                playlist_id = connection.execute("INSERT INTO playlists (name) VALUES (?)", (name,)).lastrowid
+            else:
+                playlist_id = row[0]
+            self._playlist_ids[name] = playlist_id
+        return playlist_id
+
+    def _replace_entries(self, connection: sqlite3.Connection, name: str, rows: list[tuple[int, int]]):
+        """Заменяет состав плейлиста строками (позиция, номер трека)."""
+        playlist_id = self._playlist_id(connection, name)
+        connection.execute("DELETE FROM entries WHERE playlist_id = ?", (playlist_id,))
+        self._insert_entries(connection, name, rows)
+
+    def _insert_entries(self, connection: sqlite3.Connection, name: str, rows: list[tuple[int, int]]):
+        """Добавляет в плейлист строки (позиция, номер трека)."""
+        playlist_id = self._playlist_id(connection, name)
+        connection.executemany("INSERT INTO entries (playlist_id, position, track_id) VALUES (?, ?, ?)",
+                               [(playlist_id, position, track_id) for position, track_id in rows])
+
+    def _delete_entries(self, connection: sqlite3.Connection, name: str, positions: list[int]):
+        """Удаляет из плейлиста строки с указанными позициями."""
+        playlist_id = self._playlist_id(connection, name)
+        connection.executemany("DELETE FROM entries WHERE playlist_id = ? AND position = ?",
+                               [(playlist_id, position) for position in positions])
+
+    def _update_entries(self, connection: sqlite3.Connection, name: str, rows: list[tuple[int, int]]):
+        """Заменяет треки в строках плейлиста (позиция, номер трека)."""
+        playlist_id = self._playlist_id(connection, name)
+        connection.executemany("UPDATE entries SET track_id = ? WHERE playlist_id = ? AND position = ?",
+                               [(track_id, playlist_id, position) for position, track_id in rows])
+
+    def _delete_playlist(self, connection: sqlite3.Connection, name: str):
+        """Удаляет плейлист; его строки в entries удаляются каскадно."""
+        self._playlist_ids.pop(name, None)
+        connection.execute("DELETE FROM playlists WHERE name = ?", (name,))
+
+    # === Операции хранилища ===
+    def list_playlists(self) -> dict[str, int]:
+        """
+        Читает список плейлистов одним запросом.
+
+        Returns:
+            dict[str, int]: Словарь, где ключ — имя плейлиста, значение — его номер в базе.
+        """
+        rows = self._query("SELECT name, id FROM playlists ORDER BY name")
+        with self._lock:
+            self._playlist_ids.update(rows)
+        return dict(rows)
+
+    def load_playlist(self, name: str) -> PlayList:
+        """
+        Загружает плейлист из базы.
+
+        Args:
+            name (str): Имя плейлиста.
+
+        Returns:
+            PlayList: Загруженный плейлист.
+
+        Raises:
+            KeyError: Если плейлиста нет в базе.
+        """
+        rows = self._query("SELECT id FROM playlists WHERE name = ?", (name,))
+        if not rows:
+            raise KeyError(name)
+        entries = self._query("SELECT position, track_id FROM entries WHERE playlist_id = ? ORDER BY position",
+                              (rows[0][0],))
+        get = self.library.get
+        pl = PlayList()
+        pl.add_songs(get(track_id) for _, track_id in entries)
+        self._positions[name] = [position for position, _ in entries]
+        return pl
+
+    def load_playlists(self) -> dict[str, PlayList]:
+        """
+        Загружает все плейлисты одним запросом.
+
+        Returns:
+            dict[str, PlayList]: Словарь, где ключ — имя плейлиста, значение — объект PlayList.
+        """
+        names = {playlist_id: name for name, playlist_id in self.list_playlists().items()}
+        entries = {playlist_id: [] for playlist_id in names}
+        for playlist_id, position, track_id in self._query(
+                "SELECT playlist_id, position, track_id FROM entries ORDER BY playlist_id, position"):
+            entries[playlist_id].append((position, track_id))
+        get = self.library.get
+        playlists = {}
+        for playlist_id, name in names.items():
+            pl = PlayList()
+            pl.add_songs(get(track_id) for _, track_id in entries[playlist_id])
+            self._positions[name] = [position for position, _ in entries[playlist_id]]
+            playlists[name] = pl
+        return playlists
+
+    def save_playlist(self, name: str, playlist: PlayList):
+        """
+        Сохраняет плейлист целиком, заново нумеруя позиции с шагом GAP.
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Объект плейлиста для сохранения.
+        """
+        track_id = self.library.track_id
+        positions = list(range(GAP, (len(playlist) + 1) * GAP, GAP))
+        rows = list(zip(positions, (track_id(node.data) for node in playlist)))
+        self._positions[name] = positions
+        self._enqueue(self._replace_entries, name, rows)
+
+    def delete_playlist_file(self, name: str):
+        """
+        Удаляет плейлист из базы.
+
+        Args:
+            name (str): Имя плейлиста для удаления.
+        """
+        self._positions.pop(name, None)
+        self._enqueue(self._delete_playlist, name)
+
+    def record_add_many(self, name: str, playlist: PlayList, compositions: list[Composition]):
+        """
+        Фиксирует добавление пакета композиций в конец плейлиста.
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист после добавления.
+            compositions (list[Composition]): Добавленные композиции.
+        """
+        positions = self._positions.get(name)
+        if positions is None:
+            self.save_playlist(name, playlist)
+            return
+        last = positions[-1] if positions else 0
+        added = list(range(last + GAP, last + (len(compositions) + 1) * GAP, GAP))
+        positions.extend(added)
+        track_id = self.library.track_id
+        self._enqueue(self._insert_entries, name, list(zip(added, map(track_id, compositions))))
+
+    def record_remove(self, name: str, playlist: PlayList, index: int):
+        """
+        Фиксирует удаление композиции: удаляется одна строка.
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист после удаления.
+            index (int): Позиция удаленной композиции.
+        """
+        positions = self._positions.get(name)
+        if positions is None:
+            self.save_playlist(name, playlist)
+            return
+        self._enqueue(self._delete_entries, name, [positions.pop(index)])
+
+    def _record_swap(self, name: str, playlist: PlayList, index: int, other: int):
+        """Фиксирует обмен композиций на двух позициях: обновляются две строки."""
+        positions = self._positions.get(name)
+        if positions is None or len(positions) != len(playlist):
+            self.save_playlist(name, playlist)
+            return
+        track_id = self.library.track_id
+        rows = [(positions[i], track_id(playlist.node_at(i).data)) for i in {index, other}]
+        self._enqueue(self._update_entries, name, rows)
+
+    def record_move_up(self, name: str, playlist: PlayList, index: int):
+        """
+        Фиксирует перемещение композиции вверх (PlayList.move_up).
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист после перемещения.
+            index (int): Позиция композиции до перемещения.
+        """
+        self._record_swap(name, playlist, index, (index - 1) % len(playlist))
+
+    def record_move_down(self, name: str, playlist: PlayList, index: int):
+        """
+        Фиксирует перемещение композиции вниз (PlayList.move_down).
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист после перемещения.
+            index (int): Позиция композиции до перемещения.
+        """
+        self._record_swap(name, playlist, index, (index + 1) % len(playlist))
+
+    def record_move(self, name: str, playlist: PlayList, indices: list[int], index: int):
+        """
+        Фиксирует перемещение композиций: их строки получают позиции в промежутке
+        между новыми соседями, остальные строки не меняются. Если промежуток
+        исчерпан, позиции плейлиста нумеруются заново.
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист после перемещения.
+            indices (list[int]): Позиции перемещенных композиций до перемещения.
+            index (int): Позиция первой перемещенной композиции после перемещения.
+        """
+        positions = self._positions.get(name)
+        if positions is None or len(positions) != len(playlist):
+            self.save_playlist(name, playlist)
+            return
+        indices = sorted(set(indices))
+        count = len(indices)
+        old = [positions[i] for i in indices]
+        for i in reversed(indices):
+            del positions[i]
+        low = positions[index - 1] if index > 0 else None
+        high = positions[index] if index < len(positions) else None
+        if low is None and high is None:
+            positions[:] = old
+            return  # перемещены все композиции, их порядок не изменился
+        if low is None:
+            low = high - (count + 1) * GAP
+        elif high is None:
+            high = low + (count + 1) * GAP
+        step = (high - low) // (count + 1)
+        if step == 0:
+            self.save_playlist(name, playlist)
+            return
+        new = [low + step * (number + 1) for number in range(count)]
+        positions[index:index] = new
+        track_id = self.library.track_id
+        rows = [(position, track_id(playlist.node_at(index + number).data)) for number, position in enumerate(new)]
+        self._enqueue(self._move_entries, name, old, rows)
+
+    def _move_entries(self, connection: sqlite3.Connection, name: str, old: list[int], rows: list[tuple[int, int]]):
+        """Переносит строки плейлиста с позиций old на новые позиции rows."""
+        # удаление до вставки: новые позиции могут совпадать со старыми позициями других перемещаемых строк
+        self._delete_entries(connection, name, old)
+        self._insert_entries(connection, name, rows)
+
+    def import_files(self, source: str) -> int:
+        """
+        Импортирует плейлисты из папки PlaylistJSONController (снимки .json/.apl,
+        журналы и library.jsonl) одной транзакцией. Исходная папка открывается
+        только для чтения и не изменяется: поврежденные журналы не обрезаются
+        и не удаляются. Плейлисты с теми же именами перезаписываются.
+
+        Args:
+            source (str): Папка с файлами плейлистов.
+
+        Returns:
+            int: Число импортированных плейлистов.
+        """
+        from .PlaylistJSONController import PlaylistJSONController
+        files = PlaylistJSONController(source, read_only=True)
+        names = files.list_playlists()
+        with self.batch():
+            for name in names:
+                playlist = PlayList()
+                playlist.add_songs(self.intern(c) for c in files.load_playlist(name).get_all_songs())
+                self.save_playlist(name, playlist)
+        return len(names)
@@ -0,0 +1,102 @@
+import sys
+import time
+
+
+class StartupTimer:
+    """
+    Замер этапов запуска приложения.
+
+    Attributes:
+        origin (float): Момент начала отсчета (time.perf_counter).
+        marks (list[tuple[str, float]]): Отметки этапов: название и время от начала в секундах.
+    """
+    def __init__(self, origin: float | None = None):
+        """
+        Инициализация таймера.
+
+        Args:
+            origin (float | None): Момент начала отсчета; по умолчанию — текущий.
+        """
+        self.origin = time.perf_counter() if origin is None else origin
+        self.marks = []
+
+    def mark(self, label: str):
+        """
+        Фиксирует окончание этапа запуска.
+
+        Args:
+            label (str): Название этапа.
+        """
+        self.marks.append((label, time.perf_counter() - self.origin))
+
+    def report(self, stream=None):
+        """
+        Печатает отчет о времени запуска.
+
+        Args:
+            stream: Поток вывода (по умолчанию sys.stderr).
+        """
+        stream = stream or sys.stderr
+        print("Время запуска:", file=stream)
+        previous = 0.0
+        for label, elapsed in self.marks:
+            print(f"  {label:<32} {elapsed * 1000:9.1f} мс  (+{(elapsed - previous) * 1000:.1f} мс)", file=stream)
+            previous = elapsed
+
+
+def parse_importtime(lines) -> list[tuple[str, int, int]]:
+    """
+    Разбирает вывод python -X importtime и группирует время по пакетам.
+
+    Args:
+        lines (Iterable[str]): Строки вида "import time: 120 | 4500 |   package.module".
+
+    Returns:
+        list[tuple[str, int, int]]: Пакет верхнего уровня, суммарное собственное время
+            его модулей в микросекундах и число модулей — по убыванию времени.
+    """
+    packages = {}
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # строка заголовка
+        package = parts[2].strip().split(".")[0]
+        self_us, count = packages.get(package, (0, 0))
+        packages[package] = (self_us + int(parts[0]), count + 1)
+    return sorted(((package, self_us, count) for package, (self_us, count) in packages.items()),
+                  key=lambda item: item[1], reverse=True)
+
+
+def profile_startup(script: str, args: list[str], top: int = 15, stream=None) -> int:
+    """
+    Запускает программу в отдельном процессе с -X importtime и печатает отчет.
+
+    Программа получает флаги --startup-report и --quit-after-startup: она
+    печатает время до появления окна и сразу закрывается. В отчет попадают
+    эти отметки и время импорта по пакетам.
+
+    Args:
+        script (str): Путь к запускаемому скрипту.
+        args (list[str]): Дополнительные аргументы скрипта.
+        top (int): Сколько пакетов показать.
+        stream: Поток вывода (по умолчанию sys.stderr).
+
+    Returns:
+        int: Код завершения дочернего процесса.
+    """
+    import subprocess
+    stream = stream or sys.stderr
+    command = [sys.executable, "-X", "importtime", script, *args, "--startup-report", "--quit-after-startup"]
+    result = subprocess.run(command, stderr=subprocess.PIPE, text=True)
+    lines = result.stderr.splitlines()
+    for line in lines:
+        if not line.startswith("import time:"):
+            print(line, file=stream)
+    packages = parse_importtime(lines)
+    total = sum(self_us for _, self_us, _ in packages)
+    print(f"Импорт модулей: {total / 1000:.1f} мс, по пакетам:", file=stream)
+    for package, self_us, count in packages[:top]:
+        print(f"  {package:<32} {self_us / 1000:9.1f} мс  ({count} модулей)", file=stream)
+    return result.returncode
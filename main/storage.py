@@ -0,0 +1,296 @@
+import json
+import os
+from abc import ABC, abstractmethod
+
+from .composition import Composition
+from .lazy_playlists import LazyPlaylists
+from .library import TrackLibrary
+from .playlist_format import encode_playlist
+from .Playlist import PlayList
+
+# Хранилища плейлистов: "files" — файл на плейлист (PlaylistJSONController), "sqlite" — база SQLite
+BACKENDS = ("files", "sqlite")
+
+
+class PlaylistStorage(ABC):
+    """
+    Базовый класс хранилища плейлистов.
+
+    Хранилище загружает и сохраняет плейлисты целиком и фиксирует отдельные
+    изменения (добавление, удаление, перемещение) методами record_*, которые
+    вызываются после того, как изменение применено к PlayList. Подклассы
+    реализуют абстрактные методы list_playlists, load_playlist, save_playlist,
+    delete_playlist_file и record_* (кроме record_add); импорт каталога,
+    экспорт, ленивое открытие и работа с общей библиотекой треков у всех
+    хранилищ общие.
+
+    Если задан writer, запись выполняется им (например, в фоновом потоке), а
+    плейлист читается только в вызывающем потоке.
+
+    Attributes:
+        library (TrackLibrary | None): Общая библиотека треков; None — треки хранятся в каждом плейлисте.
+        writer (BackgroundTasks | None): Исполнитель операций записи; None — запись сразу.
+    """
+    library: TrackLibrary | None = None
+    writer = None
+
+    def _write(self, fn, *args):
+        """Выполняет операцию записи сразу или передает ее исполнителю writer."""
+        if self.writer is None:
+            fn(*args)
+        else:
+            self.writer.submit(fn, *args)
+
+    # === Операции хранилища ===
+    @abstractmethod
+    def list_playlists(self) -> dict:
+        """
+        Возвращает имена плейлистов, не загружая их содержимое.
+
+        Returns:
+            dict: Имена плейлистов (значения зависят от хранилища).
+        """
+
+    @abstractmethod
+    def load_playlist(self, name: str) -> PlayList:
+        """
+        Загружает плейлист.
+
+        Args:
+            name (str): Имя плейлиста.
+
+        Returns:
+            PlayList: Загруженный плейлист.
+        """
+
+    @abstractmethod
+    def save_playlist(self, name: str, playlist: PlayList):
+        """
+        Сохраняет плейлист целиком (создает его, если он новый).
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист.
+        """
+
+    @abstractmethod
+    def delete_playlist_file(self, name: str):
+        """
+        Удаляет плейлист из хранилища.
+
+        Args:
+            name (str): Имя плейлиста.
+        """
+
+    def record_add(self, name: str, playlist: PlayList, composition: Composition):
+        """
+        Фиксирует добавление композиции в конец плейлиста.
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист после добавления.
+            composition (Composition): Добавленная композиция.
+        """
+        self.record_add_many(name, playlist, [composition])
+
+    @abstractmethod
+    def record_add_many(self, name: str, playlist: PlayList, compositions: list[Composition]):
+        """
+        Фиксирует добавление пакета композиций в конец плейлиста.
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист после добавления.
+            compositions (list[Composition]): Добавленные композиции.
+        """
+
+    @abstractmethod
+    def record_remove(self, name: str, playlist: PlayList, index: int):
+        """
+        Фиксирует удаление композиции.
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист после удаления.
+            index (int): Позиция удаленной композиции.
+        """
+
+    @abstractmethod
+    def record_move_up(self, name: str, playlist: PlayList, index: int):
+        """
+        Фиксирует перемещение композиции вверх (PlayList.move_up).
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист после перемещения.
+            index (int): Позиция композиции до перемещения.
+        """
+
+    @abstractmethod
+    def record_move_down(self, name: str, playlist: PlayList, index: int):
+        """
+        Фиксирует перемещение композиции вниз (PlayList.move_down).
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист после перемещения.
+            index (int): Позиция композиции до перемещения.
+        """
+
+    @abstractmethod
+    def record_move(self, name: str, playlist: PlayList, indices: list[int], index: int):
+        """
+        Фиксирует перемещение композиций (PlayList.move_to и PlayList.move_many).
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист после перемещения.
+            indices (list[int]): Позиции перемещенных композиций до перемещения.
+            index (int): Позиция первой перемещенной композиции после перемещения.
+        """
+
+    def close(self):
+        """Завершает запись и освобождает ресурсы хранилища."""
+
+    # === Общие операции ===
+    def intern(self, composition: Composition) -> Composition:
+        """
+        Возвращает общий объект библиотеки для композиции (или ее саму, если библиотека отключена).
+
+        Args:
+            composition (Composition): Новая композиция.
+
+        Returns:
+            Composition: Композиция, которую следует добавить в плейлист.
+        """
+        return composition if self.library is None else self.library.intern(composition)
+
+    def known_track(self, path: str) -> Composition | None:
+        """
+        Ищет трек в библиотеке, чтобы не определять метаданные файла повторно.
+
+        Args:
+            path (str): Путь к аудиофайлу.
+
+        Returns:
+            Composition | None: Композиция библиотеки или None (в том числе без библиотеки).
+        """
+        return None if self.library is None else self.library.find(path)
+
+    @staticmethod
+    def _full_record(composition: Composition) -> dict:
+        """Преобразует композицию в самодостаточный словарь (для экспорта и работы без библиотеки)."""
+        return {"title": composition.title, "duration": composition.duration, "path": composition.path}
+
+    def import_folder(self, name: str, playlist: PlayList, root: str, importer: "FolderImporter | None" = None,
+                      on_progress=None) -> int:
+        """
+        Импортирует в плейлист все аудиофайлы из дерева каталогов.
+
+        Файлы, которые уже есть в плейлисте, пропускаются; каждый пакет
+        добавляется и фиксируется одной операцией.
+
+        Args:
+            name (str): Имя плейлиста.
+            playlist (PlayList): Плейлист для пополнения.
+            root (str): Корневой каталог.
+            importer (FolderImporter | None): Настроенный конвейер импорта.
+            on_progress (Callable[[int, int], None] | None): Получает ход работы.
+
+        Returns:
+            int: Число импортированных композиций.
+        """
+        if importer is None:
+            # пул процессов импорта загружается только при импорте
+            from .importer import FolderImporter
+            importer = FolderImporter(library=self.library)
+
+        def on_batch(batch):
+            playlist.add_songs(batch)
+            self.record_add_many(name, playlist, batch)
+
+        return importer.run(root, on_batch, on_progress, skip=lambda path: playlist.find_by_path(path) is not None)
+
+    def export_playlist(self, playlist: PlayList, path: str):
+        """
+        Экспортирует плейлист в файл; формат определяется по расширению.
+
+        Поддерживаются .json и .apl (форматы снимков) и .m3u/.m3u8 (для других плееров).
+        Экспортированный файл самодостаточен: треки записываются целиком, без ссылок на библиотеку.
+
+        Args:
+            playlist (PlayList): Плейлист для экспорта.
+            path (str): Путь к файлу.
+
+        Raises:
+            ValueError: Если расширение не поддерживается.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".apl":
+            payload = encode_playlist(node.data for node in playlist)
+        elif extension == ".json":
+            data = [self._full_record(c) for c in playlist.get_all_songs()]
+            payload = json.dumps(data, indent=4, ensure_ascii=False).encode("utf-8")
+        elif extension in (".m3u", ".m3u8"):
+            lines = ["#EXTM3U"]
+            for c in playlist.get_all_songs():
+                lines.append(f"#EXTINF:{round(c.duration)},{c.title}")
+                lines.append(c.path)
+            payload = ("\n".join(lines) + "\n").encode("utf-8")
+        else:
+            raise ValueError(f"unsupported export format: {extension}")
+        with open(path, "wb") as f:
+            f.write(payload)
+
+    def load_playlists(self) -> dict[str, PlayList]:
+        """
+        Загружает все плейлисты.
+
+        Returns:
+            dict[str, PlayList]: Словарь, где ключ — имя плейлиста, значение — объект PlayList.
+        """
+        return {name: self.load_playlist(name) for name in self.list_playlists()}
+
+    def open_playlists(self, prefetch: bool = False, max_workers: int | None = None) -> LazyPlaylists:
+        """
+        Открывает плейлисты лениво: сразу читается только список имен,
+        а каждый плейлист загружается при первом обращении.
+
+        Args:
+            prefetch (bool): Догружать остальные плейлисты в фоновом пуле потоков.
+            max_workers (int | None): Размер пула потоков для фоновой загрузки.
+
+        Returns:
+            LazyPlaylists: Словарь плейлистов с отложенной загрузкой.
+        """
+        playlists = LazyPlaylists(self.list_playlists(), self.load_playlist)
+        if prefetch:
+            playlists.prefetch(max_workers)
+        return playlists
+
+
+def open_storage(folder: str = "playlists", backend: str = "files", **options) -> PlaylistStorage:
+    """
+    Открывает хранилище плейлистов.
+
+    Args:
+        folder (str): Папка с плейлистами (для SQLite — папка файла playlists.sqlite).
+        backend (str): "files" или "sqlite".
+        **options: Параметры конструктора хранилища (journal, file_format, writer, library...).
+
+    Returns:
+        PlaylistStorage: Хранилище.
+
+    Raises:
+        ValueError: Если хранилище неизвестно.
+    """
+    if backend == "files":
+        from .PlaylistJSONController import PlaylistJSONController
+        return PlaylistJSONController(folder, **options)
+    if backend == "sqlite":
+        from .sqlite_storage import SQLitePlaylistStorage
+        # параметры файлов и журнала к базе не относятся
+        for option in ("file_format", "journal", "compact_every"):
+            options.pop(option, None)
+        return SQLitePlaylistStorage(os.path.join(folder, "playlists.sqlite"), **options)
+    raise ValueError(f"unknown playlist storage: {backend}")
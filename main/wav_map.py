@@ -0,0 +1,118 @@
+import mmap
+import os
+
+from .metadata import WavFormat, probe_wav_format
+
+
+class MappedWav:
+    """
+    WAV-файл, отображенный в память (mmap).
+
+    Аудиоданные не читаются в память целиком: срезы chunk() ссылаются прямо
+    на страницы отображения, и ОС подгружает их по мере обращения. Уже
+    проигранные страницы можно вернуть системе через release(), поэтому
+    резидентная память не растет с длиной записи.
+
+    Attributes:
+        path (str): Путь к файлу.
+        format (WavFormat): Формат аудиоданных.
+        _map (mmap.mmap | None): Отображение файла; None после close().
+        _data (memoryview | None): Срез отображения с аудиоданными.
+    """
+    def __init__(self, path: str):
+        """
+        Отображает файл в память.
+
+        Args:
+            path (str): Путь к WAV-файлу.
+
+        Raises:
+            ValueError: Если заголовок WAV не распознан или аудиоданных нет.
+            OSError: Если файл недоступен.
+        """
+        wav = probe_wav_format(path)
+        if wav is None or not wav.block_align or wav.data_size < wav.block_align:
+            raise ValueError(f"not a playable WAV file: {path}")
+        self.path = path
+        self.format = wav
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # последний неполный кадр отбрасывается
+        size = wav.data_size - wav.data_size % wav.block_align
+        self._data = memoryview(self._map)[wav.data_offset:wav.data_offset + size]
+
+    def __len__(self) -> int:
+        """Размер аудиоданных в байтах."""
+        return len(self._data)
+
+    def offset_of(self, seconds: float) -> int:
+        """
+        Переводит позицию в смещение в аудиоданных, выровненное по кадру.
+
+        Args:
+            seconds (float): Позиция в секундах.
+
+        Returns:
+            int: Смещение в байтах (не больше размера данных).
+        """
+        frames = max(int(seconds * self.format.sample_rate), 0)
+        return min(frames * self.format.block_align, len(self._data))
+
+    def chunk(self, offset: int, size: int) -> memoryview:
+        """
+        Возвращает срез аудиоданных без копирования.
+
+        Срез нужно освободить (release() или with) до close().
+
+        Args:
+            offset (int): Смещение в байтах.
+            size (int): Желаемый размер в байтах.
+
+        Returns:
+            memoryview: Срез; короче size в конце данных.
+        """
+        return self._data[offset:offset + size]
+
+    def release(self, start: int, end: int):
+        """
+        Сообщает ОС, что страницы аудиоданных от start до end больше не нужны.
+
+        Страницы остаются доступными: при повторном обращении они снова
+        прочитаются из файла. На платформах без madvise ничего не делает.
+
+        Args:
+            start (int): Смещение в аудиоданных, с которого данные проиграны.
+            end (int): Смещение в аудиоданных, до которого данные проиграны.
+        """
+        if not hasattr(self._map, "madvise") or not hasattr(mmap, "MADV_DONTNEED"):
+            return
+        # madvise принимает только начало, выровненное по странице
+        first = (self.format.data_offset + start) // mmap.PAGESIZE * mmap.PAGESIZE
+        last = (self.format.data_offset + end) // mmap.PAGESIZE * mmap.PAGESIZE
+        if last > first:
+            self._map.madvise(mmap.MADV_DONTNEED, first, last - first)
+
+    def close(self):
+        """Закрывает отображение."""
+        if self._map is not None:
+            self._data.release()
+            try:
+                self._map.close()
+            except BufferError:
+                # срезы еще используются (например, последним блоком NumPy):
+                # отображение закроется вместе с последним из них
+                pass
+            self._map = self._data = None
+
+
+def is_wav(path: str) -> bool:
+    """
+    Проверяет расширение файла.
+
+    Args:
+        path (str): Путь к файлу.
+
+    Returns:
+        bool: True для файлов .wav.
+    """
+    return os.path.splitext(path)[1].lower() == ".wav"
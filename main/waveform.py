@@ -0,0 +1,191 @@
+import hashlib
+import os
+import tempfile
+from typing import NamedTuple
+
+import numpy as np
+
+from .pcm import BLOCK_FRAMES, PcmReader
+
+# Число столбцов обзора по умолчанию: с запасом для полосы во всю ширину окна
+DEFAULT_BUCKETS = 2048
+
+
+class Peaks(NamedTuple):
+    """
+    Обзор формы волны: минимум и максимум отсчетов в каждом столбце.
+
+    Attributes:
+        minima (np.ndarray): Минимумы столбцов (float32, от -1 до 1).
+        maxima (np.ndarray): Максимумы столбцов (float32, от -1 до 1).
+        duration (float): Длительность трека в секундах.
+    """
+    minima: np.ndarray
+    maxima: np.ndarray
+    duration: float
+
+
+class _PeakAccumulator:
+    """Собирает пики столбцов из последовательных блоков отсчетов."""
+    def __init__(self, total_frames: int, buckets: int):
+        # столбец — целое число кадров, поэтому блоки выравниваются по столбцам
+        self.bucket_frames = max(-(-total_frames // buckets), 1)
+        count = -(-total_frames // self.bucket_frames)
+        self.minima = np.zeros(count, dtype=np.float32)
+        self.maxima = np.zeros(count, dtype=np.float32)
+        self.block_frames = max(BLOCK_FRAMES // self.bucket_frames, 1) * self.bucket_frames
+        self.filled = 0
+
+    def add(self, samples: np.ndarray, channels: int, zero: float, scale: float):
+        """
+        Добавляет блок отсчетов (кадры подряд, каналы чередуются).
+
+        Args:
+            samples (np.ndarray): Отсчеты; число кадров кратно bucket_frames, кроме последнего блока.
+            channels (int): Число каналов.
+            zero (float): Значение тишины (128 для беззнакового 8-битного PCM).
+            scale (float): Множитель приведения к [-1, 1].
+        """
+        samples = samples.reshape(-1)
+        starts = np.arange(0, len(samples), self.bucket_frames * channels)
+        end = self.filled + len(starts)
+        # reduceat находит экстремумы всех столбцов блока за один проход
+        self.minima[self.filled:end] = (np.minimum.reduceat(samples, starts) - zero) * scale
+        self.maxima[self.filled:end] = (np.maximum.reduceat(samples, starts) - zero) * scale
+        self.filled = end
+
+
+def compute_peaks(path: str, buckets: int = DEFAULT_BUCKETS) -> Peaks:
+    """
+    Строит обзор формы волны трека.
+
+    Каждый столбец — минимум и максимум отсчетов всех каналов на его участке.
+    Отсчеты читаются блоками через PcmReader: WAV — из отображения файла в
+    память в постоянном объеме памяти, остальные форматы — из декодированного звука.
+
+    Args:
+        path (str): Путь к аудиофайлу.
+        buckets (int): Наибольшее число столбцов.
+
+    Returns:
+        Peaks: Обзор; столбцов меньше buckets, если кадров меньше.
+
+    Raises:
+        OSError: Если файл недоступен.
+        pygame.error: Если файл не удалось декодировать.
+    """
+    with PcmReader(path) as reader:
+        accumulator = _PeakAccumulator(reader.total_frames, buckets)
+        for samples, zero, scale in reader.blocks(accumulator.block_frames):
+            accumulator.add(samples, reader.channels, zero, scale)
+        return Peaks(accumulator.minima, accumulator.maxima, reader.duration)
+
+
+class WaveformCache:
+    """
+    Кэш обзоров формы волны на диске: файл .npz на трек.
+
+    Имя файла — хэш пути к треку; запись актуальна, пока совпадают размер
+    трека, время его изменения и число столбцов. Запись выполняется во
+    временный файл с последующей заменой, поэтому прерванное сохранение не
+    оставляет поврежденных записей.
+
+    Attributes:
+        folder (str): Папка с обзорами.
+        buckets (int): Число столбцов обзора.
+    """
+    def __init__(self, folder: str, buckets: int = DEFAULT_BUCKETS):
+        """
+        Инициализация кэша.
+
+        Args:
+            folder (str): Папка с обзорами (создается при первой записи).
+            buckets (int): Число столбцов обзора.
+        """
+        self.folder = folder
+        self.buckets = buckets
+
+    def _entry_path(self, path: str) -> str:
+        """Путь к файлу обзора трека."""
+        digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+        return os.path.join(self.folder, f"{digest}.npz")
+
+    def lookup(self, path: str, stat: os.stat_result | None = None) -> Peaks | None:
+        """
+        Возвращает сохраненный обзор, не читая аудиофайл.
+
+        Args:
+            path (str): Путь к аудиофайлу.
+            stat (os.stat_result | None): Уже полученные сведения о файле.
+
+        Returns:
+            Peaks | None: Обзор или None, если записи нет или трек изменился.
+        """
+        stat = stat or os.stat(path)
+        try:
+            with np.load(self._entry_path(path)) as entry:
+                key = entry["key"]
+                if key.tolist() != [stat.st_size, stat.st_mtime_ns, self.buckets]:
+                    return None
+                return Peaks(entry["minima"], entry["maxima"], float(entry["duration"]))
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def store(self, path: str, peaks: Peaks, stat: os.stat_result | None = None):
+        """
+        Сохраняет обзор трека.
+
+        Args:
+            path (str): Путь к аудиофайлу.
+            peaks (Peaks): Обзор.
+            stat (os.stat_result | None): Сведения о файле на момент построения обзора.
+        """
+        stat = stat or os.stat(path)
+        os.makedirs(self.folder, exist_ok=True)
+        key = np.array([stat.st_size, stat.st_mtime_ns, self.buckets], dtype=np.int64)
+        fd, temp_path = tempfile.mkstemp(suffix=".npz", dir=self.folder)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, key=key, minima=peaks.minima, maxima=peaks.maxima, duration=peaks.duration)
+            os.replace(temp_path, self._entry_path(path))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def get(self, path: str) -> Peaks:
+        """
+        Возвращает обзор трека, строя и сохраняя его при отсутствии.
+
+        Args:
+            path (str): Путь к аудиофайлу.
+
+        Returns:
+            Peaks: Обзор.
+        """
+        stat = os.stat(path)
+        peaks = self.lookup(path, stat)
+        if peaks is None:
+            peaks = compute_peaks(path, self.buckets)
+            self.store(path, peaks, stat)
+        return peaks
+
+
+def resample_peaks(peaks: Peaks, width: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Сводит обзор к заданному числу столбцов (пикселей).
+
+    Args:
+        peaks (Peaks): Обзор.
+        width (int): Число столбцов, больше нуля.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Минимумы и максимумы длиной width.
+    """
+    count = len(peaks.minima)
+    if count == 0:
+        return np.zeros(width, dtype=np.float32), np.zeros(width, dtype=np.float32)
+    # у каждого пикселя хотя бы один столбец: при растяжении столбцы повторяются
+    starts = np.minimum(np.arange(width) * count // width, count - 1)
+    if count <= width:
+        return peaks.minima[starts], peaks.maxima[starts]
+    return np.minimum.reduceat(peaks.minima, starts), np.maximum.reduceat(peaks.maxima, starts)
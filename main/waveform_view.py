@@ -0,0 +1,108 @@
+import wx
+
+
+class WaveformStrip(wx.Panel):
+    """
+    Полоса прогресса с обзором формы волны трека.
+
+    Рисует минимум и максимум отсчетов в каждом пикселе; проигранная часть
+    выделяется цветом. Пока обзора нет, полоса рисуется как обычный
+    прогресс-бар. Обзор сводится к ширине полосы один раз после смены трека
+    или размера, поэтому частые вызовы set_fraction() только перерисовывают.
+
+    Щелчок по полосе вызывает on_seek(fraction), где fraction — доля трека от 0 до 1.
+
+    Attributes:
+        peaks (Peaks | None): Обзор текущего трека.
+        fraction (float): Проигранная доля трека.
+        on_seek (Callable[[float], None] | None): Обработчик щелчка по полосе.
+        _columns (tuple[tuple[int, int], list] | None): Размер полосы и отрезки столбцов, сведенные к нему.
+    """
+    PLAYED = wx.Colour(52, 120, 200)
+    REMAINING = wx.Colour(160, 170, 180)
+    BACKGROUND = wx.Colour(250, 250, 250)
+
+    def __init__(self, parent, size=wx.Size(300, 48)):
+        """
+        Инициализация полосы.
+
+        Args:
+            parent (wx.Window): Родительское окно.
+            size (wx.Size): Начальный размер.
+        """
+        super().__init__(parent, size=size, style=wx.FULL_REPAINT_ON_RESIZE)
+        self.SetBackgroundStyle(wx.BG_STYLE_PAINT)
+        self.peaks = None
+        self.fraction = 0.0
+        self.on_seek = None
+        self._columns = None
+        self.Bind(wx.EVT_PAINT, self._on_paint)
+        self.Bind(wx.EVT_SIZE, self._on_size)
+        self.Bind(wx.EVT_LEFT_DOWN, self._on_click)
+
+    def set_peaks(self, peaks):
+        """
+        Показывает обзор трека.
+
+        Args:
+            peaks (Peaks | None): Обзор или None, чтобы показать простую полосу.
+        """
+        self.peaks = peaks
+        self._columns = None
+        self.Refresh()
+
+    def set_fraction(self, fraction: float):
+        """
+        Отмечает проигранную долю трека; перерисовывает полосу, только если сдвинулась граница.
+
+        Args:
+            fraction (float): Доля от 0 до 1.
+        """
+        fraction = min(max(fraction, 0.0), 1.0)
+        width = self.GetClientSize().GetWidth()
+        if int(fraction * width) != int(self.fraction * width):
+            self.Refresh()
+        self.fraction = fraction
+
+    def _on_size(self, event):
+        self._columns = None
+        event.Skip()
+
+    def _on_click(self, event):
+        width = self.GetClientSize().GetWidth()
+        if width > 0 and self.on_seek is not None:
+            self.on_seek(min(max(event.GetX() / width, 0.0), 1.0))
+
+    def _segments(self, width: int, height: int) -> list:
+        """Возвращает вертикальные отрезки столбцов (x, y1, x, y2), сведенные к ширине полосы."""
+        if self._columns is None or self._columns[0] != (width, height):
+            from .waveform import resample_peaks
+            minima, maxima = resample_peaks(self.peaks, width)
+            middle = height / 2
+            # отрезок хотя бы в пиксель, чтобы тишина была видна линией
+            tops = (middle - maxima * middle).astype(int).tolist()
+            bottoms = (middle - minima * middle).astype(int).tolist()
+            segments = [(x, top, x, max(bottom, top + 1)) for x, (top, bottom) in enumerate(zip(tops, bottoms))]
+            self._columns = ((width, height), segments)
+        return self._columns[1]
+
+    def _on_paint(self, event):
+        dc = wx.AutoBufferedPaintDC(self)
+        width, height = self.GetClientSize()
+        dc.SetBackground(wx.Brush(self.BACKGROUND))
+        dc.Clear()
+        if width <= 0 or height <= 0:
+            return
+        played = int(self.fraction * width)
+        if self.peaks is None:
+            dc.SetPen(wx.TRANSPARENT_PEN)
+            dc.SetBrush(wx.Brush(self.REMAINING))
+            dc.DrawRectangle(0, height // 3, width, height // 3)
+            dc.SetBrush(wx.Brush(self.PLAYED))
+            dc.DrawRectangle(0, height // 3, played, height // 3)
+            return
+        segments = self._segments(width, height)
+        if played:
+            dc.DrawLineList(segments[:played], wx.Pen(self.PLAYED))
+        if played < width:
+            dc.DrawLineList(segments[played:], wx.Pen(self.REMAINING))
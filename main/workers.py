@@ -0,0 +1,137 @@
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class BackgroundTasks:
+    """
+    Очередь фоновых задач с доставкой результатов в поток интерфейса.
+
+    Задачи выполняются в пуле потоков (по умолчанию в одном потоке, то есть
+    строго в порядке постановки), а обработчики результата и ошибки вызываются
+    через функцию dispatch — для wxPython это wx.CallAfter.
+
+    Attributes:
+        dispatch (Callable): Передает вызов в поток интерфейса.
+        on_error (Callable[[BaseException], None] | None): Обработчик ошибок по умолчанию.
+        _executor (ThreadPoolExecutor): Пул потоков.
+    """
+    def __init__(self, dispatch: Callable | None = None, on_error: Callable[[BaseException], None] | None = None,
+                 max_workers: int = 1, name: str = "background"):
+        """
+        Инициализация очереди.
+
+        Args:
+            dispatch (Callable | None): Передает вызов в поток интерфейса; по умолчанию вызывает сразу.
+            on_error (Callable[[BaseException], None] | None): Обработчик ошибок по умолчанию.
+            max_workers (int): Число потоков; 1 сохраняет порядок выполнения.
+            name (str): Префикс имен потоков.
+        """
+        self.dispatch = dispatch or (lambda fn, *args: fn(*args))
+        self.on_error = on_error
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+    def submit(self, fn: Callable, *args, on_done: Callable | None = None,
+               on_error: Callable[[BaseException], None] | None = None) -> Future:
+        """
+        Ставит функцию в очередь фонового выполнения.
+
+        Args:
+            fn (Callable): Выполняемая функция.
+            *args: Аргументы функции.
+            on_done (Callable | None): Получает результат в потоке интерфейса.
+            on_error (Callable[[BaseException], None] | None): Получает исключение в потоке интерфейса.
+
+        Returns:
+            Future: Задача.
+        """
+        future = self._executor.submit(fn, *args)
+        error_handler = on_error or self.on_error
+
+        def deliver(done: Future):
+            if done.cancelled():
+                return
+            error = done.exception()
+            if error is not None:
+                if error_handler:
+                    self.dispatch(error_handler, error)
+                else:
+                    print(f"Ошибка фоновой задачи: {error!r}", file=sys.stderr)
+            elif on_done:
+                self.dispatch(on_done, done.result())
+
+        future.add_done_callback(deliver)
+        return future
+
+    def shutdown(self, wait: bool = True):
+        """
+        Останавливает очередь.
+
+        Args:
+            wait (bool): Дождаться выполнения уже поставленных задач.
+        """
+        self._executor.shutdown(wait=wait)
+
+
+class StallMonitor:
+    """
+    Измеритель задержек цикла событий.
+
+    Графический интерфейс вызывает tick() по таймеру с периодом interval_ms.
+    Если очередной вызов пришел позже ожидаемого, разница считается задержкой
+    цикла событий: она учитывается в статистике и передается в обработчик on_stall.
+
+    Attributes:
+        interval_ms (int): Период таймера в миллисекундах.
+        threshold_ms (float): Задержки меньше порога не передаются в обработчик.
+        on_stall (Callable[[float], None] | None): Обработчик задержки (в миллисекундах).
+        max_stall_ms (float): Максимальная измеренная задержка.
+        stalls (int): Число задержек выше порога.
+        _last (float | None): Время предыдущего вызова tick().
+    """
+    def __init__(self, interval_ms: int = 50, threshold_ms: float = 100.0,
+                 on_stall: Callable[[float], None] | None = None):
+        """
+        Инициализация измерителя.
+
+        Args:
+            interval_ms (int): Период таймера в миллисекундах.
+            threshold_ms (float): Порог задержки для обработчика.
+            on_stall (Callable[[float], None] | None): Обработчик задержки.
+        """
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        self.on_stall = on_stall
+        self.max_stall_ms = 0.0
+        self.stalls = 0
+        self._last = None
+
+    def tick(self):
+        """Отмечает срабатывание таймера и измеряет задержку относительно предыдущего."""
+        now = time.perf_counter()
+        if self._last is not None:
+            stall = (now - self._last) * 1000 - self.interval_ms
+            if stall > self.max_stall_ms:
+                self.max_stall_ms = stall
+            if stall >= self.threshold_ms:
+                self.stalls += 1
+                if self.on_stall:
+                    self.on_stall(stall)
+        self._last = now
+
+    def reset(self):
+        """Сбрасывает статистику."""
+        self.max_stall_ms = 0.0
+        self.stalls = 0
+        self._last = None
+
+    def report(self, stream=None):
+        """
+        Печатает итог измерений.
+
+        Args:
+            stream: Поток вывода (по умолчанию sys.stderr).
+        """
+        print(f"Максимальная задержка цикла событий: {self.max_stall_ms:.1f} мс; "
+              f"задержек дольше {self.threshold_ms:.0f} мс: {self.stalls}", file=stream or sys.stderr)
@@ -0,0 +1,64 @@
+import os
+import struct
+
+import numpy as np
+
+from main.composition import Composition
+
+# тесты не должны зависеть от звуковой карты
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+def write_sine_wav(path: str, seconds: float, rate: int = 22050):
+    """Записывает WAV 16 бит / моно с синусом 440 Гц (частота не совпадает с микшером)."""
+    samples = np.rint(16000 * np.sin(2 * np.pi * 440 * np.arange(int(rate * seconds)) / rate)).astype("<i2")
+    data = samples.tobytes()
+    with open(path, "wb") as f:
+        f.write(b"RIFF" + struct.pack("<I", 36 + len(data)) + b"WAVE")
+        f.write(b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, rate, rate * 2, 2, 16))
+        f.write(b"data" + struct.pack("<I", len(data)) + data)
+
+
+def init_mixer():
+    from pygame import mixer
+    if not mixer.get_init():
+        mixer.init(44100, -16, 2)
+    return mixer
+
+
+def test_converted_wav_matches_whole_decode(tmp_path):
+    mixer = init_mixer()
+    from pygame import sndarray
+    from main.crossfade import _ConvertedWavTrack
+    path = str(tmp_path / "low.wav")
+    write_sine_wav(path, 1.0)
+    track = _ConvertedWavTrack(Composition("low", 1.0, path))
+    pieces = []
+    while not track.exhausted():
+        pieces.append(sndarray.samples(track.next_sound(4096 * track.frame)).copy())
+    track.close()
+    streamed = np.concatenate(pieces).astype(np.int32)
+    decoded = sndarray.samples(mixer.Sound(path)).astype(np.int32)
+    assert abs(len(streamed) - len(decoded)) <= 1
+    # края не сравниваются: фильтр передискретизации SDL дает там выбросы
+    middle = slice(100, min(len(streamed), len(decoded)) - 100)
+    # порции стыкуются без разрывов: отличие только в способе интерполяции
+    assert np.abs(streamed[middle] - decoded[middle]).max() <= 64
+
+
+def test_queue_takes_prepared_track(tmp_path):
+    init_mixer()
+    from main.crossfade import CrossfadeOutput
+    first, second = str(tmp_path / "a.wav"), str(tmp_path / "b.wav")
+    write_sine_wav(first, 2.0)
+    write_sine_wav(second, 2.0)
+    output = CrossfadeOutput(lambda: None, 0.5)
+    try:
+        following = Composition("b", 2.0, second)
+        output.play(Composition("a", 2.0, first))
+        output.prepare(following)
+        prepared = output._prepared
+        output.queue(following)
+        assert output._next is prepared and output._prepared is None
+    finally:
+        output.close()
@@ -0,0 +1,41 @@
+import os
+
+from benchmarks.bench_folder_import import write_wav
+from main.engine import PlayerEngine
+
+
+def make_engine(folder) -> PlayerEngine:
+    return PlayerEngine(folder=str(folder), audio_cache_bytes=0)
+
+
+def test_import_relative_root_stores_absolute_paths(tmp_path, monkeypatch):
+    music = tmp_path / "music" / "a"
+    music.mkdir(parents=True)
+    write_wav(str(music / "t1.wav"), 0.1)
+    monkeypatch.chdir(tmp_path)
+    engine = make_engine(tmp_path / "playlists")
+    try:
+        assert engine.import_folder("mix", "music") == 1
+        path = engine.get_playlist("mix").first_item.data.get_path()
+        assert path == str(music / "t1.wav")
+        # повторный импорт из другого каталога не добавляет дубликат
+        monkeypatch.chdir(music)
+        assert engine.import_folder("mix", os.path.join("..", "..", "music")) == 0
+    finally:
+        engine.close()
+    reopened = make_engine(tmp_path / "playlists")
+    try:
+        assert reopened.get_playlist("mix").first_item.data.get_path() == str(music / "t1.wav")
+    finally:
+        reopened.close()
+
+
+def test_queue_relative_path_stores_absolute_path(tmp_path, monkeypatch):
+    write_wav(str(tmp_path / "t1.wav"), 0.1)
+    monkeypatch.chdir(tmp_path)
+    engine = make_engine(tmp_path / "playlists")
+    try:
+        composition, = engine.queue("mix", ["t1.wav"])
+        assert composition.get_path() == str(tmp_path / "t1.wav")
+    finally:
+        engine.close()
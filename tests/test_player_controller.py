@@ -0,0 +1,90 @@
+import os
+import threading
+
+from benchmarks.bench_folder_import import write_wav
+from main.composition import Composition
+from main.Playlist import PlayList
+from main.PlayerController import PlayerController
+
+# тесты не должны зависеть от звуковой карты
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+class RecordingTasks:
+    """Очередь задач, которая только запоминает поставленные функции."""
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append((fn, args))
+
+    def run_in_thread(self):
+        """Выполняет поставленные задачи по порядку в отдельном потоке."""
+        def run():
+            while self.submitted:
+                fn, args = self.submitted.pop(0)
+                fn(*args)
+
+        worker = threading.Thread(target=run)
+        worker.start()
+        worker.join()
+
+
+def make_playlist(tmp_path, count: int) -> PlayList:
+    playlist = PlayList()
+    for i in range(count):
+        path = str(tmp_path / f"{i}.wav")
+        write_wav(path, 5.0)
+        playlist.add_song(Composition(str(i), 5.0, path))
+    playlist.current_node = playlist.first_item
+    return playlist
+
+
+def test_playlist_is_read_only_by_owner_thread(tmp_path, monkeypatch):
+    playlist = make_playlist(tmp_path, 3)
+    owner = threading.get_ident()
+    foreign = []
+    for name in ("find_node", "index_of", "__iter__"):
+        method = getattr(PlayList, name)
+
+        def guarded(self, *args, _method=method, _name=name):
+            if threading.get_ident() != owner:
+                foreign.append(_name)
+            return _method(self, *args)
+
+        monkeypatch.setattr(PlayList, name, guarded)
+    tasks = RecordingTasks()
+    controller = PlayerController(gapless=True, tasks=tasks)
+    try:
+        controller.attach(playlist)
+        controller.play(playlist.first_item.data)
+        # запуск и декодирование ждут в очереди задач
+        assert not controller.is_playing
+        tasks.run_in_thread()
+        assert controller.is_playing
+        assert controller._queued_node is playlist.first_item.next_item
+
+        playlist.move_to(playlist.last, 1)
+        controller.requeue()
+        tasks.run_in_thread()
+        # порядок стал 0, 2, 1: в очереди теперь узел трека 2
+        assert controller._queued_node is playlist.first_item.next_item
+        assert controller._queued_node.data.get_title() == "2"
+        assert foreign == []
+    finally:
+        controller.stop()
+        controller.close()
+
+
+def test_stale_load_is_skipped(tmp_path):
+    playlist = make_playlist(tmp_path, 2)
+    tasks = RecordingTasks()
+    controller = PlayerController(gapless=True, tasks=tasks)
+    try:
+        controller.attach(playlist)
+        controller.play(playlist.first_item.data)
+        controller.stop()
+        tasks.run_in_thread()
+        assert not controller.is_playing
+    finally:
+        controller.close()
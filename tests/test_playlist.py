@@ -0,0 +1,31 @@
+from main.composition import Composition
+from main.Playlist import PlayList
+
+
+def make_playlist(*compositions) -> PlayList:
+    playlist = PlayList()
+    for composition in compositions:
+        playlist.add_song(composition)
+    return playlist
+
+
+def test_find_string_prefers_earlier_path_match():
+    by_path = Composition("first", 1.0, "song")
+    by_title = Composition("song", 1.0, "/music/other.wav")
+    playlist = make_playlist(by_path, by_title)
+    assert playlist.find_node("song") is playlist.first_item
+
+
+def test_find_string_prefers_earlier_title_match():
+    by_title = Composition("song", 1.0, "/music/other.wav")
+    by_path = Composition("first", 1.0, "song")
+    playlist = make_playlist(by_title, by_path)
+    assert playlist.find_node("song").data is by_title
+
+
+def test_find_by_path_returns_first_in_playlist_order():
+    first = Composition("a", 1.0, "/music/a.wav")
+    second = Composition("b", 1.0, "/music/a.wav")
+    playlist = make_playlist(first, second)
+    playlist.move_to(playlist.last, 0)
+    assert playlist.find_by_path("/music/a.wav").data is second